@@ -0,0 +1,132 @@
+"""Throughput of the catalog routes with DB_ASYNC off and on.
+
+Starts the API twice under uvicorn against DATABASE_URL, registers a
+throwaway user, seeds books if the table is small and drives GET /books/{id}
+and GET /books/ with a fixed number of concurrent clients:
+
+    python -m benchmarks.async_vs_sync --concurrency 200 --duration 20
+"""
+
+import argparse
+import asyncio
+import random
+import sys
+import time
+
+import httpx
+
+from benchmarks.server import percentile, register_user, start_server, wait_ready
+
+
+async def prepare(base_url: str, seed: int) -> tuple:
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        headers = (await register_user(client))["headers"]
+
+        ids = [
+            b["id"]
+            for b in (
+                await client.get("/books/", params={"limit": 1000}, headers=headers)
+            ).json()
+        ]
+        for i in range(len(ids), seed):
+            response = await client.post(
+                "/books/",
+                json={"title": f"Benchmark book {i}", "author": "Bench"},
+                headers=headers,
+            )
+            response.raise_for_status()
+            ids.append(response.json()["id"])
+        return headers, ids
+
+
+async def run_load(
+    base_url: str, headers: dict, ids: list, concurrency: int, duration: float
+) -> dict:
+    latencies = []
+    errors = 0
+    deadline = time.monotonic() + duration
+    limits = httpx.Limits(
+        max_connections=concurrency, max_keepalive_connections=concurrency
+    )
+
+    async with httpx.AsyncClient(
+        base_url=base_url, headers=headers, limits=limits, timeout=30
+    ) as client:
+
+        async def worker():
+            nonlocal errors
+            while time.monotonic() < deadline:
+                if random.random() < 0.8:
+                    url = f"/books/{random.choice(ids)}"
+                else:
+                    url = "/books/?limit=50"
+                started = time.perf_counter()
+                try:
+                    response = await client.get(url)
+                    ok = response.status_code == 200
+                except httpx.HTTPError:
+                    ok = False
+                if ok:
+                    latencies.append(time.perf_counter() - started)
+                else:
+                    errors += 1
+
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+
+    latencies.sort()
+
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": len(latencies) / duration,
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+    }
+
+
+async def bench_mode(db_async: bool, args) -> dict:
+    server = start_server(
+        args.port, DB_ASYNC=str(db_async).lower(), CACHE_BACKEND="none"
+    )
+    base_url = f"http://127.0.0.1:{args.port}"
+    try:
+        await wait_ready(base_url)
+        headers, ids = await prepare(base_url, args.seed)
+        await run_load(
+            base_url, headers, ids, args.concurrency, min(3.0, args.duration)
+        )
+        return await run_load(base_url, headers, ids, args.concurrency, args.duration)
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--duration", type=float, default=15.0)
+    parser.add_argument("--seed", type=int, default=500, help="minimum number of books")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args(argv)
+
+    results = {}
+    for mode, db_async in (("sync", False), ("async", True)):
+        results[mode] = asyncio.run(bench_mode(db_async, args))
+
+    print(
+        f"{'mode':<6} {'requests':>9} {'errors':>7} {'req/s':>9} {'p50 ms':>8} {'p99 ms':>8}"
+    )
+    for mode, r in results.items():
+        print(
+            f"{mode:<6} {r['requests']:>9} {r['errors']:>7} {r['rps']:>9.1f} "
+            f"{r['p50_ms']:>8.1f} {r['p99_ms']:>8.1f}"
+        )
+    if results["sync"]["rps"]:
+        print(
+            f"async/sync throughput: {results['async']['rps'] / results['sync']['rps']:.2f}x"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,187 @@
+"""Borrow/return on one hot title: atomic statements vs read-modify-write.
+
+Runs directly against DATABASE_URL (tables must exist). For each strategy:
+
+1. oversell check: COPIES copies, WORKERS threads race to borrow them once
+   each for distinct readers; more successes than copies means overselling;
+2. throughput: every thread loops borrow -> return on the same title for
+   DURATION seconds with enough stock for all of them, so the only
+   contention is the hot book row; copies_available must end where it
+   started.
+
+    python -m benchmarks.borrow_contention --workers 32 --copies 10
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+import argparse
+import sys
+import time
+import uuid
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from sqlalchemy import delete, func, insert, select, update  # noqa: E402
+
+from app.crud.borrow import BorrowError, borrow as crud_borrow  # noqa: E402
+from app.db.models import Book, BorrowedBook, Reader, utcnow  # noqa: E402
+from app.db.session import SessionLocal  # noqa: E402
+from app.schemas.borrow import BorrowCreate  # noqa: E402
+
+books = Book.__table__
+borrowed_books = BorrowedBook.__table__
+
+
+class Atomic:
+    name = "atomic"
+
+    def borrow(self, db, book_id, reader_id):
+        try:
+            return crud_borrow.create(
+                db, obj_in=BorrowCreate(book_id=book_id, reader_id=reader_id)
+            ).id
+        except BorrowError:
+            return None
+
+    def give_back(self, db, borrow_id):
+        crud_borrow.return_book(db, id=borrow_id)
+
+
+class ReadModifyWrite:
+    # The pre-atomic flow: read the counter, check it in Python, write it back.
+    name = "read-modify-write"
+
+    def borrow(self, db, book_id, reader_id):
+        copies = db.scalar(
+            select(books.c.copies_available).where(books.c.id == book_id)
+        )
+        active = db.scalar(
+            select(func.count()).where(
+                borrowed_books.c.reader_id == reader_id,
+                borrowed_books.c.return_date.is_(None),
+            )
+        )
+        if copies < 1 or active >= crud_borrow.MAX_ACTIVE_BORROWS:
+            db.rollback()
+            return None
+        db.execute(
+            update(books)
+            .where(books.c.id == book_id)
+            .values(copies_available=copies - 1)
+        )
+        borrow_id = db.execute(
+            insert(borrowed_books).values(
+                book_id=book_id, reader_id=reader_id, borrow_date=utcnow()
+            )
+        ).inserted_primary_key[0]
+        db.commit()
+        return borrow_id
+
+    def give_back(self, db, borrow_id):
+        book_id = db.scalar(
+            select(borrowed_books.c.book_id).where(borrowed_books.c.id == borrow_id)
+        )
+        copies = db.scalar(
+            select(books.c.copies_available).where(books.c.id == book_id)
+        )
+        db.execute(
+            update(borrowed_books)
+            .where(borrowed_books.c.id == borrow_id)
+            .values(return_date=utcnow())
+        )
+        db.execute(
+            update(books)
+            .where(books.c.id == book_id)
+            .values(copies_available=copies + 1)
+        )
+        db.commit()
+
+
+def setup(copies, readers):
+    tag = uuid.uuid4().hex[:8]
+    with SessionLocal() as db:
+        book = Book(title=f"Hot title {tag}", author="Bench", copies_available=copies)
+        people = [
+            Reader(name=f"Bench {i}", email=f"bench-{tag}-{i}@example.com")
+            for i in range(readers)
+        ]
+        db.add(book)
+        db.add_all(people)
+        db.commit()
+        return book.id, [r.id for r in people]
+
+
+def teardown(book_id, reader_ids):
+    with SessionLocal() as db:
+        db.execute(delete(borrowed_books).where(borrowed_books.c.book_id == book_id))
+        db.execute(
+            delete(Reader.__table__).where(Reader.__table__.c.id.in_(reader_ids))
+        )
+        db.execute(delete(books).where(books.c.id == book_id))
+        db.commit()
+
+
+def copies_left(book_id):
+    with SessionLocal() as db:
+        return db.scalar(select(books.c.copies_available).where(books.c.id == book_id))
+
+
+def oversell(strategy, workers, copies):
+    book_id, reader_ids = setup(copies, workers * 4)
+
+    def attempt(reader_id):
+        with SessionLocal() as db:
+            return strategy.borrow(db, book_id, reader_id) is not None
+
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            successes = sum(pool.map(attempt, reader_ids))
+        return successes, copies_left(book_id)
+    finally:
+        teardown(book_id, reader_ids)
+
+
+def throughput(strategy, workers, copies, duration):
+    book_id, reader_ids = setup(copies, workers)
+    deadline = time.monotonic() + duration
+
+    def loop(reader_id):
+        done = 0
+        with SessionLocal() as db:
+            while time.monotonic() < deadline:
+                borrow_id = strategy.borrow(db, book_id, reader_id)
+                if borrow_id is not None:
+                    strategy.give_back(db, borrow_id)
+                    done += 1
+        return done
+
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            cycles = sum(pool.map(loop, reader_ids))
+        return cycles / duration, copies_left(book_id)
+    finally:
+        teardown(book_id, reader_ids)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, default=16)
+    parser.add_argument("--copies", type=int, default=5)
+    parser.add_argument("--duration", type=float, default=10.0)
+    args = parser.parse_args(argv)
+
+    print(
+        f"{'strategy':<18} {'borrowed':>9} {'copies':>7} {'cycles/s':>9} {'drift':>6}"
+    )
+    for strategy in (ReadModifyWrite(), Atomic()):
+        borrowed, _ = oversell(strategy, args.workers, args.copies)
+        rate, left = throughput(strategy, args.workers, args.workers, args.duration)
+        print(
+            f"{strategy.name:<18} {borrowed:>9} {args.copies:>7} {rate:>9.1f} "
+            f"{left - args.workers:>6}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
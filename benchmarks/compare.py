@@ -0,0 +1,92 @@
+"""Diff two benchmarks.load result files.
+
+Prints throughput and p50/p95/p99 for every workload and operation in both
+runs with the relative change, and exits with 1 when a p95/p99 latency rose
+or throughput fell by more than --threshold percent:
+
+    python -m benchmarks.compare results/base.json results/head.json --threshold 10
+"""
+
+from pathlib import Path
+from typing import Dict, List, Optional
+import argparse
+import json
+import sys
+
+METRICS = ("rps", "p50_ms", "p95_ms", "p99_ms")
+# Gate on tail latency and throughput; p50 is printed but too noisy to gate on.
+HIGHER_IS_WORSE = {"p95_ms", "p99_ms"}
+LOWER_IS_WORSE = {"rps"}
+
+
+def change(base: float, head: float) -> Optional[float]:
+    if not base:
+        return None
+    return (head - base) / base * 100
+
+
+def regressed(metric: str, delta: Optional[float], threshold: float) -> bool:
+    if delta is None:
+        return False
+    if metric in HIGHER_IS_WORSE:
+        return delta > threshold
+    if metric in LOWER_IS_WORSE:
+        return delta < -threshold
+    return False
+
+
+def compare(base: Dict, head: Dict, threshold: float) -> List[str]:
+    regressions = []
+    print(
+        f"base {base['meta']['commit'][:12]}  head {head['meta']['commit'][:12]}"
+        f"{'  (dirty)' if head['meta'].get('dirty') else ''}"
+    )
+    for workload, head_result in head["workloads"].items():
+        base_result = base["workloads"].get(workload)
+        if base_result is None:
+            print(f"\n{workload}: not in base")
+            continue
+        print(f"\n{workload}")
+        print(
+            f"  {'operation':<16} {'metric':<7} {'base':>10} {'head':>10} {'change':>8}"
+        )
+        operations = dict(head_result["operations"], total=head_result["total"])
+        base_operations = dict(base_result["operations"], total=base_result["total"])
+        for operation, h in operations.items():
+            b = base_operations.get(operation)
+            if b is None:
+                continue
+            for metric in METRICS:
+                delta = change(b[metric], h[metric])
+                flag = ""
+                if regressed(metric, delta, threshold):
+                    flag = " !"
+                    regressions.append(f"{workload} {operation} {metric}")
+                shown = "" if delta is None else f"{delta:+.1f}%"
+                print(
+                    f"  {operation:<16} {metric:<7} {b[metric]:>10.2f} "
+                    f"{h[metric]:>10.2f} {shown:>8}{flag}"
+                )
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("base", type=Path)
+    parser.add_argument("head", type=Path)
+    parser.add_argument("--threshold", type=float, default=10.0, help="percent")
+    args = parser.parse_args(argv)
+
+    base = json.loads(args.base.read_text())
+    head = json.loads(args.head.read_text())
+    regressions = compare(base, head, args.threshold)
+    if regressions:
+        print(f"\n{len(regressions)} regressions over {args.threshold:g}%:")
+        for regression in regressions:
+            print(f"  {regression}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,107 @@
+"""CPU cost of response compression against the bytes it saves.
+
+Builds GET /books/ pages of several sizes from DATABASE_URL (seed it with
+benchmarks.seed first), encodes each with every installed codec at a few
+levels, and reports the compressed size and the time per response. The
+"stream" rows compress the same page as 100-row chunks flushed one by one,
+the way CompressionMiddleware handles StreamingResponse bodies:
+
+    python -m benchmarks.compression --pages 10,100,1000 --repeat 50
+"""
+
+from pathlib import Path
+import argparse
+import statistics
+import sys
+import time
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+import orjson  # noqa: E402
+
+from app.core import compression  # noqa: E402
+from app.core.compression import (  # noqa: E402
+    BrotliEncoder,
+    GzipEncoder,
+    ZstdEncoder,
+)
+from app.core.fields import project  # noqa: E402
+from app.crud.book import book as crud_book  # noqa: E402
+from app.db.session import SessionLocal  # noqa: E402
+
+CODECS = (
+    ("gzip", GzipEncoder, (1, 6, 9), True),
+    ("br", BrotliEncoder, (1, 4, 11), compression.brotli is not None),
+    ("zstd", ZstdEncoder, (1, 3, 19), compression.zstandard is not None),
+)
+STREAM_CHUNK_ROWS = 100
+
+
+def load_rows(limit: int) -> list:
+    db = SessionLocal()
+    try:
+        rows, _ = crud_book.get_page(db, limit=limit, fields=crud_book.LIST_FIELDS)
+        return project(rows, crud_book.LIST_FIELDS)
+    finally:
+        db.close()
+
+
+def timed(repeat: int, encode) -> tuple:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        size = len(encode())
+        timings.append(time.perf_counter() - started)
+    return size, statistics.median(timings)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", default="10,100,1000")
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args(argv)
+
+    missing = [name for name, _, _, available in CODECS if not available]
+    if missing:
+        print(f"not installed, skipped: {', '.join(missing)}")
+
+    print(
+        f"{'rows':>5} {'codec':<10} {'mode':<6} {'bytes':>9} {'ratio':>6} "
+        f"{'us':>9} {'MB/s':>7} {'us/KB saved':>11}"
+    )
+    for limit in (int(p) for p in args.pages.split(",")):
+        rows = load_rows(limit)
+        body = orjson.dumps(rows)
+        chunks = [
+            orjson.dumps(rows[i : i + STREAM_CHUNK_ROWS])
+            for i in range(0, len(rows), STREAM_CHUNK_ROWS)
+        ]
+        print(f"{len(rows):>5} {'identity':<10} {'':<6} {len(body):>9}")
+
+        for name, encoder_class, levels, available in CODECS:
+            if not available:
+                continue
+            for level in levels:
+
+                def whole():
+                    return encoder_class(level).encode(body)
+
+                def stream():
+                    encoder = encoder_class(level)
+                    out = [encoder.compress(chunk) for chunk in chunks]
+                    return b"".join(out) + encoder.finish()
+
+                for mode, encode in (("whole", whole), ("stream", stream)):
+                    size, seconds = timed(args.repeat, encode)
+                    saved_kb = (len(body) - size) / 1024
+                    print(
+                        f"{len(rows):>5} {f'{name}-{level}':<10} {mode:<6} "
+                        f"{size:>9} {len(body) / size:>6.1f} "
+                        f"{seconds * 1e6:>9.0f} {len(body) / seconds / 1e6:>7.1f} "
+                        f"{seconds * 1e6 / saved_kb if saved_kb > 0 else 0:>11.2f}"
+                    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,98 @@
+"""GET /books/ before and after the lean list path.
+
+Mounts two routes on a scratch FastAPI app against DATABASE_URL (seed it
+with benchmarks.seed first). "orm" is the previous implementation: Book
+instances, response_model validation and the stdlib JSON encoder. "lean"
+is CRUDBook.get_page with Core rows encoded by orjson. Both are driven
+in-process through TestClient, so the difference is query hydration plus
+serialization. "deferred" is the lean path with the default list fields,
+i.e. without description:
+
+    python -m benchmarks.list_serialization --limit 1000 --requests 200
+"""
+
+from pathlib import Path
+import argparse
+import statistics
+import sys
+import time
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from fastapi import Depends, FastAPI  # noqa: E402
+from fastapi.responses import ORJSONResponse  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy import select  # noqa: E402
+from sqlalchemy.orm import Session  # noqa: E402
+
+from app.crud.book import book as crud_book  # noqa: E402
+from app.db.models import Book  # noqa: E402
+from app.db.session import get_db  # noqa: E402
+from app.schemas.book import BookRead  # noqa: E402
+
+app = FastAPI()
+
+
+@app.get("/orm", response_model=list[BookRead])
+def orm_books(limit: int, db: Session = Depends(get_db)):
+    return db.scalars(select(Book).order_by(Book.id).limit(limit)).all()
+
+
+@app.get("/lean", response_model=list[BookRead])
+def lean_books(limit: int, db: Session = Depends(get_db)):
+    rows, _ = crud_book.get_page(db, limit=limit, fields=crud_book.LIST_FIELDS)
+    return ORJSONResponse([row._asdict() for row in rows])
+
+
+@app.get("/deferred")
+def deferred_books(limit: int, db: Session = Depends(get_db)):
+    rows, _ = crud_book.get_page(db, limit=limit)
+    return ORJSONResponse([row._asdict() for row in rows])
+
+
+def measure(client: TestClient, path: str, limit: int, requests: int) -> list:
+    timings = []
+    for _ in range(requests):
+        started = time.perf_counter()
+        response = client.get(path, params={"limit": limit})
+        timings.append(time.perf_counter() - started)
+        response.raise_for_status()
+    return sorted(timings)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--limit", type=int, default=1000)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--warmup", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    with TestClient(app) as client:
+        orm, lean = (
+            client.get(path, params={"limit": args.limit}).json()
+            for path in ("/orm", "/lean")
+        )
+        if orm != lean:
+            print("orm and lean responses differ")
+            return 1
+        if len(lean) < args.limit:
+            print(f"only {len(lean)} books; seed more with benchmarks.seed")
+
+        results = {}
+        for path in ("/orm", "/lean", "/deferred"):
+            measure(client, path, args.limit, args.warmup)
+            results[path] = measure(client, path, args.limit, args.requests)
+
+    print(f"limit={args.limit} requests={args.requests}")
+    print(f"{'path':<9} {'median ms':>10} {'p95 ms':>8} {'req/s':>8}")
+    for path, timings in results.items():
+        median = statistics.median(timings)
+        p95 = timings[int(len(timings) * 0.95) - 1]
+        print(f"{path:<9} {median * 1000:>10.2f} {p95 * 1000:>8.2f} {1 / median:>8.1f}")
+    speedup = statistics.median(results["/orm"]) / statistics.median(results["/lean"])
+    print(f"speedup: {speedup:.2f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
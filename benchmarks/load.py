@@ -0,0 +1,380 @@
+"""Open-loop HTTP load against every router, with JSON results.
+
+Starts the API under uvicorn (or targets --url), then runs each workload
+at a fixed arrival rate for --duration seconds. Requests are sent on
+schedule whether or not earlier ones have finished, so a slow server shows
+up as latency and schedule lag instead of quietly lowering the offered
+load. Seed the database first with benchmarks.seed.
+
+    python -m benchmarks.load --workloads catalog,borrow,auth,mixed --rate 200 \\
+        --duration 30 --output results/$(git rev-parse --short HEAD).json
+    python -m benchmarks.compare results/base.json results/head.json
+
+Workloads draw operations by weight:
+  catalog  books, readers, stats and admin reads
+  borrow   borrow + return of the same loan, reader loan history
+  auth     login and register
+  mixed    80% catalog, 15% borrow, 5% auth
+"""
+
+from collections import defaultdict
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+import argparse
+import asyncio
+import json
+import platform
+import random
+import subprocess
+import sys
+import time
+import uuid
+
+import httpx
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from sqlalchemy import func, select  # noqa: E402
+
+from benchmarks.seed import WORDS  # noqa: E402
+from benchmarks.server import (  # noqa: E402
+    BASE_DIR,
+    percentile,
+    register_user,
+    start_server,
+    wait_ready,
+)
+from app.db.models import Book, BorrowedBook, Reader  # noqa: E402
+from app.db.session import engine  # noqa: E402
+
+PASSWORD = "x" * 12
+
+
+class Recorder:
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.statuses: Dict[str, Dict[int, int]] = defaultdict(lambda: defaultdict(int))
+        self.schedule_lag: List[float] = []
+
+    async def call(
+        self, client: httpx.AsyncClient, name: str, method: str, url: str, **kwargs
+    ):
+        started = time.perf_counter()
+        try:
+            response = await client.request(method, url, **kwargs)
+            status = response.status_code
+        except httpx.HTTPError:
+            response, status = None, 0
+        self.latencies[name].append(time.perf_counter() - started)
+        self.statuses[name][status] += 1
+        return response
+
+
+class Context:
+    # What the operations need to know about the seeded data.
+    def __init__(self, users: List[Dict]):
+        with engine.connect() as conn:
+            self.book_ids = conn.execute(
+                select(func.min(Book.id), func.max(Book.id))
+            ).one()
+            self.reader_ids = conn.execute(
+                select(func.min(Reader.id), func.max(Reader.id))
+            ).one()
+            self.loans = conn.scalar(select(func.count()).select_from(BorrowedBook))
+        if self.book_ids[0] is None or self.reader_ids[0] is None:
+            raise SystemExit("No books or readers; run python -m benchmarks.seed")
+        self.users = users
+
+    def book(self, rng: random.Random) -> int:
+        return rng.randint(*self.book_ids)
+
+    def reader(self, rng: random.Random) -> int:
+        return rng.randint(*self.reader_ids)
+
+
+Operation = Callable[[httpx.AsyncClient, Recorder, Context, random.Random], object]
+
+
+async def get_book(client, rec, ctx, rng):
+    await rec.call(client, "books.get", "GET", f"/books/{ctx.book(rng)}")
+
+
+async def get_book_by_isbn(client, rec, ctx, rng):
+    isbn = f"978{ctx.book(rng):010d}"
+    await rec.call(client, "books.isbn", "GET", f"/books/isbn/{isbn}")
+
+
+async def list_books(client, rec, ctx, rng):
+    sort = rng.choice(("id", "title", "author"))
+    await rec.call(client, "books.list", "GET", f"/books/?limit=50&sort={sort}")
+
+
+async def search_books(client, rec, ctx, rng):
+    query = " ".join(rng.sample(WORDS, 2))
+    await rec.call(client, "books.search", "GET", "/books/search", params={"q": query})
+
+
+async def get_reader(client, rec, ctx, rng):
+    await rec.call(client, "readers.get", "GET", f"/readers/{ctx.reader(rng)}")
+
+
+async def list_readers(client, rec, ctx, rng):
+    await rec.call(client, "readers.list", "GET", "/readers/?limit=50")
+
+
+async def stats_daily(client, rec, ctx, rng):
+    await rec.call(client, "stats.daily", "GET", "/stats/daily")
+
+
+async def stats_top_books(client, rec, ctx, rng):
+    await rec.call(client, "stats.top_books", "GET", "/stats/top-books")
+
+
+async def admin_pool(client, rec, ctx, rng):
+    await rec.call(client, "admin.pool", "GET", "/admin/pool")
+
+
+async def borrow_and_return(client, rec, ctx, rng):
+    response = await rec.call(
+        client,
+        "borrow.create",
+        "POST",
+        "/borrow/",
+        json={"book_id": ctx.book(rng), "reader_id": ctx.reader(rng)},
+    )
+    if response is not None and response.status_code == 201:
+        borrow_id = response.json()["id"]
+        await rec.call(client, "borrow.return", "POST", f"/borrow/return/{borrow_id}")
+
+
+async def reader_history(client, rec, ctx, rng):
+    url = f"/borrow/reader/{ctx.reader(rng)}/history"
+    await rec.call(client, "borrow.history", "GET", url)
+
+
+async def login(client, rec, ctx, rng):
+    user = rng.choice(ctx.users)
+    form = {"username": user["email"], "password": PASSWORD}
+    await rec.call(client, "auth.login", "POST", "/auth/login", data=form)
+
+
+async def register(client, rec, ctx, rng):
+    body = {"email": f"load-{uuid.uuid4().hex}@example.com", "password": PASSWORD}
+    await rec.call(client, "auth.register", "POST", "/auth/register", json=body)
+
+
+CATALOG = [
+    (40, get_book),
+    (5, get_book_by_isbn),
+    (10, list_books),
+    (10, search_books),
+    (10, get_reader),
+    (5, list_readers),
+    (8, stats_daily),
+    (5, stats_top_books),
+    (2, admin_pool),
+]
+BORROW = [(70, borrow_and_return), (30, reader_history)]
+AUTH = [(90, login), (10, register)]
+
+
+def scaled(operations, share: float):
+    total = sum(weight for weight, _ in operations)
+    return [(share * weight / total, op) for weight, op in operations]
+
+
+WORKLOADS = {
+    "catalog": CATALOG,
+    "borrow": BORROW,
+    "auth": AUTH,
+    "mixed": scaled(CATALOG, 80) + scaled(BORROW, 15) + scaled(AUTH, 5),
+}
+
+
+def summarize(latencies: List[float], statuses: Dict[int, int], duration: float):
+    latencies = sorted(latencies)
+    return {
+        "requests": len(latencies),
+        "errors": sum(
+            n for status, n in statuses.items() if status == 0 or status >= 500
+        ),
+        "rps": round(len(latencies) / duration, 2),
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 3),
+        "statuses": {str(status): n for status, n in sorted(statuses.items())},
+    }
+
+
+async def run_workload(
+    client: httpx.AsyncClient,
+    ctx: Context,
+    operations: List[Tuple[float, Operation]],
+    rate: float,
+    duration: float,
+    seed: int,
+) -> Dict:
+    rng = random.Random(seed)
+    weights = [weight for weight, _ in operations]
+    ops = [op for _, op in operations]
+    rec = Recorder()
+    tasks = []
+
+    async def fire(op, scheduled):
+        rec.schedule_lag.append(time.perf_counter() - scheduled)
+        await op(client, rec, ctx, random.Random(rng.random()))
+
+    started = time.perf_counter()
+    for i in range(int(rate * duration)):
+        scheduled = started + i / rate
+        delay = scheduled - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        op = rng.choices(ops, weights)[0]
+        tasks.append(asyncio.create_task(fire(op, scheduled)))
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - started
+
+    all_latencies = [x for values in rec.latencies.values() for x in values]
+    all_statuses: Dict[int, int] = defaultdict(int)
+    for statuses in rec.statuses.values():
+        for status, n in statuses.items():
+            all_statuses[status] += n
+    lag = sorted(rec.schedule_lag)
+    return {
+        "rate": rate,
+        "duration_s": round(elapsed, 3),
+        "schedule_lag_p99_ms": round(percentile(lag, 0.99) * 1000, 3),
+        "total": summarize(all_latencies, all_statuses, elapsed),
+        "operations": {
+            name: summarize(rec.latencies[name], rec.statuses[name], elapsed)
+            for name in sorted(rec.latencies)
+        },
+    }
+
+
+def git_revision() -> Dict:
+    def git(*args):
+        return subprocess.run(
+            ["git", *args], cwd=BASE_DIR, capture_output=True, text=True
+        ).stdout.strip()
+
+    return {
+        "commit": git("rev-parse", "HEAD"),
+        "dirty": bool(git("status", "--porcelain")),
+    }
+
+
+async def run(args, base_url: str) -> Dict:
+    limits = httpx.Limits(
+        max_connections=args.max_connections,
+        max_keepalive_connections=args.max_connections,
+    )
+    async with httpx.AsyncClient(
+        base_url=base_url, limits=limits, timeout=args.timeout
+    ) as client:
+        users = [await register_user(client, PASSWORD) for _ in range(args.users)]
+        client.headers.update(users[0]["headers"])
+        ctx = Context(users)
+
+        results = {}
+        for index, name in enumerate(args.workloads):
+            print(f"{name}: {args.rate:g} req/s for {args.duration:g}s", flush=True)
+            await run_workload(
+                client, ctx, WORKLOADS[name], args.rate, args.warmup, args.seed
+            )
+            results[name] = await run_workload(
+                client,
+                ctx,
+                WORKLOADS[name],
+                args.rate,
+                args.duration,
+                args.seed + index,
+            )
+            print_workload(name, results[name])
+
+    return {
+        "meta": {
+            **git_revision(),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "args": {k: v for k, v in vars(args).items() if k != "output"},
+            "dataset": {
+                "book_ids": list(ctx.book_ids),
+                "reader_ids": list(ctx.reader_ids),
+                "loans": ctx.loans,
+            },
+        },
+        "workloads": results,
+    }
+
+
+def print_workload(name: str, result: Dict) -> None:
+    print(
+        f"  {'operation':<16} {'requests':>9} {'errors':>7} {'rps':>8} "
+        f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}"
+    )
+    rows = list(result["operations"].items()) + [("total", result["total"])]
+    for operation, r in rows:
+        print(
+            f"  {operation:<16} {r['requests']:>9} {r['errors']:>7} {r['rps']:>8.1f} "
+            f"{r['p50_ms']:>8.1f} {r['p95_ms']:>8.1f} {r['p99_ms']:>8.1f}"
+        )
+    print(f"  schedule lag p99: {result['schedule_lag_p99_ms']:.1f} ms")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--workloads",
+        type=lambda value: value.split(","),
+        default=list(WORKLOADS),
+        help=f"comma-separated, from {', '.join(WORKLOADS)}",
+    )
+    parser.add_argument("--rate", type=float, default=100.0, help="requests/s")
+    parser.add_argument("--duration", type=float, default=30.0)
+    parser.add_argument("--warmup", type=float, default=5.0)
+    parser.add_argument("--max-connections", type=int, default=200)
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--url", help="benchmark a running server instead")
+    parser.add_argument("--port", type=int, default=8767)
+    parser.add_argument(
+        "--server-env",
+        action="append",
+        default=[],
+        metavar="KEY=VALUE",
+        help="environment for the started server, e.g. DB_ASYNC=true",
+    )
+    parser.add_argument("--output", type=Path, help="write JSON results here")
+    args = parser.parse_args(argv)
+    unknown = set(args.workloads) - set(WORKLOADS)
+    if unknown:
+        parser.error(f"unknown workloads: {', '.join(sorted(unknown))}")
+
+    server = None
+    base_url = args.url
+    if base_url is None:
+        env = dict(item.split("=", 1) for item in args.server_env)
+        server = start_server(args.port, **env)
+        base_url = f"http://127.0.0.1:{args.port}"
+    try:
+        asyncio.run(wait_ready(base_url))
+        report = asyncio.run(run(args, base_url))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(json.dumps(report, indent=2, sort_keys=True) + "\n")
+        print(f"Results written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
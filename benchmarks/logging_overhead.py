@@ -0,0 +1,97 @@
+"""Per-request cost of application logging on the request thread.
+
+Logs the record a successful borrow writes, --records times, under a few
+setups, and reports the time the caller spends per record. "sync" writes
+through a StreamHandler on the calling thread, as logging.basicConfig
+would; "queue" is app.core.logs.LogPipeline, whose writer thread time is
+reported separately as the time stop() takes to drain the queue. Output
+goes to os.devnull:
+
+    python -m benchmarks.logging_overhead --records 200000
+"""
+
+from pathlib import Path
+import argparse
+import logging
+import os
+import sys
+import time
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from app.core.config import settings  # noqa: E402
+from app.core.logs import TEXT_FORMAT, LogPipeline  # noqa: E402
+
+logger = logging.getLogger("app.crud.borrow")
+
+
+def log_eager(count: int) -> None:
+    for i in range(count):
+        logger.info(f"Book borrowed: Book ID={i}, Reader ID={i % 97}, Record ID={i}")
+
+
+def log_lazy(count: int) -> None:
+    for i in range(count):
+        logger.info(
+            "Book borrowed: Book ID=%s, Reader ID=%s, Record ID=%s", i, i % 97, i
+        )
+
+
+def run_sync(sink, count: int, emit, level: int) -> tuple:
+    handler = logging.StreamHandler(sink)
+    handler.setFormatter(logging.Formatter(TEXT_FORMAT))
+    root = logging.getLogger()
+    root.addHandler(handler)
+    root.setLevel(level)
+    try:
+        started = time.perf_counter()
+        emit(count)
+        return time.perf_counter() - started, 0.0
+    finally:
+        root.removeHandler(handler)
+
+
+def run_queue(sink, count: int, emit, sampling: str) -> tuple:
+    settings.LOG_FORMAT = "json"
+    settings.LOG_LEVEL = "INFO"
+    settings.LOG_SAMPLING = sampling
+    settings.LOG_QUEUE_SIZE = count + 1
+    pipeline = LogPipeline()
+    pipeline.start(sink)
+    started = time.perf_counter()
+    emit(count)
+    caller = time.perf_counter() - started
+    pipeline.stop()
+    return caller, time.perf_counter() - started - caller
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--records", type=int, default=200000)
+    args = parser.parse_args(argv)
+
+    setups = (
+        ("disabled, f-string", lambda s, n: run_sync(s, n, log_eager, logging.WARNING)),
+        ("disabled, lazy", lambda s, n: run_sync(s, n, log_lazy, logging.WARNING)),
+        ("sync text, f-string", lambda s, n: run_sync(s, n, log_eager, logging.INFO)),
+        ("sync text, lazy", lambda s, n: run_sync(s, n, log_lazy, logging.INFO)),
+        ("queue json", lambda s, n: run_queue(s, n, log_lazy, "")),
+        (
+            "queue json, 10% sampled",
+            lambda s, n: run_queue(s, n, log_lazy, "app.crud.borrow=0.1"),
+        ),
+    )
+    print(f"{'setup':<24} {'caller us/rec':>14} {'writer us/rec':>14}")
+    with open(os.devnull, "w") as sink:
+        for name, run in setups:
+            run(sink, min(args.records, 10000))
+            caller, writer = run(sink, args.records)
+            print(
+                f"{name:<24} {caller / args.records * 1e6:>14.2f} "
+                f"{writer / args.records * 1e6:>14.2f}"
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
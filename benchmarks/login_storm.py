@@ -0,0 +1,122 @@
+"""Catalog latency while /auth/login is flooded.
+
+Runs GET /books/{id} traffic alone, then again while a crowd of clients
+hammers POST /auth/login, and reports catalog latency for both phases plus
+how many logins succeeded or were shed with 503:
+
+    python -m benchmarks.login_storm --catalog-clients 20 --login-clients 200
+"""
+
+from typing import Dict, List
+import argparse
+import asyncio
+import random
+import sys
+import time
+
+import httpx
+
+from benchmarks.server import percentile, register_user, start_server, wait_ready
+
+
+async def catalog_load(
+    client: httpx.AsyncClient, ids: List[int], clients: int, duration: float
+) -> Dict:
+    latencies = []
+    errors = 0
+    deadline = time.monotonic() + duration
+
+    async def worker():
+        nonlocal errors
+        while time.monotonic() < deadline:
+            started = time.perf_counter()
+            response = await client.get(f"/books/{random.choice(ids)}")
+            if response.status_code == 200:
+                latencies.append(time.perf_counter() - started)
+            else:
+                errors += 1
+
+    await asyncio.gather(*(worker() for _ in range(clients)))
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+    }
+
+
+async def login_storm(
+    client: httpx.AsyncClient, user: Dict, clients: int, duration: float
+) -> Dict:
+    counts: Dict[int, int] = {}
+    deadline = time.monotonic() + duration
+    form = {"username": user["email"], "password": user["password"]}
+
+    async def worker():
+        while time.monotonic() < deadline:
+            try:
+                status = (await client.post("/auth/login", data=form)).status_code
+            except httpx.HTTPError:
+                status = 0
+            counts[status] = counts.get(status, 0) + 1
+            if status == 503:
+                await asyncio.sleep(0.05)
+
+    await asyncio.gather(*(worker() for _ in range(clients)))
+    return counts
+
+
+async def run(args) -> None:
+    base_url = f"http://127.0.0.1:{args.port}"
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=None)
+    async with httpx.AsyncClient(
+        base_url=base_url, limits=limits, timeout=60
+    ) as client:
+        user = await register_user(client)
+        client.headers.update(user["headers"])
+        ids = []
+        for i in range(50):
+            response = await client.post(
+                "/books/", json={"title": f"Storm book {i}", "author": "Bench"}
+            )
+            response.raise_for_status()
+            ids.append(response.json()["id"])
+
+        quiet = await catalog_load(client, ids, args.catalog_clients, args.duration)
+        storm, logins = await asyncio.gather(
+            catalog_load(client, ids, args.catalog_clients, args.duration),
+            login_storm(client, user, args.login_clients, args.duration),
+        )
+
+    print(f"{'phase':<8} {'requests':>9} {'errors':>7} {'p50 ms':>8} {'p99 ms':>8}")
+    for phase, r in (("quiet", quiet), ("storm", storm)):
+        print(
+            f"{phase:<8} {r['requests']:>9} {r['errors']:>7} "
+            f"{r['p50_ms']:>8.1f} {r['p99_ms']:>8.1f}"
+        )
+    print(
+        "login responses: " + ", ".join(f"{k}={v}" for k, v in sorted(logins.items()))
+    )
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--catalog-clients", type=int, default=20)
+    parser.add_argument("--login-clients", type=int, default=200)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--port", type=int, default=8766)
+    args = parser.parse_args(argv)
+
+    server = start_server(args.port, CACHE_BACKEND="none")
+    try:
+        asyncio.run(wait_ready(f"http://127.0.0.1:{args.port}"))
+        asyncio.run(run(args))
+    finally:
+        server.terminate()
+        server.wait()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
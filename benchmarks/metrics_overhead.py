@@ -0,0 +1,95 @@
+"""Per-request cost of MetricsMiddleware and the query listeners.
+
+Drives a no-op ASGI app directly, with and without the middleware, so the
+difference is the middleware alone; then times a SQLite query with and
+without the cursor listeners. Prints microseconds per call:
+
+    python -m benchmarks.metrics_overhead --requests 200000
+"""
+
+from pathlib import Path
+import argparse
+import asyncio
+import sys
+import time
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from sqlalchemy import create_engine, text  # noqa: E402
+
+from app.core.metrics import MetricsMiddleware, RequestMetrics  # noqa: E402
+from app.core.profiler import (  # noqa: E402
+    QueryProfile,
+    current_profile,
+    instrument_queries,
+)
+
+
+class Route:
+    path = "/books/{book_id}"
+
+
+async def endpoint(scope, receive, send):
+    scope["route"] = Route
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"{}"})
+
+
+async def drive(app, requests: int) -> float:
+    async def receive():
+        return {"type": "http.request", "body": b""}
+
+    async def send(message):
+        pass
+
+    started = time.perf_counter()
+    for _ in range(requests):
+        await app({"type": "http", "method": "GET", "path": "/books/1"}, receive, send)
+    return (time.perf_counter() - started) / requests
+
+
+def time_queries(engine, queries: int) -> float:
+    with engine.connect() as conn:
+        statement = text("SELECT 1")
+        started = time.perf_counter()
+        for _ in range(queries):
+            conn.execute(statement)
+        return (time.perf_counter() - started) / queries
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=200000)
+    parser.add_argument("--queries", type=int, default=50000)
+    args = parser.parse_args(argv)
+
+    metrics = RequestMetrics()
+    bare = asyncio.run(drive(endpoint, args.requests))
+    wrapped = asyncio.run(drive(MetricsMiddleware(endpoint, metrics), args.requests))
+    started = time.perf_counter()
+    body = metrics.render()
+    render = time.perf_counter() - started
+
+    plain = create_engine("sqlite://")
+    instrumented = create_engine("sqlite://")
+    instrument_queries(instrumented)
+    token = current_profile.set(QueryProfile())
+    try:
+        query_plain = time_queries(plain, args.queries)
+        query_instrumented = time_queries(instrumented, args.queries)
+    finally:
+        current_profile.reset(token)
+
+    print(f"{'':<22} {'us/call':>9}")
+    print(f"{'bare ASGI app':<22} {bare * 1e6:>9.2f}")
+    print(f"{'with middleware':<22} {wrapped * 1e6:>9.2f}")
+    print(f"{'middleware overhead':<22} {(wrapped - bare) * 1e6:>9.2f}")
+    print(f"{'query':<22} {query_plain * 1e6:>9.2f}")
+    print(f"{'query + listeners':<22} {query_instrumented * 1e6:>9.2f}")
+    print(f"{'listener overhead':<22} {(query_instrumented - query_plain) * 1e6:>9.2f}")
+    print(f"render: {render * 1e3:.2f} ms, {len(body)} bytes")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,198 @@
+"""Deterministic benchmark dataset: books, readers and loan history.
+
+Fills DATABASE_URL with generate_series inserts, so a million rows take
+seconds rather than hours of API calls. The same --seed and sizes always
+produce the same rows, which keeps results from different commits
+comparable. Existing books, readers and loans are only replaced with
+--reset:
+
+    python -m benchmarks.seed --books 1000000 --readers 100000 --loans 5000000 --reset
+
+Loans are spread over the last --days days and all returned except
+--open-loans recent ones, one per reader. Afterwards readers.active_borrows
+and the stats rollups are rebuilt and the tables analyzed.
+"""
+
+from datetime import timedelta
+from pathlib import Path
+import argparse
+import sys
+import time
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from sqlalchemy import func, select, text  # noqa: E402
+
+from app.crud.borrow import borrow as crud_borrow  # noqa: E402
+from app.crud.stats import ROLLUPS, stats as crud_stats  # noqa: E402
+from app.db.models import (  # noqa: E402
+    Book,
+    BorrowedBook,
+    CirculationEvent,
+    Reader,
+    utcnow,
+)
+from app.db.partitions import (  # noqa: E402
+    add_months,
+    create_partition,
+    ensure_partitions,
+    is_partitioned,
+)
+from app.db.session import SessionLocal, engine  # noqa: E402
+
+books = Book.__table__
+readers = Reader.__table__
+loans = BorrowedBook.__table__
+TABLES = (loans, CirculationEvent.__table__, *ROLLUPS, readers, books)
+
+# Title words double as search terms for the search workload.
+WORDS = (
+    "river night garden empire winter shadow silver ocean "
+    "stone letters mountain glass forest machine storm harbor"
+).split()
+CHUNK = 250000
+
+
+def insert_chunked(conn, label: str, total: int, statement: str, **params) -> None:
+    started = time.perf_counter()
+    for low in range(1, total + 1, CHUNK):
+        high = min(total, low + CHUNK - 1)
+        conn.execute(text(statement), {"low": low, "high": high, **params})
+        conn.commit()
+        print(f"\r{label}: {high}/{total}", end="", flush=True)
+    print(f" ({time.perf_counter() - started:.1f}s)")
+
+
+def seed_books(conn, count: int, seed: int) -> None:
+    words = "(ARRAY[" + ", ".join(f"'{w}'" for w in WORDS) + "])"
+    insert_chunked(
+        conn,
+        "books",
+        count,
+        f"INSERT INTO {books.fullname} "
+        "(title, author, year, isbn, copies_available, description, updated_at) "
+        f"SELECT initcap({words}[1 + (i * 7 + :seed) % {len(WORDS)}]) || ' ' || "
+        f"{words}[1 + (i * 13 + :seed) % {len(WORDS)}] || ' ' || i, "
+        "'Author ' || (1 + (i * 31 + :seed) % greatest(:count / 20, 1)), "
+        "1900 + (i * 17 + :seed) % 125, "
+        "'978' || lpad(i::text, 10, '0'), "
+        "1 + (i * 11 + :seed) % 5, "
+        f"CASE WHEN i % 3 = 0 THEN 'A story of the ' || "
+        f"{words}[1 + (i * 5 + :seed) % {len(WORDS)}] END, "
+        "now() AT TIME ZONE 'utc' "
+        "FROM generate_series(CAST(:low AS bigint), CAST(:high AS bigint)) AS i",
+        seed=seed,
+        count=count,
+    )
+
+
+def seed_readers(conn, count: int) -> None:
+    insert_chunked(
+        conn,
+        "readers",
+        count,
+        f"INSERT INTO {readers.fullname} (name, email) "
+        "SELECT 'Reader ' || i, 'reader' || i || '@bench.example' "
+        "FROM generate_series(CAST(:low AS bigint), CAST(:high AS bigint)) AS i",
+    )
+
+
+def ensure_loan_partitions(conn, days: int) -> None:
+    if not is_partitioned(conn):
+        return
+    today = utcnow().date()
+    start = add_months(today - timedelta(days=days), 0)
+    while start <= today:
+        create_partition(conn, start)
+        start = add_months(start, 1)
+    ensure_partitions(conn, months_ahead=1)
+    conn.commit()
+
+
+def seed_loans(conn, args) -> None:
+    # Returned loans: book and reader picked by multiplicative hashing of the
+    # row number, borrowed up to --days ago and kept for 1-21 days.
+    span = args.days * 86400
+    insert_chunked(
+        conn,
+        "loans",
+        args.loans,
+        f"INSERT INTO {loans.fullname} "
+        "(book_id, reader_id, borrow_date, return_date) "
+        "SELECT 1 + (i * 104729 + :seed) % :books, "
+        "1 + (i * 7919 + :seed) % :readers, borrowed, "
+        "least(borrowed + (1 + (i * 13) % 21) * interval '1 day', :now) "
+        "FROM generate_series(CAST(:low AS bigint), CAST(:high AS bigint)) AS i, "
+        "LATERAL (SELECT :now - ((i * 2654435761 + :seed) % :span) "
+        "* interval '1 second' AS borrowed) AS b",
+        seed=args.seed,
+        books=args.books,
+        readers=args.readers,
+        span=span,
+        now=utcnow(),
+    )
+    open_loans = min(args.open_loans, args.readers)
+    conn.execute(
+        text(
+            f"INSERT INTO {loans.fullname} (book_id, reader_id, borrow_date) "
+            "SELECT 1 + (i * 104729 + :seed) % :books, i, "
+            ":now - ((i * 7) % (14 * 86400)) * interval '1 second' "
+            "FROM generate_series(1, :open_loans) AS i"
+        ),
+        {
+            "seed": args.seed,
+            "books": args.books,
+            "open_loans": open_loans,
+            "now": utcnow(),
+        },
+    )
+    conn.commit()
+    print(f"open loans: {open_loans}")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--books", type=int, default=100000)
+    parser.add_argument("--readers", type=int, default=10000)
+    parser.add_argument("--loans", type=int, default=500000)
+    parser.add_argument("--open-loans", type=int, default=5000)
+    parser.add_argument("--days", type=int, default=730)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument(
+        "--reset",
+        action="store_true",
+        help="truncate books, readers, loans and stats before seeding",
+    )
+    args = parser.parse_args(argv)
+
+    with engine.connect() as conn:
+        existing = conn.scalar(select(func.count()).select_from(books))
+        if existing and not args.reset:
+            print(f"books already holds {existing} rows; pass --reset to replace them")
+            return 1
+        if args.reset:
+            names = ", ".join(t.fullname for t in TABLES)
+            conn.execute(text(f"TRUNCATE {names} RESTART IDENTITY CASCADE"))
+            conn.commit()
+
+        seed_books(conn, args.books, args.seed)
+        seed_readers(conn, args.readers)
+        ensure_loan_partitions(conn, args.days)
+        seed_loans(conn, args)
+
+    db = SessionLocal()
+    try:
+        crud_borrow.resync_active_borrows(db)
+        days = crud_stats.rebuild(db)
+    finally:
+        db.close()
+    print(f"stats rebuilt for {days} days")
+
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        for table in TABLES:
+            conn.execute(text(f"ANALYZE {table.fullname}"))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,64 @@
+"""Helpers for benchmarks that run the API under uvicorn."""
+
+from pathlib import Path
+from typing import Dict, List
+import asyncio
+import os
+import subprocess
+import sys
+import time
+import uuid
+
+import httpx
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+SRC_DIR = BASE_DIR / "src"
+
+
+def start_server(port: int, **env: str) -> subprocess.Popen:
+    return subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "uvicorn",
+            "app.main:app",
+            "--port",
+            str(port),
+            "--log-level",
+            "warning",
+        ],
+        cwd=SRC_DIR,
+        env=dict(os.environ, **env),
+    )
+
+
+async def wait_ready(base_url: str, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        while time.monotonic() < deadline:
+            try:
+                if (await client.get("/")).status_code == 200:
+                    return
+            except httpx.TransportError:
+                pass
+            await asyncio.sleep(0.2)
+    raise RuntimeError(f"Server at {base_url} did not start")
+
+
+async def register_user(client: httpx.AsyncClient, password: str = "x" * 12) -> Dict:
+    email = f"bench-{uuid.uuid4().hex}@example.com"
+    response = await client.post(
+        "/auth/register", json={"email": email, "password": password}
+    )
+    response.raise_for_status()
+    return {
+        "email": email,
+        "password": password,
+        "headers": {"Authorization": f"Bearer {response.json()['access_token']}"},
+    }
+
+
+def percentile(sorted_values: List[float], p: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * p))]
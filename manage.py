@@ -0,0 +1,11 @@
+import sys
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent
+SRC_DIR = BASE_DIR / "src"
+sys.path.insert(0, str(SRC_DIR))
+
+if __name__ == "__main__":
+    from app.cli import main
+
+    sys.exit(main())
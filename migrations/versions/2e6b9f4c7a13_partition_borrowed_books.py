@@ -0,0 +1,152 @@
+"""partition_borrowed_books
+
+Revision ID: 2e6b9f4c7a13
+Revises: a5f0c3b8d214
+Create Date: 2025-07-21 11:08:46.192735
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "2e6b9f4c7a13"
+down_revision: Union[str, None] = "a5f0c3b8d214"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Months created past the current one; the app keeps the window moving
+# (app.db.partitions.ensure_partitions).
+MONTHS_AHEAD = 3
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # The primary key has to include the partition key, so it becomes
+    # (id, borrow_date); id stays unique through its sequence.
+    op.drop_index("ix_borrowed_books_reader_borrow_date", table_name="borrowed_books")
+    op.drop_index("ix_borrowed_books_active_reader", table_name="borrowed_books")
+    op.drop_index("ix_borrowed_books_id", table_name="borrowed_books")
+    op.execute("ALTER TABLE borrowed_books RENAME TO borrowed_books_unpartitioned")
+    op.execute(
+        "ALTER TABLE borrowed_books_unpartitioned "
+        "RENAME CONSTRAINT borrowed_books_pkey TO borrowed_books_unpartitioned_pkey"
+    )
+    op.execute(
+        "CREATE TABLE borrowed_books ("
+        "id INTEGER NOT NULL DEFAULT nextval('borrowed_books_id_seq'::regclass), "
+        "book_id INTEGER NOT NULL REFERENCES books (id), "
+        "reader_id INTEGER NOT NULL REFERENCES readers (id), "
+        "borrow_date TIMESTAMP WITHOUT TIME ZONE NOT NULL, "
+        "return_date TIMESTAMP WITHOUT TIME ZONE, "
+        "CONSTRAINT borrowed_books_pkey PRIMARY KEY (id, borrow_date)"
+        ") PARTITION BY RANGE (borrow_date)"
+    )
+    op.execute("ALTER SEQUENCE borrowed_books_id_seq OWNED BY borrowed_books.id")
+
+    # One partition per month from the oldest loan to MONTHS_AHEAD past the
+    # current month, named borrowed_books_pYYYY_MM.
+    op.execute(
+        f"""
+        DO $$
+        DECLARE
+            current date := date_trunc('month', now() AT TIME ZONE 'UTC');
+            month date;
+        BEGIN
+            month := coalesce(
+                date_trunc('month', (SELECT min(borrow_date)
+                                     FROM borrowed_books_unpartitioned)),
+                current
+            );
+            WHILE month <= current + interval '{MONTHS_AHEAD} months' LOOP
+                EXECUTE format(
+                    'CREATE TABLE %I PARTITION OF borrowed_books '
+                    'FOR VALUES FROM (%L) TO (%L)',
+                    'borrowed_books_p' || to_char(month, 'YYYY_MM'),
+                    month,
+                    month + interval '1 month'
+                );
+                month := month + interval '1 month';
+            END LOOP;
+        END $$
+        """
+    )
+    op.execute("CREATE TABLE borrowed_books_default PARTITION OF borrowed_books DEFAULT")
+
+    op.execute(
+        "INSERT INTO borrowed_books (id, book_id, reader_id, borrow_date, return_date) "
+        "SELECT id, book_id, reader_id, borrow_date, return_date "
+        "FROM borrowed_books_unpartitioned"
+    )
+    op.execute("DROP TABLE borrowed_books_unpartitioned")
+    # Created on the parent, so Postgres builds them on every partition.
+    op.create_index("ix_borrowed_books_id", "borrowed_books", ["id"], unique=False)
+    op.create_index(
+        "ix_borrowed_books_active_reader",
+        "borrowed_books",
+        ["reader_id"],
+        unique=False,
+        postgresql_where=sa.text("return_date IS NULL"),
+    )
+    op.create_index(
+        "ix_borrowed_books_reader_borrow_date",
+        "borrowed_books",
+        ["reader_id", "borrow_date", "id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("ALTER TABLE borrowed_books RENAME TO borrowed_books_partitioned")
+    op.execute(
+        "ALTER TABLE borrowed_books_partitioned "
+        "RENAME CONSTRAINT borrowed_books_pkey TO borrowed_books_partitioned_pkey"
+    )
+    op.drop_index(
+        "ix_borrowed_books_reader_borrow_date", table_name="borrowed_books_partitioned"
+    )
+    op.drop_index(
+        "ix_borrowed_books_active_reader", table_name="borrowed_books_partitioned"
+    )
+    op.drop_index("ix_borrowed_books_id", table_name="borrowed_books_partitioned")
+    op.create_table(
+        "borrowed_books",
+        sa.Column(
+            "id",
+            sa.Integer(),
+            server_default=sa.text("nextval('borrowed_books_id_seq'::regclass)"),
+            nullable=False,
+        ),
+        sa.Column("book_id", sa.Integer(), nullable=False),
+        sa.Column("reader_id", sa.Integer(), nullable=False),
+        sa.Column("borrow_date", sa.DateTime(), nullable=False),
+        sa.Column("return_date", sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(["book_id"], ["books.id"]),
+        sa.ForeignKeyConstraint(["reader_id"], ["readers.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.execute("ALTER SEQUENCE borrowed_books_id_seq OWNED BY borrowed_books.id")
+    op.execute(
+        "INSERT INTO borrowed_books (id, book_id, reader_id, borrow_date, return_date) "
+        "SELECT id, book_id, reader_id, borrow_date, return_date "
+        "FROM borrowed_books_partitioned"
+    )
+    op.execute("DROP TABLE borrowed_books_partitioned CASCADE")
+    op.create_index("ix_borrowed_books_id", "borrowed_books", ["id"], unique=False)
+    op.create_index(
+        "ix_borrowed_books_active_reader",
+        "borrowed_books",
+        ["reader_id"],
+        unique=False,
+        postgresql_where=sa.text("return_date IS NULL"),
+    )
+    op.create_index(
+        "ix_borrowed_books_reader_borrow_date",
+        "borrowed_books",
+        ["reader_id", "borrow_date", "id"],
+        unique=False,
+    )
@@ -0,0 +1,33 @@
+"""add_keyset_pagination_indexes
+
+Revision ID: 3b9d0c7e4a21
+Revises: 67e02085f82c
+Create Date: 2025-07-02 10:14:37.218604
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "3b9d0c7e4a21"
+down_revision: Union[str, None] = "67e02085f82c"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index("ix_books_title_id", "books", ["title", "id"], unique=False)
+    op.create_index("ix_books_author_id", "books", ["author", "id"], unique=False)
+    op.create_index("ix_readers_name_id", "readers", ["name", "id"], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_readers_name_id", table_name="readers")
+    op.drop_index("ix_books_author_id", table_name="books")
+    op.drop_index("ix_books_title_id", table_name="books")
@@ -0,0 +1,47 @@
+"""add_row_versions
+
+Revision ID: 5e27b0f6d1a9
+Revises: c4a8e1d93f05
+Create Date: 2025-07-09 14:27:51.660284
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "5e27b0f6d1a9"
+down_revision: Union[str, None] = "c4a8e1d93f05"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "books",
+        sa.Column("version", sa.Integer(), server_default="1", nullable=False),
+    )
+    op.add_column(
+        "readers",
+        sa.Column(
+            "updated_at",
+            sa.DateTime(),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+    )
+    op.add_column(
+        "readers",
+        sa.Column("version", sa.Integer(), server_default="1", nullable=False),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("readers", "version")
+    op.drop_column("readers", "updated_at")
+    op.drop_column("books", "version")
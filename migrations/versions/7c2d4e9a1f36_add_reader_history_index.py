@@ -0,0 +1,36 @@
+"""add_reader_history_index
+
+Revision ID: 7c2d4e9a1f36
+Revises: d81f3a6c2b57
+Create Date: 2025-07-14 09:41:52.704113
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "7c2d4e9a1f36"
+down_revision: Union[str, None] = "d81f3a6c2b57"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        "ix_borrowed_books_reader_borrow_date",
+        "borrowed_books",
+        ["reader_id", "borrow_date", "id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(
+        "ix_borrowed_books_reader_borrow_date", table_name="borrowed_books"
+    )
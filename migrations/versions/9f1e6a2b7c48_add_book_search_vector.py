@@ -0,0 +1,43 @@
+"""add_book_search_vector
+
+Revision ID: 9f1e6a2b7c48
+Revises: 3b9d0c7e4a21
+Create Date: 2025-07-03 16:41:09.553127
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "9f1e6a2b7c48"
+down_revision: Union[str, None] = "3b9d0c7e4a21"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute(
+        "ALTER TABLE books ADD COLUMN search_vector tsvector GENERATED ALWAYS AS ("
+        "setweight(to_tsvector('simple', coalesce(title, '')), 'A') || "
+        "setweight(to_tsvector('simple', coalesce(author, '')), 'B') || "
+        "setweight(to_tsvector('simple', coalesce(description, '')), 'C')"
+        ") STORED"
+    )
+    op.create_index(
+        "ix_books_search_vector",
+        "books",
+        ["search_vector"],
+        unique=False,
+        postgresql_using="gin",
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_books_search_vector", table_name="books")
+    op.drop_column("books", "search_vector")
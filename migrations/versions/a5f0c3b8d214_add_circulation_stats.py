@@ -0,0 +1,101 @@
+"""add_circulation_stats
+
+Revision ID: a5f0c3b8d214
+Revises: 7c2d4e9a1f36
+Create Date: 2025-07-16 15:27:09.551840
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "a5f0c3b8d214"
+down_revision: Union[str, None] = "7c2d4e9a1f36"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "circulation_events",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("kind", sa.String(length=6), nullable=False),
+        sa.Column("borrow_id", sa.Integer(), nullable=False),
+        sa.Column("book_id", sa.Integer(), nullable=False),
+        sa.Column("reader_id", sa.Integer(), nullable=False),
+        sa.Column("borrow_date", sa.DateTime(), nullable=False),
+        sa.Column("occurred_at", sa.DateTime(), nullable=False),
+        sa.CheckConstraint("kind IN ('borrow', 'return')", name="check_event_kind"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_table(
+        "daily_circulation",
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("borrows", sa.Integer(), server_default="0", nullable=False),
+        sa.Column("returns", sa.Integer(), server_default="0", nullable=False),
+        sa.Column("open_loans", sa.Integer(), server_default="0", nullable=False),
+        sa.PrimaryKeyConstraint("day"),
+    )
+    op.create_table(
+        "daily_book_loans",
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("book_id", sa.Integer(), nullable=False),
+        sa.Column("borrows", sa.Integer(), server_default="0", nullable=False),
+        sa.PrimaryKeyConstraint("day", "book_id"),
+    )
+    op.create_table(
+        "daily_reader_activity",
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("reader_id", sa.Integer(), nullable=False),
+        sa.Column("borrows", sa.Integer(), server_default="0", nullable=False),
+        sa.Column("returns", sa.Integer(), server_default="0", nullable=False),
+        sa.PrimaryKeyConstraint("day", "reader_id"),
+    )
+    # Same result as `manage.py refresh-stats --rebuild`.
+    op.execute(
+        """
+        INSERT INTO daily_circulation (day, borrows, returns, open_loans)
+        SELECT day, sum(borrows), sum(returns), sum(open_loans) FROM (
+            SELECT borrow_date::date AS day, 1 AS borrows, 0 AS returns,
+                   CASE WHEN return_date IS NULL THEN 1 ELSE 0 END AS open_loans
+            FROM borrowed_books
+            UNION ALL
+            SELECT return_date::date, 0, 1, 0 FROM borrowed_books
+            WHERE return_date IS NOT NULL
+        ) AS events
+        GROUP BY day
+        """
+    )
+    op.execute(
+        """
+        INSERT INTO daily_book_loans (day, book_id, borrows)
+        SELECT borrow_date::date, book_id, count(*) FROM borrowed_books
+        GROUP BY borrow_date::date, book_id
+        """
+    )
+    op.execute(
+        """
+        INSERT INTO daily_reader_activity (day, reader_id, borrows, returns)
+        SELECT day, reader_id, sum(borrows), sum(returns) FROM (
+            SELECT borrow_date::date AS day, reader_id, 1 AS borrows, 0 AS returns
+            FROM borrowed_books
+            UNION ALL
+            SELECT return_date::date, reader_id, 0, 1 FROM borrowed_books
+            WHERE return_date IS NOT NULL
+        ) AS events
+        GROUP BY day, reader_id
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("daily_reader_activity")
+    op.drop_table("daily_book_loans")
+    op.drop_table("daily_circulation")
+    op.drop_table("circulation_events")
@@ -0,0 +1,39 @@
+"""add_updated_at_to_books
+
+Revision ID: c4a8e1d93f05
+Revises: 9f1e6a2b7c48
+Create Date: 2025-07-07 11:02:45.903518
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "c4a8e1d93f05"
+down_revision: Union[str, None] = "9f1e6a2b7c48"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "books",
+        sa.Column(
+            "updated_at",
+            sa.DateTime(),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+    )
+    op.create_index(op.f("ix_books_updated_at"), "books", ["updated_at"], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f("ix_books_updated_at"), table_name="books")
+    op.drop_column("books", "updated_at")
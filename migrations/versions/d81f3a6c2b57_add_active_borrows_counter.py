@@ -0,0 +1,56 @@
+"""add_active_borrows_counter
+
+Revision ID: d81f3a6c2b57
+Revises: 5e27b0f6d1a9
+Create Date: 2025-07-11 10:02:14.318406
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "d81f3a6c2b57"
+down_revision: Union[str, None] = "5e27b0f6d1a9"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        "ix_borrowed_books_active_reader",
+        "borrowed_books",
+        ["reader_id"],
+        unique=False,
+        postgresql_where=sa.text("return_date IS NULL"),
+        sqlite_where=sa.text("return_date IS NULL"),
+    )
+    op.add_column(
+        "readers",
+        sa.Column("active_borrows", sa.Integer(), server_default="0", nullable=False),
+    )
+    op.execute(
+        """
+        UPDATE readers SET active_borrows = active.total
+        FROM (
+            SELECT reader_id, count(*) AS total FROM borrowed_books
+            WHERE return_date IS NULL GROUP BY reader_id
+        ) AS active
+        WHERE readers.id = active.reader_id
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("readers", "active_borrows")
+    op.drop_index(
+        "ix_borrowed_books_active_reader",
+        table_name="borrowed_books",
+        postgresql_where=sa.text("return_date IS NULL"),
+        sqlite_where=sa.text("return_date IS NULL"),
+    )
@@ -1,6 +1,17 @@
+from .admin import router as admin_router
 from .auth import router as auth_router
 from .books import router as books_router
+from .books_async import router as books_async_router
 from .borrow import router as borrow_router
 from .readers import router as readers_router
+from .readers_async import router as readers_async_router
 
-__all__ = ["auth_router", "books_router", "borrow_router", "readers_router"]
+__all__ = [
+    "admin_router",
+    "auth_router",
+    "books_router",
+    "books_async_router",
+    "borrow_router",
+    "readers_router",
+    "readers_async_router",
+]
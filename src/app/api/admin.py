@@ -0,0 +1,37 @@
+from fastapi import APIRouter, Depends
+import logging
+
+from app.core.admission import admission
+from app.core.cache import entity_cache
+from app.core.hashing import password_hasher
+from app.core.security import get_current_user
+from app.db.session import async_pool_metrics, pool_metrics, replica_router
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(tags=["Admin"], dependencies=[Depends(get_current_user)])
+
+
+@router.get("/cache")
+def cache_stats():
+    return entity_cache.stats()
+
+
+@router.get("/admission")
+def admission_stats():
+    return admission.stats()
+
+
+@router.get("/hashing")
+def hashing_stats():
+    return password_hasher.stats()
+
+
+@router.get("/pool")
+def pool_stats():
+    return {
+        "sync": pool_metrics.stats(),
+        # Only present once the async engine has been created.
+        "async": async_pool_metrics.stats() if async_pool_metrics.pool else None,
+        "replicas": replica_router.stats(),
+    }
@@ -1,12 +1,13 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
 from datetime import timedelta
 import logging
 
 from app.core.config import settings
+from app.core.hashing import HashingBusy, password_hasher
 from app.core.security import create_access_token
-from app.core.password import get_password_hash
 from app.crud.user import user as crud_user
 from app.db.session import get_db
 from app.schemas.token import Token
@@ -17,18 +18,40 @@ logger = logging.getLogger(__name__)
 router = APIRouter(tags=["Authentication"])
 
 
+def busy_exception(e: HashingBusy) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Authentication is busy, try again later",
+        headers={"Retry-After": str(e.retry_after)},
+    )
+
+
 @router.post("/register", response_model=Token, status_code=status.HTTP_201_CREATED)
-def register(user_in: UserCreate, db: Session = Depends(get_db)):
-    existing_user = crud_user.get_by_email(db, email=user_in.email)
+async def register(user_in: UserCreate, db: Session = Depends(get_db)):
+    try:
+        password_hasher.check_capacity()
+    except HashingBusy as e:
+        raise busy_exception(e)
+
+    existing_user = await run_in_threadpool(
+        crud_user.get_by_email, db, email=user_in.email
+    )
     if existing_user:
-        logger.warning(f"Registration attempt with existing email: {user_in.email}")
+        logger.warning("Registration attempt with existing email: %s", user_in.email)
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST, detail="Email already registered"
         )
 
-    hashed_password = get_password_hash(user_in.password)
-    db_user = crud_user.create(db, email=user_in.email, hashed_password=hashed_password)
-    logger.info(f"New user registered: {db_user.email}")
+    # Release the connection while the hash runs.
+    await run_in_threadpool(db.rollback)
+    try:
+        hashed_password = await password_hasher.hash(user_in.password)
+    except HashingBusy as e:
+        raise busy_exception(e)
+    db_user = await run_in_threadpool(
+        crud_user.create, db, email=user_in.email, hashed_password=hashed_password
+    )
+    logger.info("New user registered: %s", db_user.email)
 
     access_token = create_access_token(
         subject=str(db_user.id),
@@ -39,15 +62,18 @@ def register(user_in: UserCreate, db: Session = Depends(get_db)):
 
 
 @router.post("/login", response_model=Token)
-def login(
+async def login(
     form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)
 ):
-    user = crud_user.authenticate(
-        db, email=form_data.username, password=form_data.password
-    )
+    try:
+        user = await crud_user.authenticate_async(
+            db, email=form_data.username, password=form_data.password
+        )
+    except HashingBusy as e:
+        raise busy_exception(e)
 
     if not user:
-        logger.warning(f"Failed login attempt for email: {form_data.username}")
+        logger.warning("Failed login attempt for email: %s", form_data.username)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
@@ -59,5 +85,5 @@ def login(
         expires_delta=timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES),
     )
 
-    logger.info(f"User logged in: {user.email}")
+    logger.info("User logged in: %s", user.email)
     return {"access_token": access_token, "token_type": "bearer"}
@@ -1,11 +1,39 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import (
+    APIRouter,
+    Depends,
+    File,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+    UploadFile,
+    status,
+)
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from sqlalchemy.orm import Session
+from sqlalchemy.orm.exc import StaleDataError
+from typing import Literal, Optional
+from datetime import datetime
 import logging
 
+from app.core.importer import DEFAULT_BATCH_SIZE, detect_format, import_books
+from app.core.compression import GzipEncoder, encode_stream
+from app.core.config import settings
+from app.core.conditional import (
+    check_if_match,
+    collection_etag,
+    entity_etag,
+    is_not_modified,
+    not_modified,
+    payload_response,
+    set_validators,
+)
+from app.core.fields import InvalidFields, parse_fields, project
+from app.core.pagination import InvalidCursor
 from app.core.security import get_current_user
 from app.crud.book import book as crud_book
-from app.db.session import get_db
-from app.schemas.book import BookCreate, BookUpdate, BookRead
+from app.db.session import get_db, get_read_db
+from app.schemas.book import BookCreate, BookUpdate, BookRead, BookImportReport
 
 logger = logging.getLogger(__name__)
 
@@ -17,54 +45,174 @@ router = APIRouter(
 @router.post("/", response_model=BookRead, status_code=status.HTTP_201_CREATED)
 def create_book(book_in: BookCreate, db: Session = Depends(get_db)):
     if book_in.isbn and crud_book.get_by_isbn(db, isbn=book_in.isbn):
-        logger.warning(f"Book creation with duplicate ISBN: {book_in.isbn}")
+        logger.warning("Book creation with duplicate ISBN: %s", book_in.isbn)
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Book with this ISBN already exists",
         )
 
     book = crud_book.create(db, obj_in=book_in)
-    logger.info(f"Book created: ID={book.id}, Title={book.title}")
     return book
 
 
+@router.post("/import", response_model=BookImportReport)
+def import_books_file(
+    file: UploadFile = File(...),
+    fmt: Optional[Literal["csv", "ndjson"]] = Query(None, alias="format"),
+    batch_size: int = Query(DEFAULT_BATCH_SIZE, ge=1, le=10000),
+    db: Session = Depends(get_db),
+):
+    fmt = fmt or detect_format(file.filename, file.content_type)
+    report = import_books(db, file.file, fmt, batch_size=batch_size)
+    logger.info(
+        "Imported %s of %s books from %s", report.imported, report.total, file.filename
+    )
+    return report
+
+
 @router.get("/", response_model=list[BookRead])
-def read_books(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    books = crud_book.get_multi(db, skip=skip, limit=limit)
-    logger.info(f"Read {len(books)} books")
-    return books
+def read_books(
+    request: Request,
+    skip: Optional[int] = Query(None, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    sort: Literal["id", "title", "author"] = "id",
+    db: Session = Depends(get_read_db),
+):
+    try:
+        fields = parse_fields(
+            fields, crud_book.LIST_FIELDS, crud_book.DEFAULT_LIST_FIELDS
+        )
+    except InvalidFields as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    next_cursor = None
+    if skip is not None:
+        books = crud_book.get_multi(db, skip=skip, limit=limit, fields=fields)
+    else:
+        try:
+            books, next_cursor = crud_book.get_page(
+                db, sort=sort, cursor=cursor, limit=limit, fields=fields
+            )
+        except InvalidCursor as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    headers = {"X-Next-Cursor": next_cursor} if next_cursor else {}
+    etag = collection_etag(
+        ((b.id, b.version) for b in books), skip, limit, cursor, sort, fields
+    )
+    last_modified = max((b.updated_at for b in books), default=None)
+    if is_not_modified(request, etag, last_modified):
+        return not_modified(etag, last_modified, headers)
+
+    # Rows go straight to orjson: returning a Response skips the
+    # response_model validation, which only documents the shape here.
+    response = ORJSONResponse(project(books, fields), headers=headers)
+    set_validators(response, etag, last_modified)
+    logger.info("Read %s books", len(books))
+    return response
+
+
+@router.get("/export", response_class=StreamingResponse)
+def export_books(
+    since: Optional[datetime] = None,
+    compress: bool = Query(False, alias="gzip"),
+    db: Session = Depends(get_read_db),
+):
+    chunks = crud_book.stream_export(db.get_bind(), since=since)
+    headers = {"Content-Disposition": 'attachment; filename="books.ndjson"'}
+    # ?gzip=true predates CompressionMiddleware, which passes bodies that
+    # already have a Content-Encoding through as they are.
+    if compress:
+        chunks = encode_stream(GzipEncoder(settings.COMPRESSION_GZIP_LEVEL), chunks)
+        headers["Content-Encoding"] = "gzip"
+
+    logger.info("Book export started: since=%s, gzip=%s", since, compress)
+    return StreamingResponse(chunks, media_type="application/x-ndjson", headers=headers)
+
+
+@router.get("/search", response_model=list[BookRead])
+def search_books(
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(20, ge=1, le=100),
+    fields: Optional[str] = None,
+    db: Session = Depends(get_read_db),
+):
+    try:
+        fields = parse_fields(
+            fields, crud_book.LIST_FIELDS, crud_book.DEFAULT_LIST_FIELDS
+        )
+    except InvalidFields as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    books = crud_book.search(db, q=q, limit=limit, fields=fields)
+    logger.info("Search '%s' returned %s books", q, len(books))
+    return ORJSONResponse(project(books, fields))
+
+
+# Single-book reads stay on the primary: they fill the shared entity cache,
+# which must not be repopulated from a replica that has not seen the write
+# that just invalidated it.
+@router.get("/isbn/{isbn}", response_model=BookRead)
+def read_book_by_isbn(request: Request, isbn: str, db: Session = Depends(get_db)):
+    payload = crud_book.get_payload_by_isbn(db, isbn=isbn)
+    if payload is None:
+        logger.warning("Book not found: ISBN=%s", isbn)
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Book not found"
+        )
+    return payload_response(request, payload)
 
 
 @router.get("/{book_id}", response_model=BookRead)
-def read_book(book_id: int, db: Session = Depends(get_db)):
-    book = crud_book.get(db, id=book_id)
-    if not book:
-        logger.warning(f"Book not found: ID={book_id}")
+def read_book(request: Request, book_id: int, db: Session = Depends(get_db)):
+    payload = crud_book.get_payload(db, id=book_id)
+    if payload is None:
+        logger.warning("Book not found: ID=%s", book_id)
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Book not found"
         )
-    return book
+    return payload_response(request, payload)
 
 
 @router.put("/{book_id}", response_model=BookRead)
-def update_book(book_id: int, book_in: BookUpdate, db: Session = Depends(get_db)):
+def update_book(
+    request: Request,
+    response: Response,
+    book_id: int,
+    book_in: BookUpdate,
+    db: Session = Depends(get_db),
+):
     book = crud_book.get(db, id=book_id)
     if not book:
-        logger.warning(f"Book update failed: ID={book_id} not found")
+        logger.warning("Book update failed: ID=%s not found", book_id)
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Book not found"
         )
+    check_if_match(request, entity_etag(book.id, book.version))
 
     if book_in.isbn and book_in.isbn != book.isbn:
         if crud_book.get_by_isbn(db, isbn=book_in.isbn):
-            logger.warning(f"Book update with duplicate ISBN: {book_in.isbn}")
+            logger.warning("Book update with duplicate ISBN: %s", book_in.isbn)
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Book with this ISBN already exists",
             )
 
-    updated_book = crud_book.update(db, db_obj=book, obj_in=book_in)
-    logger.info(f"Book updated: ID={updated_book.id}")
+    try:
+        updated_book = crud_book.update(db, db_obj=book, obj_in=book_in)
+    except StaleDataError:
+        logger.warning("Book update lost a concurrent write race: ID=%s", book_id)
+        raise HTTPException(
+            status_code=status.HTTP_412_PRECONDITION_FAILED,
+            detail="Resource has been modified",
+        )
+    set_validators(
+        response,
+        entity_etag(updated_book.id, updated_book.version),
+        updated_book.updated_at,
+    )
     return updated_book
 
 
@@ -72,11 +220,10 @@ def update_book(book_id: int, book_in: BookUpdate, db: Session = Depends(get_db)
 def delete_book(book_id: int, db: Session = Depends(get_db)):
     book = crud_book.get(db, id=book_id)
     if not book:
-        logger.warning(f"Book delete failed: ID={book_id} not found")
+        logger.warning("Book delete failed: ID=%s not found", book_id)
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Book not found"
         )
 
     crud_book.remove(db, id=book_id)
-    logger.info(f"Book deleted: ID={book_id}")
     return None
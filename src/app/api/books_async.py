@@ -0,0 +1,166 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import ORJSONResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm.exc import StaleDataError
+from typing import Literal, Optional
+import logging
+
+from app.core.conditional import (
+    check_if_match,
+    collection_etag,
+    entity_etag,
+    is_not_modified,
+    not_modified,
+    payload_response,
+    set_validators,
+)
+from app.core.fields import InvalidFields, parse_fields, project
+from app.core.pagination import InvalidCursor
+from app.core.security import get_current_user_async
+from app.crud.book import async_book as crud_book
+from app.db.session import get_async_db
+from app.schemas.book import BookCreate, BookUpdate, BookRead
+
+logger = logging.getLogger(__name__)
+
+# Included ahead of app.api.books when DB_ASYNC is on. Paths use the int
+# convertor so /search, /export and /import fall through to the sync router.
+router = APIRouter(tags=["Books"], dependencies=[Depends(get_current_user_async)])
+
+
+@router.post("/", response_model=BookRead, status_code=status.HTTP_201_CREATED)
+async def create_book_async(
+    book_in: BookCreate, db: AsyncSession = Depends(get_async_db)
+):
+    if book_in.isbn and await crud_book.get_by_isbn(db, isbn=book_in.isbn):
+        logger.warning("Book creation with duplicate ISBN: %s", book_in.isbn)
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Book with this ISBN already exists",
+        )
+
+    book = await crud_book.create(db, obj_in=book_in)
+    return book
+
+
+@router.get("/", response_model=list[BookRead])
+async def read_books_async(
+    request: Request,
+    skip: Optional[int] = Query(None, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    sort: Literal["id", "title", "author"] = "id",
+    db: AsyncSession = Depends(get_async_db),
+):
+    try:
+        fields = parse_fields(
+            fields, crud_book.LIST_FIELDS, crud_book.DEFAULT_LIST_FIELDS
+        )
+    except InvalidFields as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    next_cursor = None
+    if skip is not None:
+        books = await crud_book.get_multi(db, skip=skip, limit=limit, fields=fields)
+    else:
+        try:
+            books, next_cursor = await crud_book.get_page(
+                db, sort=sort, cursor=cursor, limit=limit, fields=fields
+            )
+        except InvalidCursor as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    headers = {"X-Next-Cursor": next_cursor} if next_cursor else {}
+    etag = collection_etag(
+        ((b.id, b.version) for b in books), skip, limit, cursor, sort, fields
+    )
+    last_modified = max((b.updated_at for b in books), default=None)
+    if is_not_modified(request, etag, last_modified):
+        return not_modified(etag, last_modified, headers)
+
+    # Only the requested columns were loaded, so the instances are projected
+    # here instead of going through response_model, which would touch the rest.
+    response = ORJSONResponse(project(books, fields), headers=headers)
+    set_validators(response, etag, last_modified)
+    logger.info("Read %s books", len(books))
+    return response
+
+
+@router.get("/isbn/{isbn}", response_model=BookRead)
+async def read_book_by_isbn_async(
+    request: Request, isbn: str, db: AsyncSession = Depends(get_async_db)
+):
+    payload = await crud_book.get_payload_by_isbn(db, isbn=isbn)
+    if payload is None:
+        logger.warning("Book not found: ISBN=%s", isbn)
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Book not found"
+        )
+    return payload_response(request, payload)
+
+
+@router.get("/{book_id:int}", response_model=BookRead)
+async def read_book_async(
+    request: Request, book_id: int, db: AsyncSession = Depends(get_async_db)
+):
+    payload = await crud_book.get_payload(db, id=book_id)
+    if payload is None:
+        logger.warning("Book not found: ID=%s", book_id)
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Book not found"
+        )
+    return payload_response(request, payload)
+
+
+@router.put("/{book_id:int}", response_model=BookRead)
+async def update_book_async(
+    request: Request,
+    response: Response,
+    book_id: int,
+    book_in: BookUpdate,
+    db: AsyncSession = Depends(get_async_db),
+):
+    book = await crud_book.get(db, id=book_id)
+    if not book:
+        logger.warning("Book update failed: ID=%s not found", book_id)
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Book not found"
+        )
+    check_if_match(request, entity_etag(book.id, book.version))
+
+    if book_in.isbn and book_in.isbn != book.isbn:
+        if await crud_book.get_by_isbn(db, isbn=book_in.isbn):
+            logger.warning("Book update with duplicate ISBN: %s", book_in.isbn)
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Book with this ISBN already exists",
+            )
+
+    try:
+        updated_book = await crud_book.update(db, db_obj=book, obj_in=book_in)
+    except StaleDataError:
+        logger.warning("Book update lost a concurrent write race: ID=%s", book_id)
+        raise HTTPException(
+            status_code=status.HTTP_412_PRECONDITION_FAILED,
+            detail="Resource has been modified",
+        )
+    set_validators(
+        response,
+        entity_etag(updated_book.id, updated_book.version),
+        updated_book.updated_at,
+    )
+    return updated_book
+
+
+@router.delete("/{book_id:int}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_book_async(book_id: int, db: AsyncSession = Depends(get_async_db)):
+    book = await crud_book.get(db, id=book_id)
+    if not book:
+        logger.warning("Book delete failed: ID=%s not found", book_id)
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Book not found"
+        )
+
+    await crud_book.remove(db, id=book_id)
+    return None
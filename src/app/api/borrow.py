@@ -1,80 +1,101 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from sqlalchemy.orm import Session
 from datetime import datetime
+from typing import Literal, Optional
 import logging
 
+from app.core.pagination import InvalidCursor
 from app.core.security import get_current_user
-from app.crud.borrow import borrow as crud_borrow
-from app.crud.book import book as crud_book
+from app.crud.borrow import (
+    BookNotFound,
+    BorrowError,
+    BatchOutcome,
+    BorrowNotFound,
+    NoOpenLoan,
+    ReaderNotFound,
+    borrow as crud_borrow,
+)
 from app.crud.reader import reader as crud_reader
 from app.db.session import get_db
-from app.schemas.borrow import BorrowRead, BorrowCreate
+from app.schemas.borrow import (
+    BatchItemResult,
+    BatchReport,
+    BorrowBatchCreate,
+    BorrowCreate,
+    BorrowHistoryRead,
+    BorrowRead,
+    ReturnBatch,
+)
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(tags=["Borrow"], dependencies=[Depends(get_current_user)])
 
 
+def borrow_http_error(e: BorrowError) -> HTTPException:
+    if isinstance(e, (BookNotFound, ReaderNotFound, BorrowNotFound, NoOpenLoan)):
+        return HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    return HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
+def batch_report(outcomes: list[BatchOutcome], created: int) -> BatchReport:
+    results = []
+    for index, outcome in enumerate(outcomes):
+        if isinstance(outcome, BorrowError):
+            error = borrow_http_error(outcome)
+            results.append(
+                BatchItemResult(
+                    index=index, status_code=error.status_code, detail=error.detail
+                )
+            )
+        else:
+            results.append(
+                BatchItemResult(
+                    index=index,
+                    status_code=created,
+                    borrow=BorrowRead.model_validate(outcome),
+                )
+            )
+    failed = sum(1 for r in results if r.borrow is None)
+    return BatchReport(succeeded=len(results) - failed, failed=failed, results=results)
+
+
 @router.post("/", response_model=BorrowRead, status_code=status.HTTP_201_CREATED)
 def borrow_book(borrow_in: BorrowCreate, db: Session = Depends(get_db)):
-    book = crud_book.get(db, id=borrow_in.book_id)
-    if not book:
-        logger.warning(f"Borrow failed: Book ID={borrow_in.book_id} not found")
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Book not found"
+    try:
+        borrow_record = crud_borrow.create(db, obj_in=borrow_in)
+    except BorrowError as e:
+        logger.warning(
+            "Borrow failed: Book ID=%s, Reader ID=%s: %s",
+            borrow_in.book_id,
+            borrow_in.reader_id,
+            e,
         )
+        raise borrow_http_error(e)
+    return borrow_record
 
-    reader = crud_reader.get(db, id=borrow_in.reader_id)
-    if not reader:
-        logger.warning(f"Borrow failed: Reader ID={borrow_in.reader_id} not found")
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Reader not found"
-        )
 
-    if book.copies_available < 1:
-        logger.warning(f"Borrow failed: No available copies for book ID={book.id}")
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="No available copies of this book",
-        )
+@router.post("/batch", response_model=BatchReport)
+def borrow_batch(batch_in: BorrowBatchCreate, db: Session = Depends(get_db)):
+    outcomes = crud_borrow.create_batch(
+        db, reader_id=batch_in.reader_id, items=batch_in.items
+    )
+    return batch_report(outcomes, status.HTTP_201_CREATED)
 
-    active_borrows = crud_borrow.get_active_by_reader(db, reader_id=reader.id)
-    if len(active_borrows) >= 3:
-        logger.warning(f"Borrow failed: Reader ID={reader.id} has reached the limit")
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Reader has reached the maximum limit of borrowed books",
-        )
 
-    borrow_record = crud_borrow.create(db, obj_in=borrow_in)
-    logger.info(
-        f"Book borrowed: Book ID={book.id} by Reader ID={reader.id}, Record ID={borrow_record.id}"
-    )
-    return borrow_record
+@router.post("/return/batch", response_model=BatchReport)
+def return_batch(batch_in: ReturnBatch, db: Session = Depends(get_db)):
+    outcomes = crud_borrow.return_batch(db, items=batch_in.items)
+    return batch_report(outcomes, status.HTTP_200_OK)
 
 
 @router.post("/return/{borrow_id}", response_model=BorrowRead)
 def return_book(borrow_id: int, db: Session = Depends(get_db)):
-    borrow_record = crud_borrow.get(db, id=borrow_id)
-    if not borrow_record:
-        logger.warning(f"Return failed: Borrow record ID={borrow_id} not found")
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Borrow record not found"
-        )
-
-    if borrow_record.return_date:
-        logger.warning(
-            f"Return failed: Book already returned for record ID={borrow_id}"
-        )
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="This book has already been returned",
-        )
-
-    returned_record = crud_borrow.return_book(db, db_obj=borrow_record)
-    logger.info(
-        f"Book returned: Record ID={returned_record.id}, Book ID={returned_record.book_id}"
-    )
+    try:
+        returned_record = crud_borrow.return_book(db, id=borrow_id)
+    except BorrowError as e:
+        logger.warning("Return failed: Borrow record ID=%s: %s", borrow_id, e)
+        raise borrow_http_error(e)
     return returned_record
 
 
@@ -82,11 +103,46 @@ def return_book(borrow_id: int, db: Session = Depends(get_db)):
 def get_reader_borrows(reader_id: int, db: Session = Depends(get_db)):
     reader = crud_reader.get(db, id=reader_id)
     if not reader:
-        logger.warning(f"Get borrows failed: Reader ID={reader_id} not found")
+        logger.warning("Get borrows failed: Reader ID=%s not found", reader_id)
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Reader not found"
         )
 
     borrows = crud_borrow.get_active_by_reader(db, reader_id=reader_id)
-    logger.info(f"Retrieved {len(borrows)} active borrows for Reader ID={reader_id}")
+    logger.info("Retrieved %s active borrows for Reader ID=%s", len(borrows), reader_id)
+    return borrows
+
+
+@router.get("/reader/{reader_id}/history", response_model=list[BorrowHistoryRead])
+def get_reader_history(
+    reader_id: int,
+    response: Response,
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    status_filter: Literal["all", "active", "returned"] = Query("all", alias="status"),
+    db: Session = Depends(get_db),
+):
+    if not crud_reader.get(db, id=reader_id):
+        logger.warning("Get history failed: Reader ID=%s not found", reader_id)
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Reader not found"
+        )
+
+    try:
+        borrows, next_cursor = crud_borrow.get_history(
+            db,
+            reader_id=reader_id,
+            limit=limit,
+            cursor=cursor,
+            since=since,
+            until=until,
+            status=status_filter,
+        )
+    except InvalidCursor as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
     return borrows
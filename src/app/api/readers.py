@@ -1,10 +1,32 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import (
+    APIRouter,
+    Depends,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+    status,
+)
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.orm import Session
+from sqlalchemy.orm.exc import StaleDataError
+from typing import Literal, Optional
 import logging
 
+from app.core.conditional import (
+    check_if_match,
+    collection_etag,
+    entity_etag,
+    is_not_modified,
+    not_modified,
+    payload_response,
+    set_validators,
+)
+from app.core.fields import InvalidFields, parse_fields, project
+from app.core.pagination import InvalidCursor
 from app.core.security import get_current_user
 from app.crud.reader import reader as crud_reader
-from app.db.session import get_db
+from app.db.session import get_db, get_read_db
 from app.schemas.reader import ReaderCreate, ReaderUpdate, ReaderRead
 
 logger = logging.getLogger(__name__)
@@ -15,55 +37,108 @@ router = APIRouter(tags=["Readers"], dependencies=[Depends(get_current_user)])
 @router.post("/", response_model=ReaderRead, status_code=status.HTTP_201_CREATED)
 def create_reader(reader_in: ReaderCreate, db: Session = Depends(get_db)):
     if crud_reader.get_by_email(db, email=reader_in.email):
-        logger.warning(f"Reader creation with duplicate email: {reader_in.email}")
+        logger.warning("Reader creation with duplicate email: %s", reader_in.email)
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST, detail="Email already registered"
         )
 
     reader = crud_reader.create(db, obj_in=reader_in)
-    logger.info(f"Reader created: ID={reader.id}, Name={reader.name}")
     return reader
 
 
 @router.get("/", response_model=list[ReaderRead])
-def read_readers(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    readers = crud_reader.get_multi(db, skip=skip, limit=limit)
-    logger.info(f"Read {len(readers)} readers")
-    return readers
-
-
+def read_readers(
+    request: Request,
+    skip: Optional[int] = Query(None, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    sort: Literal["id", "name", "email"] = "id",
+    db: Session = Depends(get_read_db),
+):
+    try:
+        fields = parse_fields(
+            fields, crud_reader.LIST_FIELDS, crud_reader.DEFAULT_LIST_FIELDS
+        )
+    except InvalidFields as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    next_cursor = None
+    if skip is not None:
+        readers = crud_reader.get_multi(db, skip=skip, limit=limit, fields=fields)
+    else:
+        try:
+            readers, next_cursor = crud_reader.get_page(
+                db, sort=sort, cursor=cursor, limit=limit, fields=fields
+            )
+        except InvalidCursor as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    headers = {"X-Next-Cursor": next_cursor} if next_cursor else {}
+    etag = collection_etag(
+        ((r.id, r.version) for r in readers), skip, limit, cursor, sort, fields
+    )
+    last_modified = max((r.updated_at for r in readers), default=None)
+    if is_not_modified(request, etag, last_modified):
+        return not_modified(etag, last_modified, headers)
+
+    # Rows go straight to orjson: returning a Response skips the
+    # response_model validation, which only documents the shape here.
+    response = ORJSONResponse(project(readers, fields), headers=headers)
+    set_validators(response, etag, last_modified)
+    logger.info("Read %s readers", len(readers))
+    return response
+
+
+# Stays on the primary like GET /books/{book_id}: it fills the entity cache.
 @router.get("/{reader_id}", response_model=ReaderRead)
-def read_reader(reader_id: int, db: Session = Depends(get_db)):
-    reader = crud_reader.get(db, id=reader_id)
-    if not reader:
-        logger.warning(f"Reader not found: ID={reader_id}")
+def read_reader(request: Request, reader_id: int, db: Session = Depends(get_db)):
+    payload = crud_reader.get_payload(db, id=reader_id)
+    if payload is None:
+        logger.warning("Reader not found: ID=%s", reader_id)
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Reader not found"
         )
-    return reader
+    return payload_response(request, payload)
 
 
 @router.put("/{reader_id}", response_model=ReaderRead)
 def update_reader(
-    reader_id: int, reader_in: ReaderUpdate, db: Session = Depends(get_db)
+    request: Request,
+    response: Response,
+    reader_id: int,
+    reader_in: ReaderUpdate,
+    db: Session = Depends(get_db),
 ):
     reader = crud_reader.get(db, id=reader_id)
     if not reader:
-        logger.warning(f"Reader update failed: ID={reader_id} not found")
+        logger.warning("Reader update failed: ID=%s not found", reader_id)
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Reader not found"
         )
+    check_if_match(request, entity_etag(reader.id, reader.version))
 
     if reader_in.email and reader_in.email != reader.email:
         if crud_reader.get_by_email(db, email=reader_in.email):
-            logger.warning(f"Reader update with duplicate email: {reader_in.email}")
+            logger.warning("Reader update with duplicate email: %s", reader_in.email)
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Email already registered",
             )
 
-    updated_reader = crud_reader.update(db, db_obj=reader, obj_in=reader_in)
-    logger.info(f"Reader updated: ID={updated_reader.id}")
+    try:
+        updated_reader = crud_reader.update(db, db_obj=reader, obj_in=reader_in)
+    except StaleDataError:
+        logger.warning("Reader update lost a concurrent write race: ID=%s", reader_id)
+        raise HTTPException(
+            status_code=status.HTTP_412_PRECONDITION_FAILED,
+            detail="Resource has been modified",
+        )
+    set_validators(
+        response,
+        entity_etag(updated_reader.id, updated_reader.version),
+        updated_reader.updated_at,
+    )
     return updated_reader
 
 
@@ -71,11 +146,10 @@ def update_reader(
 def delete_reader(reader_id: int, db: Session = Depends(get_db)):
     reader = crud_reader.get(db, id=reader_id)
     if not reader:
-        logger.warning(f"Reader delete failed: ID={reader_id} not found")
+        logger.warning("Reader delete failed: ID=%s not found", reader_id)
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Reader not found"
         )
 
     crud_reader.remove(db, id=reader_id)
-    logger.info(f"Reader deleted: ID={reader_id}")
     return None
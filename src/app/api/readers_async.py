@@ -0,0 +1,150 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import ORJSONResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm.exc import StaleDataError
+from typing import Literal, Optional
+import logging
+
+from app.core.conditional import (
+    check_if_match,
+    collection_etag,
+    entity_etag,
+    is_not_modified,
+    not_modified,
+    payload_response,
+    set_validators,
+)
+from app.core.fields import InvalidFields, parse_fields, project
+from app.core.pagination import InvalidCursor
+from app.core.security import get_current_user_async
+from app.crud.reader import async_reader as crud_reader
+from app.db.session import get_async_db
+from app.schemas.reader import ReaderCreate, ReaderUpdate, ReaderRead
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(tags=["Readers"], dependencies=[Depends(get_current_user_async)])
+
+
+@router.post("/", response_model=ReaderRead, status_code=status.HTTP_201_CREATED)
+async def create_reader_async(
+    reader_in: ReaderCreate, db: AsyncSession = Depends(get_async_db)
+):
+    if await crud_reader.get_by_email(db, email=reader_in.email):
+        logger.warning("Reader creation with duplicate email: %s", reader_in.email)
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Email already registered"
+        )
+
+    reader = await crud_reader.create(db, obj_in=reader_in)
+    return reader
+
+
+@router.get("/", response_model=list[ReaderRead])
+async def read_readers_async(
+    request: Request,
+    skip: Optional[int] = Query(None, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    sort: Literal["id", "name", "email"] = "id",
+    db: AsyncSession = Depends(get_async_db),
+):
+    try:
+        fields = parse_fields(
+            fields, crud_reader.LIST_FIELDS, crud_reader.DEFAULT_LIST_FIELDS
+        )
+    except InvalidFields as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    next_cursor = None
+    if skip is not None:
+        readers = await crud_reader.get_multi(db, skip=skip, limit=limit, fields=fields)
+    else:
+        try:
+            readers, next_cursor = await crud_reader.get_page(
+                db, sort=sort, cursor=cursor, limit=limit, fields=fields
+            )
+        except InvalidCursor as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    headers = {"X-Next-Cursor": next_cursor} if next_cursor else {}
+    etag = collection_etag(
+        ((r.id, r.version) for r in readers), skip, limit, cursor, sort, fields
+    )
+    last_modified = max((r.updated_at for r in readers), default=None)
+    if is_not_modified(request, etag, last_modified):
+        return not_modified(etag, last_modified, headers)
+
+    # Only the requested columns were loaded, so the instances are projected
+    # here instead of going through response_model, which would touch the rest.
+    response = ORJSONResponse(project(readers, fields), headers=headers)
+    set_validators(response, etag, last_modified)
+    logger.info("Read %s readers", len(readers))
+    return response
+
+
+@router.get("/{reader_id:int}", response_model=ReaderRead)
+async def read_reader_async(
+    request: Request, reader_id: int, db: AsyncSession = Depends(get_async_db)
+):
+    payload = await crud_reader.get_payload(db, id=reader_id)
+    if payload is None:
+        logger.warning("Reader not found: ID=%s", reader_id)
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Reader not found"
+        )
+    return payload_response(request, payload)
+
+
+@router.put("/{reader_id:int}", response_model=ReaderRead)
+async def update_reader_async(
+    request: Request,
+    response: Response,
+    reader_id: int,
+    reader_in: ReaderUpdate,
+    db: AsyncSession = Depends(get_async_db),
+):
+    reader = await crud_reader.get(db, id=reader_id)
+    if not reader:
+        logger.warning("Reader update failed: ID=%s not found", reader_id)
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Reader not found"
+        )
+    check_if_match(request, entity_etag(reader.id, reader.version))
+
+    if reader_in.email and reader_in.email != reader.email:
+        if await crud_reader.get_by_email(db, email=reader_in.email):
+            logger.warning("Reader update with duplicate email: %s", reader_in.email)
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Email already registered",
+            )
+
+    try:
+        updated_reader = await crud_reader.update(db, db_obj=reader, obj_in=reader_in)
+    except StaleDataError:
+        logger.warning("Reader update lost a concurrent write race: ID=%s", reader_id)
+        raise HTTPException(
+            status_code=status.HTTP_412_PRECONDITION_FAILED,
+            detail="Resource has been modified",
+        )
+    set_validators(
+        response,
+        entity_etag(updated_reader.id, updated_reader.version),
+        updated_reader.updated_at,
+    )
+    return updated_reader
+
+
+@router.delete("/{reader_id:int}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_reader_async(reader_id: int, db: AsyncSession = Depends(get_async_db)):
+    reader = await crud_reader.get(db, id=reader_id)
+    if not reader:
+        logger.warning("Reader delete failed: ID=%s not found", reader_id)
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Reader not found"
+        )
+
+    await crud_reader.remove(db, id=reader_id)
+    return None
@@ -1,19 +1,32 @@
 from fastapi import APIRouter
 import logging
 
+from app.core.config import settings
+
+from .admin import router as admin_router
 from .auth import router as auth_router
 from .books import router as books_router
+from .books_async import router as books_async_router
 from .borrow import router as borrow_router
 from .readers import router as readers_router
+from .readers_async import router as readers_async_router
+from .stats import router as stats_router
 
 logger = logging.getLogger(__name__)
 
 api_router = APIRouter()
 
+if settings.DB_ASYNC:
+    # Async catalog routes shadow their sync twins; anything they do not
+    # cover (search, import, export) still matches the sync routers below.
+    api_router.include_router(books_async_router, prefix="/books", tags=["Books"])
+    api_router.include_router(readers_async_router, prefix="/readers", tags=["Readers"])
 api_router.include_router(auth_router, prefix="/auth", tags=["Authentication"])
 api_router.include_router(books_router, prefix="/books", tags=["Books"])
 api_router.include_router(borrow_router, prefix="/borrow", tags=["Borrow"])
 api_router.include_router(readers_router, prefix="/readers", tags=["Readers"])
+api_router.include_router(stats_router, prefix="/stats", tags=["Stats"])
+api_router.include_router(admin_router, prefix="/admin", tags=["Admin"])
 
 logger.info("API router initialized with all endpoints")
 
@@ -0,0 +1,85 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.orm import Session
+from datetime import date, timedelta
+from typing import Optional, Tuple
+import logging
+
+from app.core.config import settings
+from app.core.refresher import stats_refresher
+from app.core.security import get_current_user
+from app.crud.stats import stats as crud_stats
+from app.db.models import utcnow
+from app.db.session import get_read_db
+from app.schemas.stats import (
+    BookStats,
+    DailyStats,
+    OverdueStats,
+    ReaderActivity,
+    StatsRefreshReport,
+)
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(tags=["Stats"], dependencies=[Depends(get_current_user)])
+
+DEFAULT_RANGE_DAYS = 30
+
+
+def date_range(
+    since: Optional[date] = None, until: Optional[date] = None
+) -> Tuple[date, date]:
+    # Inclusive range of UTC days, the last 30 days by default.
+    until = until or utcnow().date()
+    since = since or until - timedelta(days=DEFAULT_RANGE_DAYS - 1)
+    if since > until:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="since must not be after until",
+        )
+    return since, until
+
+
+@router.get("/daily", response_model=list[DailyStats])
+def daily_stats(
+    days: Tuple[date, date] = Depends(date_range), db: Session = Depends(get_read_db)
+):
+    since, until = days
+    return crud_stats.daily(db, since=since, until=until)
+
+
+@router.get("/top-books", response_model=list[BookStats])
+def top_books(
+    days: Tuple[date, date] = Depends(date_range),
+    limit: int = Query(10, ge=1, le=100),
+    db: Session = Depends(get_read_db),
+):
+    since, until = days
+    rows = crud_stats.top_books(db, since=since, until=until, limit=limit)
+    return [{"book": book, "borrows": borrows} for book, borrows in rows]
+
+
+@router.get("/readers", response_model=ReaderActivity)
+def reader_activity(
+    days: Tuple[date, date] = Depends(date_range),
+    limit: int = Query(10, ge=1, le=100),
+    db: Session = Depends(get_read_db),
+):
+    since, until = days
+    return {
+        "active_readers": crud_stats.active_readers(db, since=since, until=until),
+        "top": crud_stats.top_readers(db, since=since, until=until, limit=limit),
+    }
+
+
+@router.get("/overdue", response_model=OverdueStats)
+def overdue_stats(db: Session = Depends(get_read_db)):
+    loan_days = settings.LOAN_PERIOD_DAYS
+    counts = crud_stats.overdue(db, today=utcnow().date(), loan_days=loan_days)
+    return {**counts, "loan_period_days": loan_days}
+
+
+@router.post("/refresh", response_model=StatsRefreshReport)
+def refresh_stats():
+    processed = stats_refresher.run_once()
+    logger.info("Manual stats refresh processed %s events", processed)
+    return {"processed": processed}
@@ -0,0 +1,139 @@
+from pathlib import Path
+import argparse
+import json
+import logging
+import sys
+
+from app.core.config import settings
+from app.core.importer import DEFAULT_BATCH_SIZE, FORMATS, detect_format, import_books
+from app.core.refresher import stats_refresher
+from app.crud.borrow import borrow as crud_borrow
+from app.crud.stats import stats as crud_stats
+from app.db.models import utcnow
+from app.db.partitions import add_months, archive_partitions, ensure_partitions
+from app.db.session import SessionLocal, engine
+
+logger = logging.getLogger(__name__)
+
+
+def cmd_import_books(args: argparse.Namespace) -> int:
+    path = Path(args.path)
+    fmt = args.format or detect_format(path.name, None)
+    db = SessionLocal()
+    try:
+        with path.open("rb") as stream:
+            report = import_books(db, stream, fmt, batch_size=args.batch_size)
+    finally:
+        db.close()
+
+    print(report.model_dump_json(indent=2))
+    return 0 if report.failed == 0 else 1
+
+
+def cmd_resync_active_borrows(args: argparse.Namespace) -> int:
+    db = SessionLocal()
+    try:
+        updated = crud_borrow.resync_active_borrows(db)
+    finally:
+        db.close()
+
+    print(f"Updated {updated} readers")
+    return 0
+
+
+def cmd_refresh_stats(args: argparse.Namespace) -> int:
+    if args.rebuild:
+        db = SessionLocal()
+        try:
+            days = crud_stats.rebuild(db)
+        finally:
+            db.close()
+        print(f"Rebuilt stats for {days} days")
+    else:
+        print(f"Processed {stats_refresher.run_once()} circulation events")
+    return 0
+
+
+def cmd_ensure_partitions(args: argparse.Namespace) -> int:
+    with engine.begin() as conn:
+        created = ensure_partitions(conn, months_ahead=args.months_ahead)
+    print(f"Created {len(created)} partitions")
+    return 0
+
+
+def cmd_archive_loans(args: argparse.Namespace) -> int:
+    before = add_months(utcnow().date(), -args.months)
+    with engine.begin() as conn:
+        report = archive_partitions(
+            conn,
+            before=before,
+            archive_schema=args.schema,
+            export_dir=Path(args.export_dir) if args.export_dir else None,
+        )
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="manage.py", description="Library API tools")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    import_parser = commands.add_parser(
+        "import-books", help="Bulk import books from a CSV or NDJSON file"
+    )
+    import_parser.add_argument("path")
+    import_parser.add_argument("--format", choices=FORMATS)
+    import_parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    import_parser.set_defaults(handler=cmd_import_books)
+
+    resync_parser = commands.add_parser(
+        "resync-active-borrows",
+        help="Recompute readers.active_borrows from open loans",
+    )
+    resync_parser.set_defaults(handler=cmd_resync_active_borrows)
+
+    stats_parser = commands.add_parser(
+        "refresh-stats", help="Fold pending circulation events into the stats rollups"
+    )
+    stats_parser.add_argument(
+        "--rebuild",
+        action="store_true",
+        help="Recompute the rollups from borrowed_books instead",
+    )
+    stats_parser.set_defaults(handler=cmd_refresh_stats)
+
+    partitions_parser = commands.add_parser(
+        "ensure-partitions", help="Create upcoming monthly borrowed_books partitions"
+    )
+    partitions_parser.add_argument(
+        "--months-ahead", type=int, default=settings.BORROW_PARTITION_MONTHS_AHEAD
+    )
+    partitions_parser.set_defaults(handler=cmd_ensure_partitions)
+
+    archive_parser = commands.add_parser(
+        "archive-loans", help="Detach borrowed_books partitions past the horizon"
+    )
+    archive_parser.add_argument(
+        "--months",
+        type=int,
+        default=settings.BORROW_ARCHIVE_AFTER_MONTHS,
+        help="archive partitions that ended more than this many months ago",
+    )
+    archive_parser.add_argument("--schema", default=settings.BORROW_ARCHIVE_SCHEMA)
+    archive_parser.add_argument(
+        "--export-dir",
+        help="write partitions as gzipped NDJSON here and drop them instead",
+    )
+    archive_parser.set_defaults(handler=cmd_archive_loans)
+
+    return parser
+
+
+def main(argv=None) -> int:
+    logging.basicConfig(level=logging.INFO)
+    args = build_parser().parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
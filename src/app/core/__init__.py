@@ -1,5 +1,4 @@
 from .config import settings
-from .security import create_access_token, get_current_user
 from .password import get_password_hash, verify_password
 
 __all__ = [
@@ -9,3 +8,13 @@ __all__ = [
     "get_password_hash",
     "verify_password",
 ]
+
+
+# security imports app.db.session, which reads settings while it is being
+# imported; loading it lazily lets app.db be imported before app.core.
+def __getattr__(name):
+    if name in ("create_access_token", "get_current_user"):
+        from . import security
+
+        return getattr(security, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,260 @@
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+import logging
+import math
+import threading
+import time
+
+import orjson
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers
+
+from app.core.config import settings
+from app.core.security import token_user_id
+from app.db.pool import PoolMetrics
+from app.db.session import async_pool_metrics, pool_metrics
+
+logger = logging.getLogger(__name__)
+
+# Never limited or shed: probes and scrapes must work when the API does not.
+EXEMPT_PATHS = {"/health", "/metrics", "/docs", "/redoc", "/openapi.json"}
+# Keyed by client IP: callers there have no token yet.
+AUTH_PREFIX = "/auth/"
+MAX_MEMORY_BUCKETS = 100000
+
+
+class BucketStore:
+    # take() removes cost tokens from the bucket at key and returns 0.0, or
+    # leaves it as it is and returns the seconds until it will hold cost.
+    name = "base"
+    # Blocking stores are called from the threadpool, off the event loop.
+    blocking = False
+
+    def take(self, key: str, rate: float, burst: int, cost: int) -> float:
+        raise NotImplementedError
+
+    def clear(self) -> None:
+        raise NotImplementedError
+
+
+class MemoryBucketStore(BucketStore):
+    name = "memory"
+
+    def __init__(
+        self,
+        max_keys: int = MAX_MEMORY_BUCKETS,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_keys = max_keys
+        self.clock = clock
+        # key -> [tokens, last refill]; least recently used first.
+        self._buckets: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(self, key: str, rate: float, burst: int, cost: int) -> float:
+        now = self.clock()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = [float(burst), now]
+                if len(self._buckets) > self.max_keys:
+                    self._buckets.popitem(last=False)
+            else:
+                self._buckets.move_to_end(key)
+            tokens = min(float(burst), bucket[0] + (now - bucket[1]) * rate)
+            bucket[1] = now
+            if tokens >= cost:
+                bucket[0] = tokens - cost
+                return 0.0
+            bucket[0] = tokens
+            return (cost - tokens) / rate
+
+    def clear(self) -> None:
+        with self._lock:
+            self._buckets.clear()
+
+
+# Same refill-and-take as MemoryBucketStore, atomically on the server's
+# clock. Returns {allowed, seconds to wait}; the wait goes back as a string
+# because Lua numbers are truncated to integers on the way out.
+TAKE_SCRIPT = """
+local rate, burst, cost = tonumber(ARGV[1]), tonumber(ARGV[2]), tonumber(ARGV[3])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'at')
+local tokens = tonumber(state[1]) or burst
+local at = tonumber(state[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - at) * rate)
+local allowed, wait = 0, (cost - tokens) / rate
+if tokens >= cost then
+    tokens, allowed, wait = tokens - cost, 1, 0
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'at', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil(burst / rate * 1000))
+return {allowed, tostring(wait)}
+"""
+
+
+# redis-py eval/scan_iter/delete interface, like RedisCache.
+class RedisBucketStore(BucketStore):
+    name = "redis"
+    blocking = True
+
+    def __init__(self, client, prefix: str = "library:ratelimit:"):
+        self.client = client
+        self.prefix = prefix
+
+    def take(self, key: str, rate: float, burst: int, cost: int) -> float:
+        allowed, wait = self.client.eval(
+            TAKE_SCRIPT, 1, self.prefix + key, rate, burst, cost
+        )
+        return 0.0 if int(allowed) else float(wait)
+
+    def clear(self) -> None:
+        keys = list(self.client.scan_iter(match=self.prefix + "*"))
+        if keys:
+            self.client.delete(*keys)
+
+
+def create_store() -> BucketStore:
+    if settings.RATE_LIMIT_BACKEND == "redis":
+        try:
+            import redis
+        except ImportError:
+            logger.error("RATE_LIMIT_BACKEND=redis requires the 'redis' package")
+            raise
+        return RedisBucketStore(redis.Redis.from_url(settings.RATE_LIMIT_REDIS_URL))
+    return MemoryBucketStore()
+
+
+def parse_route_costs(spec: str) -> List[Tuple[str, str, int]]:
+    # "GET /books/export=20, POST /borrow/batch=5" -> longest prefix first.
+    costs = []
+    for item in spec.split(","):
+        if not item.strip():
+            continue
+        route, _, cost = item.rpartition("=")
+        method, _, prefix = route.strip().partition(" ")
+        try:
+            costs.append((method.upper(), prefix.strip(), int(cost)))
+        except ValueError:
+            logger.warning("Ignoring route cost %r", item.strip())
+    return sorted(costs, key=lambda c: len(c[1]), reverse=True)
+
+
+class AdmissionController:
+    # Decides, before routing, whether a request may run: first global load
+    # shedding (503), then the caller's token bucket (429).
+    def __init__(
+        self,
+        store: BucketStore,
+        pools: Iterable[PoolMetrics] = (pool_metrics, async_pool_metrics),
+    ):
+        self.store = store
+        self.pools = tuple(pools)
+        self.route_costs = parse_route_costs(settings.RATE_LIMIT_ROUTE_COSTS)
+        # Only touched on the event loop thread.
+        self.in_flight = 0
+        self.rejected: Dict[str, int] = {"in_flight": 0, "pool_wait": 0, "rate": 0}
+
+    def cost(self, method: str, path: str) -> int:
+        for route_method, prefix, cost in self.route_costs:
+            if method == route_method and path.startswith(prefix):
+                return cost
+        return 1
+
+    def overload(self) -> Optional[str]:
+        limit = settings.SHED_MAX_IN_FLIGHT
+        if limit and self.in_flight >= limit:
+            return "in_flight"
+        threshold = settings.SHED_POOL_WAIT_SECONDS
+        if threshold and any(p.recent_wait() >= threshold for p in self.pools):
+            return "pool_wait"
+        return None
+
+    def bucket(self, scope) -> Tuple[str, float, int]:
+        client = scope.get("client")
+        ip = client[0] if client else "unknown"
+        if scope["path"].startswith(AUTH_PREFIX):
+            return (
+                f"auth:{ip}",
+                settings.RATE_LIMIT_AUTH_PER_SECOND,
+                settings.RATE_LIMIT_AUTH_BURST,
+            )
+        scheme, _, token = Headers(scope=scope).get("authorization", "").partition(" ")
+        user_id = token_user_id(token) if scheme.lower() == "bearer" else None
+        key = f"user:{user_id}" if user_id is not None else f"ip:{ip}"
+        return key, settings.RATE_LIMIT_PER_SECOND, settings.RATE_LIMIT_BURST
+
+    async def admit(self, scope) -> Optional[Tuple[int, int, str]]:
+        # None to let the request in, else (status, Retry-After, detail).
+        reason = self.overload()
+        if reason:
+            self.rejected[reason] += 1
+            return 503, settings.SHED_RETRY_AFTER_SECONDS, "Server is overloaded"
+
+        key, rate, burst = self.bucket(scope)
+        if rate <= 0:
+            return None
+        # A route dearer than the whole bucket could never run otherwise.
+        cost = min(self.cost(scope["method"], scope["path"]), burst)
+        try:
+            if self.store.blocking:
+                wait = await run_in_threadpool(self.store.take, key, rate, burst, cost)
+            else:
+                wait = self.store.take(key, rate, burst, cost)
+        except Exception as e:
+            # Fail open: a broken limiter must not take the API down with it.
+            logger.warning("Rate limit backend %s failed: %s", self.store.name, e)
+            return None
+        if wait > 0:
+            self.rejected["rate"] += 1
+            return 429, math.ceil(wait), "Rate limit exceeded"
+        return None
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            "backend": self.store.name,
+            "in_flight": self.in_flight,
+            "rejected": dict(self.rejected),
+            "pool_wait_seconds": round(
+                max((p.recent_wait() for p in self.pools), default=0.0), 6
+            ),
+        }
+
+
+admission = AdmissionController(create_store())
+
+
+class AdmissionMiddleware:
+    # Plain ASGI, like MetricsMiddleware. Installed inside CORSMiddleware so
+    # rejections still carry CORS headers and preflights are never limited.
+    def __init__(self, app, controller: AdmissionController = admission):
+        self.app = app
+        self.controller = controller
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in EXEMPT_PATHS:
+            await self.app(scope, receive, send)
+            return
+
+        rejection = await self.controller.admit(scope)
+        if rejection is not None:
+            status, retry_after, detail = rejection
+            body = orjson.dumps({"detail": detail})
+            headers = [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(retry_after).encode()),
+            ]
+            await send(
+                {"type": "http.response.start", "status": status, "headers": headers}
+            )
+            await send({"type": "http.response.body", "body": body})
+            return
+
+        self.controller.in_flight += 1
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.controller.in_flight -= 1
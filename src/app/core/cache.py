@@ -0,0 +1,308 @@
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+import logging
+import threading
+import time
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class CacheBackend:
+    # delete() moves a key to a new generation. A set() given the generation
+    # read before loading is dropped, returning False, if the key was
+    # deleted since: the load may predate the write that deleted it.
+    name = "base"
+
+    def get(self, key: str) -> Optional[bytes]:
+        raise NotImplementedError
+
+    def generation(self, key: str) -> int:
+        raise NotImplementedError
+
+    def set(
+        self, key: str, value: bytes, ttl: float, generation: Optional[int] = None
+    ) -> bool:
+        raise NotImplementedError
+
+    def delete(self, *keys: str) -> None:
+        raise NotImplementedError
+
+    def clear(self) -> None:
+        raise NotImplementedError
+
+    def stats(self) -> Dict[str, Any]:
+        return {}
+
+
+class NullCache(CacheBackend):
+    name = "none"
+
+    def get(self, key: str) -> Optional[bytes]:
+        return None
+
+    def generation(self, key: str) -> int:
+        return 0
+
+    def set(
+        self, key: str, value: bytes, ttl: float, generation: Optional[int] = None
+    ) -> bool:
+        return False
+
+    def delete(self, *keys: str) -> None:
+        pass
+
+    def clear(self) -> None:
+        pass
+
+
+class MemoryCache(CacheBackend):
+    name = "memory"
+
+    def __init__(
+        self, max_entries: int = 10000, clock: Callable[[], float] = time.monotonic
+    ):
+        self.max_entries = max_entries
+        self._clock = clock
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        # key -> generation of its last delete, oldest first. Forgotten keys
+        # read as the newest generation forgotten, so a set racing a delete
+        # is still dropped.
+        self._generations: "OrderedDict[str, int]" = OrderedDict()
+        self._last_generation = 0
+        self._forgotten = 0
+        self._lock = threading.Lock()
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= self._clock():
+                del self._entries[key]
+                self.expirations += 1
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def generation(self, key: str) -> int:
+        with self._lock:
+            return self._generations.get(key, self._forgotten)
+
+    def set(
+        self, key: str, value: Any, ttl: float, generation: Optional[int] = None
+    ) -> bool:
+        with self._lock:
+            if (
+                generation is not None
+                and self._generations.get(key, self._forgotten) != generation
+            ):
+                return False
+            self._entries[key] = (self._clock() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+            return True
+
+    def delete(self, *keys: str) -> None:
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+                self._last_generation += 1
+                self._generations[key] = self._last_generation
+                self._generations.move_to_end(key)
+            while len(self._generations) > self.max_entries:
+                _, self._forgotten = self._generations.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._generations.clear()
+            self._last_generation += 1
+            self._forgotten = self._last_generation
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+
+# Stores ARGV[1] at KEYS[1] only while the generation at KEYS[2] is still
+# ARGV[2], atomically.
+SET_SCRIPT = """
+if (redis.call('GET', KEYS[2]) or '0') ~= ARGV[2] then
+    return 0
+end
+redis.call('SET', KEYS[1], ARGV[1], 'EX', ARGV[3])
+return 1
+"""
+# Outlives any load by far; a generation that expires reads as 0 again.
+GENERATION_TTL_SECONDS = 86400
+
+
+# Shared backend for multi-process deployments. ``client`` is anything with the
+# redis-py get/set/delete/incr/expire/eval/scan_iter interface.
+class RedisCache(CacheBackend):
+    name = "redis"
+
+    def __init__(self, client, prefix: str = "library:"):
+        self.client = client
+        self.prefix = prefix
+
+    def _generation_key(self, key: str) -> str:
+        return f"{self.prefix}generation:{key}"
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self.client.get(self.prefix + key)
+
+    def generation(self, key: str) -> int:
+        return int(self.client.get(self._generation_key(key)) or 0)
+
+    def set(
+        self, key: str, value: bytes, ttl: float, generation: Optional[int] = None
+    ) -> bool:
+        ttl = max(1, int(ttl))
+        if generation is None:
+            self.client.set(self.prefix + key, value, ex=ttl)
+            return True
+        stored = self.client.eval(
+            SET_SCRIPT,
+            2,
+            self.prefix + key,
+            self._generation_key(key),
+            value,
+            generation,
+            ttl,
+        )
+        return bool(int(stored))
+
+    def delete(self, *keys: str) -> None:
+        # Generation first: a set that lands between the two is deleted.
+        for key in keys:
+            self.client.incr(self._generation_key(key))
+            self.client.expire(self._generation_key(key), GENERATION_TTL_SECONDS)
+        if keys:
+            self.client.delete(*(self.prefix + key for key in keys))
+
+    def clear(self) -> None:
+        keys = list(self.client.scan_iter(match=self.prefix + "*"))
+        if keys:
+            self.client.delete(*keys)
+
+
+class EntityCache:
+    def __init__(self, backend: CacheBackend, ttl: float):
+        self.backend = backend
+        self.ttl = ttl
+        # Counters are bumped from threadpool threads.
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.stale_writes = 0
+
+    def _lookup(self, key: str) -> Tuple[Optional[bytes], int]:
+        # Raises on backend errors. The generation is read before the loader
+        # runs so that a write committed meanwhile wins over its result.
+        value = self.backend.get(key)
+        if value is not None:
+            with self._lock:
+                self.hits += 1
+            return value, 0
+        generation = self.backend.generation(key)
+        with self._lock:
+            self.misses += 1
+        return None, generation
+
+    def _store(self, key: str, value: bytes, generation: int) -> None:
+        try:
+            stored = self.backend.set(key, value, self.ttl, generation)
+        except Exception as e:
+            logger.error("Cache write failed for %s: %s", key, e)
+            return
+        if not stored:
+            with self._lock:
+                self.stale_writes += 1
+
+    def get_or_load(
+        self, key: str, loader: Callable[[], Optional[bytes]]
+    ) -> Optional[bytes]:
+        try:
+            value, generation = self._lookup(key)
+        except Exception as e:
+            logger.error("Cache read failed for %s: %s", key, e)
+            return loader()
+        if value is not None:
+            return value
+
+        value = loader()
+        if value is not None:
+            self._store(key, value, generation)
+        return value
+
+    async def aget_or_load(
+        self, key: str, loader: Callable[[], Awaitable[Optional[bytes]]]
+    ) -> Optional[bytes]:
+        try:
+            value, generation = self._lookup(key)
+        except Exception as e:
+            logger.error("Cache read failed for %s: %s", key, e)
+            return await loader()
+        if value is not None:
+            return value
+
+        value = await loader()
+        if value is not None:
+            self._store(key, value, generation)
+        return value
+
+    def invalidate(self, *keys: str) -> None:
+        with self._lock:
+            self.invalidations += 1
+        try:
+            self.backend.delete(*keys)
+        except Exception as e:
+            logger.error("Cache invalidation failed for %s: %s", keys, e)
+
+    def clear(self) -> None:
+        self.backend.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            hits, misses = self.hits, self.misses
+            invalidations, stale_writes = self.invalidations, self.stale_writes
+        lookups = hits + misses
+        return {
+            "backend": self.backend.name,
+            "hits": hits,
+            "misses": misses,
+            "hit_ratio": round(hits / lookups, 4) if lookups else 0.0,
+            "invalidations": invalidations,
+            "stale_writes": stale_writes,
+            "ttl_seconds": self.ttl,
+            **self.backend.stats(),
+        }
+
+
+def create_backend() -> CacheBackend:
+    if settings.CACHE_BACKEND == "none":
+        return NullCache()
+    if settings.CACHE_BACKEND == "redis":
+        try:
+            import redis
+        except ImportError:
+            logger.error("CACHE_BACKEND=redis requires the 'redis' package")
+            raise
+        return RedisCache(redis.Redis.from_url(settings.CACHE_REDIS_URL))
+    return MemoryCache(max_entries=settings.CACHE_MAX_ENTRIES)
+
+
+entity_cache = EntityCache(create_backend(), ttl=settings.CACHE_TTL_SECONDS)
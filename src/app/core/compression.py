@@ -0,0 +1,252 @@
+from typing import Callable, Dict, Iterable, Iterator, Optional, Sequence
+import logging
+import zlib
+
+from starlette.datastructures import Headers, MutableHeaders
+
+from app.core.conditional import encoded_etag
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Optional: without them only gzip is offered.
+try:
+    import brotli
+except ImportError:
+    brotli = None
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+COMPRESSIBLE_TYPES = {
+    "application/json",
+    "application/x-ndjson",
+    "application/javascript",
+    "application/xml",
+}
+
+
+def is_compressible(content_type: str) -> bool:
+    # Text formats only; images and archives are compressed already.
+    media_type = content_type.split(";", 1)[0].strip().lower()
+    return (
+        media_type.startswith("text/")
+        or media_type in COMPRESSIBLE_TYPES
+        or media_type.endswith(("+json", "+xml"))
+    )
+
+
+class Encoder:
+    # One response body. compress() returns everything the chunk encodes to,
+    # flushed, so a streaming client can decode it without waiting for the
+    # next one; encode() is the cheaper one-shot form for complete bodies.
+    def _compress(self, data: bytes) -> bytes:
+        raise NotImplementedError
+
+    def _flush(self) -> bytes:
+        raise NotImplementedError
+
+    def finish(self) -> bytes:
+        raise NotImplementedError
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compress(data) + self._flush()
+
+    def encode(self, body: bytes) -> bytes:
+        return self._compress(body) + self.finish()
+
+
+class GzipEncoder(Encoder):
+    def __init__(self, level: int):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def _compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def _flush(self) -> bytes:
+        return self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+class BrotliEncoder(Encoder):
+    def __init__(self, quality: int):
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def _compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data)
+
+    def _flush(self) -> bytes:
+        return self._compressor.flush()
+
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+
+class ZstdEncoder(Encoder):
+    def __init__(self, level: int):
+        self._compressor = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def _compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def _flush(self) -> bytes:
+        return self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+def load_encoders(encodings: str) -> Dict[str, Callable[[], Encoder]]:
+    # Content-Encoding name -> encoder factory, in the configured order,
+    # skipping codecs whose package is not installed.
+    factories = {
+        "gzip": lambda: GzipEncoder(settings.COMPRESSION_GZIP_LEVEL),
+        "br": lambda: BrotliEncoder(settings.COMPRESSION_BROTLI_QUALITY),
+        "zstd": lambda: ZstdEncoder(settings.COMPRESSION_ZSTD_LEVEL),
+    }
+    packages = {"br": ("brotli", brotli), "zstd": ("zstandard", zstandard)}
+    encoders = {}
+    for name in (n.strip().lower() for n in encodings.split(",")):
+        if not name:
+            continue
+        if name not in factories:
+            logger.warning("Unknown compression encoding ignored: %s", name)
+            continue
+        package, module = packages.get(name, (None, True))
+        if module is None:
+            logger.warning(
+                "Compression encoding %s needs the '%s' package", name, package
+            )
+            continue
+        encoders[name] = factories[name]
+    return encoders
+
+
+def negotiate(accept_encoding: str, offered: Sequence[str]) -> Optional[str]:
+    # Highest q-value wins; ties go to the server's order. q=0 rules a
+    # coding out, and * covers codings the header does not name.
+    accepted: Dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            key, _, value = param.partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        accepted[name] = q
+
+    best, best_q = None, 0.0
+    for name in offered:
+        q = accepted.get(name, accepted.get("*", 0.0))
+        if q > best_q:
+            best, best_q = name, q
+    return best
+
+
+def encode_stream(encoder: Encoder, chunks: Iterable[bytes]) -> Iterator[bytes]:
+    for chunk in chunks:
+        data = encoder.compress(chunk)
+        if data:
+            yield data
+    yield encoder.finish()
+
+
+class CompressionMiddleware:
+    # Plain ASGI, like MetricsMiddleware. The first body message decides:
+    # a complete body under min_size, a non-text type or a body the route
+    # encoded itself goes out untouched; a complete body is compressed in
+    # one go with its Content-Length fixed up; a streamed body is compressed
+    # chunk by chunk and loses its Content-Length. A compressed body gets
+    # its own ETag, "12.3-gzip", as strong validators must differ between
+    # codings; conditional.py ignores the suffix when comparing, and a 304
+    # echoes it back. Vary keeps caches from mixing up the encodings.
+    def __init__(
+        self, app, encodings: Optional[str] = None, min_size: Optional[int] = None
+    ):
+        self.app = app
+        self.encoders = load_encoders(
+            settings.COMPRESSION_ENCODINGS if encodings is None else encodings
+        )
+        self.min_size = settings.COMPRESSION_MIN_SIZE if min_size is None else min_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] == "HEAD" or not self.encoders:
+            await self.app(scope, receive, send)
+            return
+        request_headers = Headers(scope=scope)
+        encoding = negotiate(
+            request_headers.get("accept-encoding", ""), list(self.encoders)
+        )
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start = None
+        encoder: Optional[Encoder] = None
+        passthrough = False
+
+        async def send_wrapper(message):
+            nonlocal start, encoder, passthrough
+            if message["type"] == "http.response.start":
+                start = message
+                return
+            if passthrough or message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if encoder is None:
+                headers = MutableHeaders(raw=start["headers"])
+                compressible = is_compressible(headers.get("content-type", ""))
+                if compressible:
+                    headers.add_vary_header("Accept-Encoding")
+                if (
+                    not compressible
+                    or "content-encoding" in headers
+                    or (not more_body and len(body) < self.min_size)
+                ):
+                    etag = headers.get("etag")
+                    if (
+                        start["status"] == 304
+                        and etag
+                        and encoded_etag(etag, encoding)
+                        in request_headers.get("if-none-match", "")
+                    ):
+                        headers["ETag"] = encoded_etag(etag, encoding)
+                    passthrough = True
+                    await send(start)
+                    await send(message)
+                    return
+
+                encoder = self.encoders[encoding]()
+                headers["Content-Encoding"] = encoding
+                if "etag" in headers:
+                    headers["ETag"] = encoded_etag(headers["etag"], encoding)
+                if not more_body:
+                    body = encoder.encode(body)
+                    headers["Content-Length"] = str(len(body))
+                    await send(start)
+                    await send({"type": "http.response.body", "body": body})
+                    return
+                if "content-length" in headers:
+                    del headers["Content-Length"]
+                await send(start)
+
+            data = encoder.compress(body)
+            if not more_body:
+                data += encoder.finish()
+            await send(
+                {"type": "http.response.body", "body": data, "more_body": more_body}
+            )
+
+        await self.app(scope, receive, send_wrapper)
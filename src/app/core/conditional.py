@@ -0,0 +1,127 @@
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Dict, Iterable, Optional, Tuple
+import hashlib
+import logging
+
+import orjson
+from fastapi import HTTPException, Request, Response, status
+
+logger = logging.getLogger(__name__)
+
+
+def entity_etag(id: int, version: int) -> str:
+    return f'"{id}.{version}"'
+
+
+def collection_etag(versions: Iterable[Tuple[int, int]], *parts: object) -> str:
+    digest = hashlib.blake2b(digest_size=12)
+    digest.update(repr(parts).encode())
+    for id, version in versions:
+        digest.update(b"%d.%d;" % (id, version))
+    return f'W/"{digest.hexdigest()}"'
+
+
+def _as_utc(value: datetime) -> datetime:
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def http_date(value: datetime) -> str:
+    return format_datetime(_as_utc(value).replace(microsecond=0), usegmt=True)
+
+
+def _etag_list(header: str) -> list:
+    return [tag.strip() for tag in header.split(",") if tag.strip()]
+
+
+# CompressionMiddleware tags compressed bodies "12.3-gzip": a strong ETag
+# names the exact bytes (RFC 9110 8.8.3). Validators compare without it.
+ENCODING_SUFFIXES = ("gzip", "br", "zstd")
+
+
+def encoded_etag(etag: str, encoding: str) -> str:
+    return f'{etag[:-1]}-{encoding}"' if etag.endswith('"') else etag
+
+
+def _unencoded(tag: str) -> str:
+    for encoding in ENCODING_SUFFIXES:
+        if tag.endswith(f'-{encoding}"'):
+            return tag[: -len(encoding) - 2] + '"'
+    return tag
+
+
+def _opaque(tag: str) -> str:
+    tag = _unencoded(tag)
+    return tag[2:] if tag.startswith("W/") else tag
+
+
+def is_not_modified(
+    request: Request, etag: str, last_modified: Optional[datetime] = None
+) -> bool:
+    # If-None-Match takes precedence over If-Modified-Since (RFC 9110 13.2.2).
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = _etag_list(if_none_match)
+        return "*" in tags or _opaque(etag) in {_opaque(tag) for tag in tags}
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        return _as_utc(last_modified).replace(microsecond=0) <= since
+    return False
+
+
+def set_validators(
+    response: Response, etag: str, last_modified: Optional[datetime] = None
+) -> None:
+    response.headers["ETag"] = etag
+    if last_modified is not None:
+        response.headers["Last-Modified"] = http_date(last_modified)
+
+
+def not_modified(
+    etag: str,
+    last_modified: Optional[datetime] = None,
+    headers: Optional[Dict[str, str]] = None,
+) -> Response:
+    response = Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    set_validators(response, etag, last_modified)
+    return response
+
+
+def check_if_match(request: Request, etag: str) -> None:
+    if_match = request.headers.get("if-match")
+    if if_match is None:
+        return
+    tags = _etag_list(if_match)
+    # If-Match uses the strong comparison, so weak validators never match.
+    if "*" in tags or etag in {_unencoded(tag) for tag in tags}:
+        return
+    logger.warning("If-Match precondition failed: expected %s, got %s", etag, if_match)
+    raise HTTPException(
+        status_code=status.HTTP_412_PRECONDITION_FAILED,
+        detail="Resource has been modified",
+    )
+
+
+def payload_response(request: Request, payload: bytes) -> Response:
+    # Cached payloads are already-serialized *Read models; only the validator
+    # fields are decoded, the body itself is sent as is.
+    data = orjson.loads(payload)
+    etag = entity_etag(data["id"], data["version"])
+    last_modified = (
+        datetime.fromisoformat(data["updated_at"]) if data.get("updated_at") else None
+    )
+    if is_not_modified(request, etag, last_modified):
+        return not_modified(etag, last_modified)
+
+    response = Response(content=payload, media_type="application/json")
+    set_validators(response, etag, last_modified)
+    return response
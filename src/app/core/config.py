@@ -49,6 +49,350 @@ class Settings(BaseSettings):
         }
     )
 
+    DB_ASYNC: bool = Field(
+        default=False,
+        json_schema_extra={
+            "env": "DB_ASYNC",
+            "description": "Serve catalog routes with AsyncSession on asyncpg"
+        }
+    )
+    DATABASE_REPLICA_URLS: str = Field(
+        default="",
+        json_schema_extra={
+            "env": "DATABASE_REPLICA_URLS",
+            "description": "Comma-separated read replica URLs for read-only endpoints; empty sends everything to DATABASE_URL"
+        }
+    )
+    DB_REPLICA_BALANCE: str = Field(
+        default="round_robin",
+        json_schema_extra={
+            "env": "DB_REPLICA_BALANCE",
+            "description": "Replica selection: round_robin or least_connections"
+        }
+    )
+    DB_REPLICA_MAX_LAG_SECONDS: float = Field(
+        default=5.0,
+        json_schema_extra={
+            "env": "DB_REPLICA_MAX_LAG_SECONDS",
+            "description": "Replicas further behind are skipped; with none left reads go to the primary"
+        }
+    )
+    DB_REPLICA_CHECK_SECONDS: float = Field(
+        default=2.0,
+        json_schema_extra={
+            "env": "DB_REPLICA_CHECK_SECONDS",
+            "description": "How often each replica's lag is measured"
+        }
+    )
+    DB_POOL_SIZE: int = Field(
+        default=5,
+        json_schema_extra={
+            "env": "DB_POOL_SIZE",
+            "description": "Connections kept open in each engine's pool"
+        }
+    )
+    DB_MAX_OVERFLOW: int = Field(
+        default=10,
+        json_schema_extra={
+            "env": "DB_MAX_OVERFLOW",
+            "description": "Extra connections opened above DB_POOL_SIZE under load"
+        }
+    )
+    DB_POOL_TIMEOUT: float = Field(
+        default=30.0,
+        json_schema_extra={
+            "env": "DB_POOL_TIMEOUT",
+            "description": "Seconds to wait for a free connection before failing"
+        }
+    )
+    DB_POOL_RECYCLE: int = Field(
+        default=1800,
+        json_schema_extra={
+            "env": "DB_POOL_RECYCLE",
+            "description": "Reconnect connections older than this many seconds; -1 never"
+        }
+    )
+    DB_POOL_PRE_PING: bool = Field(
+        default=True,
+        json_schema_extra={
+            "env": "DB_POOL_PRE_PING",
+            "description": "Test connections on checkout; when off, dead connections are only replaced after a failed statement"
+        }
+    )
+    SQL_SLOW_QUERY_SECONDS: float = Field(
+        default=0.5,
+        json_schema_extra={
+            "env": "SQL_SLOW_QUERY_SECONDS",
+            "description": "Statements running at least this long are logged with their parameters; 0 disables"
+        }
+    )
+    SQL_PROFILE: bool = Field(
+        default=False,
+        json_schema_extra={
+            "env": "SQL_PROFILE",
+            "description": "Record every statement per request and log repeated ones"
+        }
+    )
+    SQL_N_PLUS_ONE_THRESHOLD: int = Field(
+        default=3,
+        json_schema_extra={
+            "env": "SQL_N_PLUS_ONE_THRESHOLD",
+            "description": "Executions of the same statement in one request reported as N+1"
+        }
+    )
+    COMPRESSION_ENCODINGS: str = Field(
+        default="zstd,br,gzip",
+        json_schema_extra={
+            "env": "COMPRESSION_ENCODINGS",
+            "description": "Response encodings in order of preference; zstd and br need the zstandard and brotli packages, empty disables compression"
+        }
+    )
+    COMPRESSION_MIN_SIZE: int = Field(
+        default=1024,
+        json_schema_extra={
+            "env": "COMPRESSION_MIN_SIZE",
+            "description": "Responses smaller than this many bytes are sent uncompressed"
+        }
+    )
+    COMPRESSION_GZIP_LEVEL: int = Field(
+        default=6,
+        json_schema_extra={
+            "env": "COMPRESSION_GZIP_LEVEL",
+            "description": "gzip level, 1-9"
+        }
+    )
+    COMPRESSION_BROTLI_QUALITY: int = Field(
+        default=4,
+        json_schema_extra={
+            "env": "COMPRESSION_BROTLI_QUALITY",
+            "description": "Brotli quality, 0-11"
+        }
+    )
+    COMPRESSION_ZSTD_LEVEL: int = Field(
+        default=3,
+        json_schema_extra={
+            "env": "COMPRESSION_ZSTD_LEVEL",
+            "description": "zstd level, 1-22"
+        }
+    )
+    LOG_LEVEL: str = Field(
+        default="INFO",
+        json_schema_extra={
+            "env": "LOG_LEVEL",
+            "description": "Root log level"
+        }
+    )
+    LOG_FORMAT: str = Field(
+        default="json",
+        json_schema_extra={
+            "env": "LOG_FORMAT",
+            "description": "Log line format: json or text"
+        }
+    )
+    LOG_SAMPLING: str = Field(
+        default="",
+        json_schema_extra={
+            "env": "LOG_SAMPLING",
+            "description": "Share of INFO and DEBUG records kept per logger, e.g. app.crud.borrow=0.1,app.api=0.5; warnings and errors are always kept"
+        }
+    )
+    LOG_QUEUE_SIZE: int = Field(
+        default=10000,
+        json_schema_extra={
+            "env": "LOG_QUEUE_SIZE",
+            "description": "Records waiting for the log writer thread; when it is full new records are dropped"
+        }
+    )
+    RATE_LIMIT_PER_SECOND: float = Field(
+        default=0,
+        json_schema_extra={
+            "env": "RATE_LIMIT_PER_SECOND",
+            "description": "Sustained request rate allowed per user (per client IP without a valid token); 0 disables"
+        }
+    )
+    RATE_LIMIT_BURST: int = Field(
+        default=60,
+        json_schema_extra={
+            "env": "RATE_LIMIT_BURST",
+            "description": "Token bucket size per user: requests allowed at once after being idle"
+        }
+    )
+    RATE_LIMIT_AUTH_PER_SECOND: float = Field(
+        default=0,
+        json_schema_extra={
+            "env": "RATE_LIMIT_AUTH_PER_SECOND",
+            "description": "Sustained rate of /auth requests allowed per client IP; 0 disables"
+        }
+    )
+    RATE_LIMIT_AUTH_BURST: int = Field(
+        default=10,
+        json_schema_extra={
+            "env": "RATE_LIMIT_AUTH_BURST",
+            "description": "Token bucket size per client IP for /auth"
+        }
+    )
+    RATE_LIMIT_ROUTE_COSTS: str = Field(
+        default="GET /books/export=20,POST /books/import=20,POST /borrow/batch=5,POST /borrow/return/batch=5,GET /books/search=2",
+        json_schema_extra={
+            "env": "RATE_LIMIT_ROUTE_COSTS",
+            "description": "Tokens taken per request as METHOD /path-prefix=cost, longest prefix wins; other requests cost 1"
+        }
+    )
+    RATE_LIMIT_BACKEND: str = Field(
+        default="memory",
+        json_schema_extra={
+            "env": "RATE_LIMIT_BACKEND",
+            "description": "Where buckets live: memory (per process) or redis (shared by all workers)"
+        }
+    )
+    RATE_LIMIT_REDIS_URL: str = Field(
+        default="redis://localhost:6379/0",
+        json_schema_extra={
+            "env": "RATE_LIMIT_REDIS_URL",
+            "description": "Redis URL for the shared rate limit backend"
+        }
+    )
+    SHED_MAX_IN_FLIGHT: int = Field(
+        default=0,
+        json_schema_extra={
+            "env": "SHED_MAX_IN_FLIGHT",
+            "description": "Requests handled at once before new ones get 503; 0 disables"
+        }
+    )
+    SHED_POOL_WAIT_SECONDS: float = Field(
+        default=1.0,
+        json_schema_extra={
+            "env": "SHED_POOL_WAIT_SECONDS",
+            "description": "Recent average wait for a database connection above which new requests get 503; 0 disables"
+        }
+    )
+    SHED_RETRY_AFTER_SECONDS: int = Field(
+        default=1,
+        json_schema_extra={
+            "env": "SHED_RETRY_AFTER_SECONDS",
+            "description": "Retry-After sent with 503 responses from load shedding"
+        }
+    )
+    CACHE_BACKEND: str = Field(
+        default="memory",
+        json_schema_extra={
+            "env": "CACHE_BACKEND",
+            "description": "Entity cache backend: memory, redis or none"
+        }
+    )
+    CACHE_MAX_ENTRIES: int = Field(
+        default=10000,
+        json_schema_extra={
+            "env": "CACHE_MAX_ENTRIES",
+            "description": "Maximum number of entries in the in-process cache"
+        }
+    )
+    CACHE_TTL_SECONDS: int = Field(
+        default=300,
+        json_schema_extra={
+            "env": "CACHE_TTL_SECONDS",
+            "description": "Lifetime of cached book and reader payloads"
+        }
+    )
+    CACHE_REDIS_URL: str = Field(
+        default="redis://localhost:6379/0",
+        json_schema_extra={
+            "env": "CACHE_REDIS_URL",
+            "description": "Redis URL for the shared cache backend"
+        }
+    )
+    AUTH_CACHE_MAX_ENTRIES: int = Field(
+        default=10000,
+        json_schema_extra={
+            "env": "AUTH_CACHE_MAX_ENTRIES",
+            "description": "Maximum number of verified tokens kept in memory"
+        }
+    )
+    AUTH_CACHE_TTL_SECONDS: int = Field(
+        default=60,
+        json_schema_extra={
+            "env": "AUTH_CACHE_TTL_SECONDS",
+            "description": "How long a verified token skips JWT decode and user lookup"
+        }
+    )
+    PASSWORD_HASH_ROUNDS: int = Field(
+        default=12,
+        json_schema_extra={
+            "env": "PASSWORD_HASH_ROUNDS",
+            "description": "bcrypt cost; older hashes are upgraded on login"
+        }
+    )
+    PASSWORD_HASH_EXECUTOR: str = Field(
+        default="process",
+        json_schema_extra={
+            "env": "PASSWORD_HASH_EXECUTOR",
+            "description": "Where hashes run: process pool or thread pool"
+        }
+    )
+    PASSWORD_HASH_WORKERS: int = Field(
+        default=2,
+        json_schema_extra={
+            "env": "PASSWORD_HASH_WORKERS",
+            "description": "Concurrent password hashes"
+        }
+    )
+    PASSWORD_HASH_QUEUE_SIZE: int = Field(
+        default=32,
+        json_schema_extra={
+            "env": "PASSWORD_HASH_QUEUE_SIZE",
+            "description": "Hash jobs allowed to wait for a worker before login returns 503"
+        }
+    )
+    BORROW_ACTIVE_COUNTER: bool = Field(
+        default=False,
+        json_schema_extra={
+            "env": "BORROW_ACTIVE_COUNTER",
+            "description": "Check the borrow limit against readers.active_borrows instead of counting loans"
+        }
+    )
+    LOAN_PERIOD_DAYS: int = Field(
+        default=14,
+        json_schema_extra={
+            "env": "LOAN_PERIOD_DAYS",
+            "description": "Days a loan may stay out before it counts as overdue"
+        }
+    )
+    STATS_REFRESH_SECONDS: float = Field(
+        default=60.0,
+        json_schema_extra={
+            "env": "STATS_REFRESH_SECONDS",
+            "description": "How often circulation events are folded into the stats rollups and upcoming borrowed_books partitions are created; 0 disables the background refresher"
+        }
+    )
+    BORROW_PARTITION_MONTHS_AHEAD: int = Field(
+        default=3,
+        json_schema_extra={
+            "env": "BORROW_PARTITION_MONTHS_AHEAD",
+            "description": "Monthly borrowed_books partitions created in advance"
+        }
+    )
+    BORROW_ARCHIVE_AFTER_MONTHS: int = Field(
+        default=24,
+        json_schema_extra={
+            "env": "BORROW_ARCHIVE_AFTER_MONTHS",
+            "description": "Age in months after which archive-loans detaches a borrowed_books partition"
+        }
+    )
+    BORROW_ARCHIVE_SCHEMA: str = Field(
+        default="archive",
+        json_schema_extra={
+            "env": "BORROW_ARCHIVE_SCHEMA",
+            "description": "Schema that detached borrowed_books partitions are moved to"
+        }
+    )
+    STATS_REFRESH_BATCH: int = Field(
+        default=10000,
+        json_schema_extra={
+            "env": "STATS_REFRESH_BATCH",
+            "description": "Circulation events processed per refresh transaction"
+        }
+    )
+
     model_config = ConfigDict(
         env_file=".env",
         env_file_encoding="utf-8",
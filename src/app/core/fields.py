@@ -0,0 +1,44 @@
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Fetched for every list even when not requested: id and version make the
+# ETag, updated_at the Last-Modified header.
+KEY_FIELDS = ("id", "version", "updated_at")
+
+
+class InvalidFields(ValueError):
+    pass
+
+
+def parse_fields(
+    fields: Optional[str], allowed: Sequence[str], default: Sequence[str]
+) -> Tuple[str, ...]:
+    # ?fields=title,id -> ("id", "title"): schema order, whatever the query says.
+    if fields is None:
+        return tuple(default)
+    requested = {name.strip() for name in fields.split(",")} - {""}
+    if not requested:
+        raise InvalidFields("No fields requested")
+    unknown = requested.difference(allowed)
+    if unknown:
+        logger.warning("Unknown fields requested: %s", sorted(unknown))
+        raise InvalidFields(f"Unknown fields: {', '.join(sorted(unknown))}")
+    return tuple(name for name in allowed if name in requested)
+
+
+def fetched_fields(
+    fields: Iterable[str], allowed: Sequence[str], sort: str = "id"
+) -> Tuple[str, ...]:
+    # The requested fields plus the ones the ETag and the cursor need.
+    wanted = {*fields, *KEY_FIELDS, sort}
+    return tuple(name for name in allowed if name in wanted)
+
+
+def project(items: Sequence[Any], fields: Sequence[str]) -> List[Dict[str, Any]]:
+    # Works on Core rows and ORM instances alike; attributes outside fields
+    # are never read, so deferred columns stay unloaded.
+    if items and getattr(items[0], "_fields", None) == tuple(fields):
+        return [item._asdict() for item in items]
+    return [{name: getattr(item, name) for name in fields} for item in items]
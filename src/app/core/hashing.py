@@ -0,0 +1,135 @@
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, Tuple
+import asyncio
+import logging
+import math
+import multiprocessing
+import threading
+import time
+
+from app.core.config import settings
+from app.core.password import get_password_hash, verify_and_update_password
+
+logger = logging.getLogger(__name__)
+
+
+class HashingBusy(Exception):
+    def __init__(self, retry_after: int):
+        super().__init__(f"Password hashing pool is saturated, retry in {retry_after}s")
+        self.retry_after = retry_after
+
+
+class PasswordHasher:
+    # bcrypt holds the GIL for the whole hash, so it runs in worker processes
+    # instead of Starlette's threadpool. At most workers + queue_size jobs are
+    # admitted; the rest are rejected with HashingBusy rather than queued.
+    def __init__(
+        self,
+        workers: int,
+        queue_size: int,
+        executor_factory: Optional[Callable[[int], Executor]] = None,
+    ):
+        self.workers = max(1, workers)
+        self.capacity = self.workers + max(0, queue_size)
+        self._executor_factory = executor_factory or self._process_pool
+        self._executor: Optional[Executor] = None
+        self._lock = threading.Lock()
+        self._pending = 0
+        # Moving average of end-to-end job latency (queue wait + hash).
+        self._avg_seconds = 0.25
+        self.completed = 0
+        self.rejected = 0
+
+    @staticmethod
+    def _process_pool(workers: int) -> Executor:
+        # spawn: forking a process that already runs the event loop and the
+        # DB pool's threads is unsafe.
+        return ProcessPoolExecutor(
+            max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+        )
+
+    def _get_executor(self) -> Executor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = self._executor_factory(self.workers)
+                logger.info(
+                    "Password hashing pool started with %s workers", self.workers
+                )
+            return self._executor
+
+    def _retry_after(self) -> int:
+        return max(1, math.ceil(self._avg_seconds))
+
+    def _reject_if_full(self) -> None:
+        if self._pending >= self.capacity:
+            self.rejected += 1
+            retry_after = self._retry_after()
+            logger.warning(
+                "Password hashing rejected: %s jobs pending, retry after %ss",
+                self._pending,
+                retry_after,
+            )
+            raise HashingBusy(retry_after)
+
+    def check_capacity(self) -> None:
+        # Lets callers shed load before doing any database work.
+        with self._lock:
+            self._reject_if_full()
+
+    def _admit(self) -> None:
+        with self._lock:
+            self._reject_if_full()
+            self._pending += 1
+
+    def _release(self, elapsed: float) -> None:
+        with self._lock:
+            self._pending -= 1
+            self.completed += 1
+            self._avg_seconds = 0.9 * self._avg_seconds + 0.1 * elapsed
+
+    async def _run(self, fn: Callable, *args: Any) -> Any:
+        self._admit()
+        started = time.perf_counter()
+        try:
+            future = self._get_executor().submit(fn, *args)
+            return await asyncio.wrap_future(future)
+        finally:
+            self._release(time.perf_counter() - started)
+
+    async def hash(self, password: str) -> str:
+        return await self._run(get_password_hash, password)
+
+    async def verify_and_update(
+        self, password: str, hashed_password: str
+    ) -> Tuple[bool, Optional[str]]:
+        return await self._run(verify_and_update_password, password, hashed_password)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "workers": self.workers,
+            "capacity": self.capacity,
+            "pending": self._pending,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "avg_seconds": round(self._avg_seconds, 4),
+        }
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+            logger.info("Password hashing pool stopped")
+
+
+def thread_pool(workers: int) -> Executor:
+    return ThreadPoolExecutor(max_workers=workers, thread_name_prefix="hasher")
+
+
+password_hasher = PasswordHasher(
+    workers=settings.PASSWORD_HASH_WORKERS,
+    queue_size=settings.PASSWORD_HASH_QUEUE_SIZE,
+    executor_factory=(
+        thread_pool if settings.PASSWORD_HASH_EXECUTOR == "thread" else None
+    ),
+)
@@ -0,0 +1,225 @@
+from typing import Any, Dict, IO, Iterable, Iterator, List, Optional, Tuple
+import csv
+import io
+import json
+import logging
+import re
+
+from pydantic import ValidationError
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.crud.book import book as crud_book
+from app.schemas.book import BookCreate, BookImportError, BookImportReport
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 1000
+DEFAULT_MAX_ERRORS = 1000
+FORMATS = ("csv", "ndjson")
+
+
+def detect_format(filename: Optional[str], content_type: Optional[str]) -> str:
+    name = (filename or "").lower()
+    if name.endswith((".ndjson", ".jsonl")) or "ndjson" in (content_type or ""):
+        return "ndjson"
+    return "csv"
+
+
+# Undecodable bytes are read as lone surrogates (surrogateescape), so a
+# non-UTF-8 upload fails row by row instead of aborting the import halfway.
+# NUL is refused too: Postgres cannot store it in text columns.
+# SQLSTATE unique_violation; any other constraint is reported as is.
+UNIQUE_VIOLATION = "23505"
+DUPLICATE_ISBN = "Book with this ISBN already exists"
+
+
+def _is_isbn_conflict(error: IntegrityError) -> bool:
+    diag = getattr(error.orig, "diag", None)
+    return getattr(error.orig, "pgcode", None) == UNIQUE_VIOLATION and "isbn" in (
+        getattr(diag, "constraint_name", None) or ""
+    )
+
+
+def _driver_message(error: IntegrityError) -> str:
+    diag = getattr(error.orig, "diag", None)
+    return getattr(diag, "message_primary", None) or str(error.orig).strip()
+
+
+_UNREADABLE = re.compile("[\x00\udc80-\udcff]")
+UNREADABLE_ROW = "Row is not valid UTF-8 text"
+
+
+def _readable(values: Iterable[Any]) -> bool:
+    return not any(isinstance(v, str) and _UNREADABLE.search(v) for v in values)
+
+
+def iter_records(
+    stream: IO[bytes], fmt: str
+) -> Iterator[Tuple[int, Optional[Dict[str, Any]], Optional[str]]]:
+    text = io.TextIOWrapper(
+        stream, encoding="utf-8-sig", errors="surrogateescape", newline=""
+    )
+    try:
+        if fmt == "csv":
+            reader = csv.DictReader(text)
+            row_number = 0
+            while True:
+                row_number += 1
+                try:
+                    row = next(reader)
+                except StopIteration:
+                    break
+                except csv.Error as e:
+                    # The reader resumes on the next line.
+                    yield row_number, None, f"Malformed CSV: {str(e)}"
+                    continue
+                record = {
+                    key: (value if value != "" else None)
+                    for key, value in row.items()
+                    if key is not None
+                }
+                if not _readable(record) or not _readable(record.values()):
+                    yield row_number, None, UNREADABLE_ROW
+                    continue
+                yield row_number, record, None
+        elif fmt == "ndjson":
+            for row_number, line in enumerate(text, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError as e:
+                    yield row_number, None, f"Invalid JSON: {str(e)}"
+                    continue
+                if not isinstance(record, dict):
+                    yield row_number, None, "Expected a JSON object"
+                    continue
+                # After parsing, so \u0000 escapes are caught as well.
+                if not _readable(record) or not _readable(record.values()):
+                    yield row_number, None, UNREADABLE_ROW
+                    continue
+                yield row_number, record, None
+        else:
+            raise ValueError(f"Unsupported import format: {fmt}")
+    finally:
+        text.detach()
+
+
+class BookImporter:
+    def __init__(
+        self,
+        db: Session,
+        *,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        max_errors: int = DEFAULT_MAX_ERRORS,
+    ):
+        self.db = db
+        self.batch_size = batch_size
+        self.max_errors = max_errors
+        self.report = BookImportReport()
+
+    def _error(self, row: int, isbn: Optional[str], errors: List[str]) -> None:
+        self.report.failed += 1
+        if len(self.report.errors) < self.max_errors:
+            self.report.errors.append(
+                BookImportError(row=row, isbn=isbn, errors=errors)
+            )
+        else:
+            self.report.errors_truncated = True
+
+    def _duplicate(self, row: int, isbn: str, message: str) -> None:
+        self.report.duplicates += 1
+        self._error(row, isbn, [message])
+
+    def run(self, stream: IO[bytes], fmt: str) -> BookImportReport:
+        batch: List[Tuple[int, BookCreate]] = []
+        for row_number, record, parse_error in iter_records(stream, fmt):
+            self.report.total += 1
+            if parse_error:
+                self._error(row_number, None, [parse_error])
+                continue
+            try:
+                batch.append((row_number, BookCreate.model_validate(record)))
+            except ValidationError as e:
+                isbn = record.get("isbn")
+                self._error(
+                    row_number,
+                    str(isbn) if isbn is not None else None,
+                    [
+                        f"{'.'.join(str(loc) for loc in err['loc'])}: {err['msg']}"
+                        for err in e.errors()
+                    ],
+                )
+                continue
+
+            if len(batch) >= self.batch_size:
+                self._flush(batch)
+                batch = []
+
+        self._flush(batch)
+        logger.info(
+            "Book import finished: total=%s, imported=%s, failed=%s",
+            self.report.total,
+            self.report.imported,
+            self.report.failed,
+        )
+        return self.report
+
+    def _flush(self, batch: List[Tuple[int, BookCreate]]) -> None:
+        if not batch:
+            return
+
+        existing = crud_book.existing_isbns(
+            self.db, {book.isbn for _, book in batch if book.isbn}
+        )
+        seen = set()
+        rows: List[Tuple[int, Dict[str, Any]]] = []
+        for row_number, book in batch:
+            if book.isbn:
+                if book.isbn in existing:
+                    self._duplicate(row_number, book.isbn, DUPLICATE_ISBN)
+                    continue
+                if book.isbn in seen:
+                    self._duplicate(row_number, book.isbn, "Duplicate ISBN in upload")
+                    continue
+                seen.add(book.isbn)
+            rows.append((row_number, book.model_dump()))
+
+        try:
+            self.report.imported += crud_book.bulk_insert(
+                self.db, [row for _, row in rows]
+            )
+            self.db.commit()
+        except IntegrityError as e:
+            # Typically a concurrent writer inserted one of our ISBNs after
+            # the lookup; retry row by row so only the failing rows are
+            # rejected, each with its own reason.
+            self.db.rollback()
+            logger.warning("Batch insert conflicted, retrying per row: %s", e)
+            self._insert_one_by_one(rows)
+
+    def _insert_one_by_one(self, rows: List[Tuple[int, Dict[str, Any]]]) -> None:
+        for row_number, row in rows:
+            try:
+                with self.db.begin_nested():
+                    crud_book.bulk_insert(self.db, [row])
+                self.report.imported += 1
+            except IntegrityError as e:
+                if _is_isbn_conflict(e):
+                    self._duplicate(row_number, row.get("isbn"), DUPLICATE_ISBN)
+                else:
+                    self._error(row_number, row.get("isbn"), [_driver_message(e)])
+        self.db.commit()
+
+
+def import_books(
+    db: Session,
+    stream: IO[bytes],
+    fmt: str,
+    *,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    max_errors: int = DEFAULT_MAX_ERRORS,
+) -> BookImportReport:
+    importer = BookImporter(db, batch_size=batch_size, max_errors=max_errors)
+    return importer.run(stream, fmt)
@@ -0,0 +1,177 @@
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Callable, Dict, Optional, TextIO
+import logging
+import queue
+import random
+import sys
+
+import orjson
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+TEXT_FORMAT = "%(asctime)s %(levelname)s %(name)s: %(message)s"
+# Record fields neither format prints, switched off while the pipeline
+# runs: these are the "Optimization" switches of the logging HOWTO, and
+# _srcfile=None alone skips the stack walk that finds the caller.
+RECORD_FLAGS = {
+    "logThreads": False,
+    "logProcesses": False,
+    "logMultiprocessing": False,
+    "_srcfile": None,
+}
+# Attributes every LogRecord has; anything else came in through extra=.
+_RECORD_ATTRIBUTES = set(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
+
+
+class JsonFormatter(logging.Formatter):
+    # One object per line; extra= fields become top-level keys.
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(
+                timespec="milliseconds"
+            ),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES:
+                entry[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exc_info"] = record.exc_text
+        if record.stack_info:
+            entry["stack_info"] = self.formatStack(record.stack_info)
+        return orjson.dumps(entry, default=str).decode()
+
+
+def parse_rates(spec: str) -> Dict[str, float]:
+    # "app.crud.borrow=0.1, app.api=0.5" -> {"app.crud.borrow": 0.1, ...}
+    rates = {}
+    for item in spec.split(","):
+        name, _, rate = item.partition("=")
+        if not name.strip():
+            continue
+        try:
+            rates[name.strip()] = min(max(float(rate), 0.0), 1.0)
+        except ValueError:
+            logger.warning("Ignoring log sampling rate %r", item.strip())
+    return rates
+
+
+class SamplingFilter(logging.Filter):
+    # Keeps a share of the INFO and DEBUG records of the configured loggers
+    # and their children; the most specific configured name wins. Kept
+    # records carry sample_rate so counts can be scaled back up.
+    def __init__(
+        self, rates: Dict[str, float], random: Callable[[], float] = random.random
+    ):
+        super().__init__()
+        self.rates = rates
+        self.random = random
+        self._resolved: Dict[str, float] = {}
+
+    def rate_for(self, name: str) -> float:
+        rate = self._resolved.get(name)
+        if rate is None:
+            rate = 1.0
+            parts = name.split(".")
+            for end in range(len(parts), 0, -1):
+                prefix = ".".join(parts[:end])
+                if prefix in self.rates:
+                    rate = self.rates[prefix]
+                    break
+            self._resolved[name] = rate
+        return rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > logging.INFO:
+            return True
+        rate = self.rate_for(record.name)
+        if rate >= 1.0:
+            return True
+        if self.random() >= rate:
+            return False
+        record.sample_rate = rate
+        return True
+
+
+class LazyQueueHandler(QueueHandler):
+    # QueueHandler.prepare merges msg and args on the calling thread; here
+    # that is left to the writer thread, so a record costs the request one
+    # put. Only tracebacks are rendered up front, so the queue does not
+    # keep frames alive. Arguments are read late: log values, not objects
+    # that change after the call.
+    def __init__(self, queue_: queue.SimpleQueue, capacity: int):
+        super().__init__(queue_)
+        self.capacity = capacity
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        # Never block a request on a slow log sink. SimpleQueue has no
+        # maxsize, but its put is a fraction of the cost of Queue's.
+        if self.queue.qsize() >= self.capacity:
+            self.dropped += 1
+        else:
+            self.queue.put_nowait(record)
+
+
+class LogPipeline:
+    # Root handler that queues records for a QueueListener thread, which
+    # formats and writes them. Started and stopped with the app.
+    def __init__(self):
+        self.handler: Optional[LazyQueueHandler] = None
+        self.listener: Optional[QueueListener] = None
+        self._saved_flags: Dict[str, object] = {}
+
+    @property
+    def dropped(self) -> int:
+        return self.handler.dropped if self.handler is not None else 0
+
+    def start(self, stream: Optional[TextIO] = None) -> None:
+        if self.listener is not None:
+            return
+        output = logging.StreamHandler(stream or sys.stderr)
+        if settings.LOG_FORMAT == "text":
+            output.setFormatter(logging.Formatter(TEXT_FORMAT))
+        else:
+            output.setFormatter(JsonFormatter())
+
+        records: queue.SimpleQueue = queue.SimpleQueue()
+        self.handler = LazyQueueHandler(records, settings.LOG_QUEUE_SIZE)
+        rates = parse_rates(settings.LOG_SAMPLING)
+        if rates:
+            self.handler.addFilter(SamplingFilter(rates))
+        self._saved_flags = {name: getattr(logging, name) for name in RECORD_FLAGS}
+        for name, value in RECORD_FLAGS.items():
+            setattr(logging, name, value)
+        root = logging.getLogger()
+        root.setLevel(settings.LOG_LEVEL.upper())
+        root.addHandler(self.handler)
+        self.listener = QueueListener(records, output, respect_handler_level=True)
+        self.listener.start()
+
+    def stop(self) -> None:
+        # Writes out whatever is still queued before returning.
+        if self.listener is None:
+            return
+        logging.getLogger().removeHandler(self.handler)
+        self.listener.stop()
+        self.listener = None
+        for name, value in self._saved_flags.items():
+            setattr(logging, name, value)
+        if self.handler.dropped:
+            logger.warning("%s log records were dropped", self.handler.dropped)
+
+
+log_pipeline = LogPipeline()
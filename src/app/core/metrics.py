@@ -0,0 +1,225 @@
+from bisect import bisect_left
+from typing import Any, Dict, Iterable, List, Tuple
+import threading
+import time
+
+from app.core.config import settings
+from app.core.profiler import QueryProfile, current_profile, report_repeated
+
+# Upper bounds in seconds, Prometheus style; the last bucket is +Inf.
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+# Requests that matched no route share one label so 404 scans cannot blow
+# up the number of series.
+UNMATCHED_ROUTE = "<unmatched>"
+
+METRICS = {
+    "library_http_requests_in_flight": ("gauge", "Requests being served."),
+    "library_http_requests_total": ("counter", "Requests by route and status."),
+    "library_http_request_duration_seconds": ("histogram", "Request latency."),
+    "library_http_request_db_queries": ("histogram", "Database queries per request."),
+    "library_http_request_db_seconds_total": (
+        "counter",
+        "Time spent in database queries.",
+    ),
+    "library_db_pool_checked_out": ("gauge", "Connections checked out."),
+    "library_db_pool_overflow": ("gauge", "Connections over pool_size."),
+    "library_db_pool_size": ("gauge", "Configured pool_size."),
+    "library_db_pool_connects_total": ("counter", "New DBAPI connections."),
+    "library_db_pool_checkouts_total": ("counter", "Connection checkouts."),
+    "library_db_pool_invalidations_total": ("counter", "Invalidated connections."),
+    "library_db_pool_timeouts_total": ("counter", "Checkouts that hit pool_timeout."),
+    "library_db_pool_wait_seconds": (
+        "histogram",
+        "Time spent waiting for a pooled connection.",
+    ),
+}
+
+
+class Histogram:
+    __slots__ = ("bounds", "buckets", "count", "sum")
+
+    def __init__(self, bounds: Tuple[float, ...]):
+        self.bounds = bounds
+        self.buckets = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.buckets[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def cumulative(self) -> List[Tuple[str, int]]:
+        total = 0
+        result = []
+        for bound, count in zip(self.bounds + ("+Inf",), self.buckets):
+            total += count
+            result.append((str(bound), total))
+        return result
+
+
+class RouteMetrics:
+    __slots__ = ("latency", "queries", "query_seconds", "statuses")
+
+    def __init__(self):
+        self.latency = Histogram(LATENCY_BUCKETS)
+        self.queries = Histogram(QUERY_COUNT_BUCKETS)
+        self.query_seconds = 0.0
+        self.statuses: Dict[int, int] = {}
+
+
+class RequestMetrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.routes: Dict[Tuple[str, str], RouteMetrics] = {}
+        self.in_flight = 0
+
+    def observe(
+        self,
+        method: str,
+        route: str,
+        status: int,
+        seconds: float,
+        queries: QueryProfile,
+    ) -> None:
+        key = (method, route)
+        with self._lock:
+            metrics = self.routes.get(key)
+            if metrics is None:
+                metrics = self.routes[key] = RouteMetrics()
+            metrics.latency.observe(seconds)
+            metrics.queries.observe(queries.count)
+            metrics.query_seconds += queries.seconds
+            metrics.statuses[status] = metrics.statuses.get(status, 0) + 1
+
+    def reset(self) -> None:
+        with self._lock:
+            self.routes.clear()
+
+    def render(self, pools: Iterable[Any] = ()) -> str:
+        out: List[str] = []
+        with self._lock:
+            routes = sorted(self.routes.items())
+            _header(out, "library_http_requests_in_flight")
+            out.append(f"library_http_requests_in_flight {self.in_flight}")
+
+            _header(out, "library_http_requests_total")
+            for (method, route), m in routes:
+                for status, count in sorted(m.statuses.items()):
+                    labels = _labels(method=method, route=route, status=status)
+                    out.append(f"library_http_requests_total{{{labels}}} {count}")
+
+            for name, attr in (
+                ("library_http_request_duration_seconds", "latency"),
+                ("library_http_request_db_queries", "queries"),
+            ):
+                _header(out, name)
+                for (method, route), m in routes:
+                    _histogram(out, name, getattr(m, attr), method=method, route=route)
+
+            _header(out, "library_http_request_db_seconds_total")
+            for (method, route), m in routes:
+                labels = _labels(method=method, route=route)
+                out.append(
+                    f"library_http_request_db_seconds_total{{{labels}}} "
+                    f"{m.query_seconds:.6f}"
+                )
+
+        _render_pools(out, [p.stats() for p in pools])
+        out.append("")
+        return "\n".join(out)
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**labels: Any) -> str:
+    return ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items())
+
+
+def _header(out: List[str], name: str) -> None:
+    kind, help = METRICS[name]
+    out.append(f"# HELP {name} {help}")
+    out.append(f"# TYPE {name} {kind}")
+
+
+def _histogram(out: List[str], name: str, histogram: Histogram, **labels) -> None:
+    base = _labels(**labels)
+    for bound, count in histogram.cumulative():
+        out.append(f'{name}_bucket{{{base},le="{bound}"}} {count}')
+    out.append(f"{name}_sum{{{base}}} {histogram.sum:.6f}")
+    out.append(f"{name}_count{{{base}}} {histogram.count}")
+
+
+POOL_GAUGES = ("checked_out", "overflow", "size")
+POOL_COUNTERS = ("connects", "checkouts", "invalidations", "timeouts")
+
+
+def _render_pools(out: List[str], pools: List[Dict[str, Any]]) -> None:
+    # PoolMetrics.stats() already keeps its wait histogram cumulative.
+    for gauge in POOL_GAUGES:
+        name = f"library_db_pool_{gauge}"
+        _header(out, name)
+        for pool in pools:
+            if gauge in pool:
+                out.append(f"{name}{{{_labels(pool=pool['name'])}}} {pool[gauge]}")
+    for counter in POOL_COUNTERS:
+        name = f"library_db_pool_{counter}_total"
+        _header(out, name)
+        for pool in pools:
+            out.append(f"{name}{{{_labels(pool=pool['name'])}}} {pool[counter]}")
+    name = "library_db_pool_wait_seconds"
+    _header(out, name)
+    for pool in pools:
+        wait = pool["wait_seconds"]
+        base = _labels(pool=pool["name"])
+        for bound, count in wait["buckets"].items():
+            out.append(f'{name}_bucket{{{base},le="{bound}"}} {count}')
+        out.append(f"{name}_sum{{{base}}} {wait['sum']}")
+        out.append(f"{name}_count{{{base}}} {wait['count']}")
+
+
+request_metrics = RequestMetrics()
+
+
+class MetricsMiddleware:
+    # Plain ASGI rather than BaseHTTPMiddleware, which would add a task and
+    # a memory stream per request. The route label is the path template
+    # the router stored in the scope, so /books/1 and /books/2 share one
+    # series.
+    def __init__(self, app, metrics: RequestMetrics = request_metrics):
+        self.app = app
+        self.metrics = metrics
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        queries = QueryProfile(record=settings.SQL_PROFILE)
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        token = current_profile.set(queries)
+        self.metrics.in_flight += 1
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            self.metrics.in_flight -= 1
+            current_profile.reset(token)
+            method = scope["method"]
+            route = getattr(scope.get("route"), "path", UNMATCHED_ROUTE)
+            self.metrics.observe(method, route, status, elapsed, queries)
+            if queries.statements is not None:
+                report_repeated(queries, f"{method} {route}")
@@ -0,0 +1,62 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Any, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def _json_default(value: Any) -> str:
+    # Datetime sort keys travel as ISO strings; the caller parses them back.
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Cannot encode {type(value).__name__} in a cursor")
+
+
+def encode_cursor(sort: str, value: Any, last_id: int) -> str:
+    raw = json.dumps(
+        [sort, value, last_id], separators=(",", ":"), default=_json_default
+    )
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def _key_type(column) -> type:
+    # JSON type the sort key of this column travels as in a cursor.
+    python_type = column.type.python_type
+    return str if python_type is datetime else python_type
+
+
+def decode_cursor(cursor: str, sort: str, column) -> Tuple[Any, int]:
+    # column is the sort column: the key is checked against its type, so a
+    # crafted cursor cannot put arbitrary JSON into the keyset comparison.
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        cursor_sort, value, last_id = json.loads(base64.urlsafe_b64decode(padded))
+    except (binascii.Error, ValueError, TypeError) as e:
+        logger.warning("Malformed pagination cursor: %s", e)
+        raise InvalidCursor("Malformed cursor")
+
+    if cursor_sort != sort:
+        raise InvalidCursor("Cursor was issued for a different sort order")
+    # bool is an int subclass, but not an id.
+    if type(last_id) is not int:
+        raise InvalidCursor("Malformed cursor")
+    if value is None:
+        if not column.nullable:
+            raise InvalidCursor("Malformed cursor")
+    elif type(value) is not _key_type(column):
+        raise InvalidCursor("Malformed cursor")
+    return value, last_id
+
+
+def split_page(rows: list, sort: str, limit: int) -> Tuple[list, Optional[str]]:
+    if len(rows) <= limit:
+        return rows, None
+    last = rows[limit - 1]
+    return rows[:limit], encode_cursor(sort, getattr(last, sort), last.id)
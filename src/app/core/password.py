@@ -1,16 +1,27 @@
 from passlib.context import CryptContext
+from typing import Optional, Tuple
 import logging
 
+from app.core.config import settings
+
 logger = logging.getLogger(__name__)
 
-pwd_context = CryptContext(schemes=["bcrypt"], bcrypt__rounds=12, deprecated="auto")
+# min/max pinned to the configured cost so verify_and_update rehashes any
+# stored hash made with a different one.
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    bcrypt__default_rounds=settings.PASSWORD_HASH_ROUNDS,
+    bcrypt__min_rounds=settings.PASSWORD_HASH_ROUNDS,
+    bcrypt__max_rounds=settings.PASSWORD_HASH_ROUNDS,
+    deprecated="auto",
+)
 
 
 def get_password_hash(password: str) -> str:
     try:
         return pwd_context.hash(password)
     except Exception as e:
-        logger.error(f"Password hashing failed: {str(e)}")
+        logger.error("Password hashing failed: %s", e)
         raise
 
 
@@ -18,5 +29,15 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     try:
         return pwd_context.verify(plain_password, hashed_password)
     except Exception as e:
-        logger.error(f"Password verification failed: {str(e)}")
+        logger.error("Password verification failed: %s", e)
         return False
+
+
+def verify_and_update_password(
+    plain_password: str, hashed_password: str
+) -> Tuple[bool, Optional[str]]:
+    try:
+        return pwd_context.verify_and_update(plain_password, hashed_password)
+    except Exception as e:
+        logger.error("Password verification failed: %s", e)
+        return False, None
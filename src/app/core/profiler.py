@@ -0,0 +1,151 @@
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Iterator, List, Optional, Tuple
+import logging
+import time
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Longest parameter repr written to the log; bulk inserts can be huge.
+MAX_LOGGED_PARAMETERS = 500
+
+
+class QueryProfile:
+    # Count and time of the statements run on behalf of one request. With
+    # record=True every statement is kept too, for N+1 detection.
+    __slots__ = ("count", "seconds", "statements")
+
+    def __init__(self, record: bool = False):
+        self.count = 0
+        self.seconds = 0.0
+        self.statements: Optional[List[Tuple[str, Any, float]]] = [] if record else None
+
+    def add(self, statement: str, parameters: Any, seconds: float) -> None:
+        self.count += 1
+        self.seconds += seconds
+        if self.statements is not None:
+            self.statements.append((statement, parameters, seconds))
+
+    def repeated(self, threshold: int) -> List[Tuple[str, int]]:
+        # Same SQL text, any parameters: the shape of an N+1 loop.
+        counts = Counter(statement for statement, _, _ in self.statements or ())
+        return [(s, n) for s, n in counts.most_common() if n >= threshold]
+
+    def duplicates(self) -> List[Tuple[str, int]]:
+        # Same SQL text and parameters: a result that could have been reused.
+        counts = Counter(
+            (statement, repr(parameters))
+            for statement, parameters, _ in self.statements or ()
+        )
+        return [(s, n) for (s, _), n in counts.most_common() if n > 1]
+
+    def describe(self) -> str:
+        lines = [f"{self.count} queries in {self.seconds * 1000:.1f} ms"]
+        for statement, parameters, seconds in self.statements or ():
+            lines.append(f"  {seconds * 1000:7.2f} ms  {_one_line(statement)}")
+        return "\n".join(lines)
+
+
+# Set by MetricsMiddleware for each request. Sync endpoints run in the
+# threadpool with a copy of the context, which still points at the same
+# QueryProfile.
+current_profile: ContextVar[Optional[QueryProfile]] = ContextVar(
+    "current_profile", default=None
+)
+# Profiles that see every statement in the process, whatever the context:
+# the TestClient runs the app in another thread, out of the test's context.
+_observers: List[QueryProfile] = []
+
+
+def _one_line(statement: str) -> str:
+    return " ".join(statement.split())
+
+
+def _record(
+    statement: str,
+    parameters: Any,
+    seconds: float,
+    error: Optional[BaseException] = None,
+) -> None:
+    profile = current_profile.get()
+    if profile is not None:
+        profile.add(statement, parameters, seconds)
+    for observer in _observers:
+        observer.add(statement, parameters, seconds)
+    slow = settings.SQL_SLOW_QUERY_SECONDS
+    if slow and seconds >= slow:
+        logger.warning(
+            "Slow query (%.1f ms%s): %s parameters=%s",
+            seconds * 1000,
+            f", failed: {type(error).__name__}" if error is not None else "",
+            _one_line(statement),
+            repr(parameters)[:MAX_LOGGED_PARAMETERS],
+        )
+
+
+# The start time lives on the execution context, which is dropped with the
+# statement; after_cursor_execute never runs for one that raises, so
+# handle_error records those (timeouts are the slowest statements of all).
+def _before_cursor_execute(conn, cursor, statement, parameters, context, many):
+    context._query_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, many):
+    started, context._query_started = context._query_started, None
+    if started is not None:
+        _record(statement, parameters, time.perf_counter() - started)
+
+
+def _handle_error(exception_context) -> None:
+    context = exception_context.execution_context
+    started = getattr(context, "_query_started", None)
+    if started is not None:
+        context._query_started = None
+        _record(
+            exception_context.statement,
+            exception_context.parameters,
+            time.perf_counter() - started,
+            exception_context.original_exception,
+        )
+
+
+def instrument_queries(engine: Engine) -> None:
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+        event.listen(engine, "handle_error", _handle_error)
+
+
+def report_repeated(profile: QueryProfile, label: str) -> None:
+    for statement, count in profile.repeated(settings.SQL_N_PLUS_ONE_THRESHOLD):
+        logger.warning(
+            "Possible N+1 in %s: %s executions of %s",
+            label,
+            count,
+            _one_line(statement),
+        )
+    for statement, count in profile.duplicates():
+        logger.warning(
+            "Duplicate query in %s: %s identical executions of %s",
+            label,
+            count,
+            _one_line(statement),
+        )
+
+
+@contextmanager
+def profile_queries() -> Iterator[QueryProfile]:
+    # Records every statement on an instrumented engine until the block
+    # exits, from any thread.
+    profile = QueryProfile(record=True)
+    _observers.append(profile)
+    try:
+        yield profile
+    finally:
+        _observers.remove(profile)
@@ -0,0 +1,70 @@
+from typing import Optional
+import logging
+import threading
+
+from app.core.config import settings
+from app.crud.stats import stats as crud_stats
+from app.db.partitions import ensure_partitions
+from app.db.session import SessionLocal, engine
+
+logger = logging.getLogger(__name__)
+
+
+class StatsRefresher:
+    # Folds circulation events into the stats rollups off the request path,
+    # and keeps the monthly borrowed_books partitions ahead of the clock.
+    def __init__(self, interval: float, batch_size: int):
+        self.interval = interval
+        self.batch_size = batch_size
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def run_once(self) -> int:
+        processed = 0
+        db = SessionLocal()
+        try:
+            while True:
+                count = crud_stats.refresh(db, batch_size=self.batch_size)
+                processed += count
+                if count < self.batch_size:
+                    return processed
+        finally:
+            db.close()
+
+    def ensure_partitions(self) -> None:
+        with engine.begin() as conn:
+            ensure_partitions(conn, months_ahead=settings.BORROW_PARTITION_MONTHS_AHEAD)
+
+    def _loop(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                self.run_once()
+            except Exception as e:
+                logger.error("Background stats refresh failed: %s", e)
+            try:
+                self.ensure_partitions()
+            except Exception as e:
+                logger.error("Creating borrowed_books partitions failed: %s", e)
+
+    def start(self) -> None:
+        if self.interval <= 0 or self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._loop, name="stats-refresher", daemon=True
+        )
+        self._thread.start()
+        logger.info("Stats refresher started, interval %ss", self.interval)
+
+    def stop(self) -> None:
+        thread, self._thread = self._thread, None
+        if thread is not None:
+            self._stop.set()
+            thread.join()
+            logger.info("Stats refresher stopped")
+
+
+stats_refresher = StatsRefresher(
+    interval=settings.STATS_REFRESH_SECONDS,
+    batch_size=settings.STATS_REFRESH_BATCH,
+)
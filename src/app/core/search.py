@@ -0,0 +1,90 @@
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+import re
+import logging
+
+logger = logging.getLogger(__name__)
+
+TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+# Same relative weights Postgres ts_rank_cd uses for labels A, B and C.
+FIELD_WEIGHTS = {"title": 1.0, "author": 0.4, "description": 0.2}
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    if not text:
+        return []
+    return TOKEN_RE.findall(text.lower())
+
+
+def parse_query(query: str) -> Tuple[List[str], List[str]]:
+    required, excluded = [], []
+    for word in query.split():
+        target = excluded if word.startswith("-") else required
+        target.extend(tokenize(word))
+    return required, excluded
+
+
+class InvertedIndex:
+    def __init__(self):
+        self._postings: Dict[str, Dict[int, float]] = defaultdict(dict)
+        self._terms: Dict[int, List[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self._terms)
+
+    def add(self, doc_id: int, fields: Dict[str, Optional[str]]) -> None:
+        self.remove(doc_id)
+        scores: Dict[str, float] = defaultdict(float)
+        for field, text in fields.items():
+            weight = FIELD_WEIGHTS.get(field, 0.1)
+            for term in tokenize(text):
+                scores[term] += weight
+
+        for term, score in scores.items():
+            self._postings[term][doc_id] = score
+        self._terms[doc_id] = list(scores)
+
+    def remove(self, doc_id: int) -> None:
+        for term in self._terms.pop(doc_id, []):
+            postings = self._postings.get(term)
+            if postings is None:
+                continue
+            postings.pop(doc_id, None)
+            if not postings:
+                del self._postings[term]
+
+    def clear(self) -> None:
+        self._postings.clear()
+        self._terms.clear()
+
+    def search(self, query: str, limit: int = 20) -> List[Tuple[int, float]]:
+        required, excluded = parse_query(query)
+        if not required:
+            return []
+
+        # Intersect starting from the rarest term to keep the candidate set small.
+        postings = sorted(
+            (self._postings.get(term, {}) for term in set(required)), key=len
+        )
+        candidates = set(postings[0])
+        for posting in postings[1:]:
+            candidates.intersection_update(posting)
+            if not candidates:
+                return []
+
+        for term in excluded:
+            candidates.difference_update(self._postings.get(term, {}))
+
+        ranked = [
+            (doc_id, sum(posting[doc_id] for posting in postings))
+            for doc_id in candidates
+        ]
+        ranked.sort(key=lambda item: (-item[1], item[0]))
+        return ranked[:limit]
+
+    def rebuild(self, documents: Iterable[Tuple[int, Dict[str, Optional[str]]]]):
+        self.clear()
+        for doc_id, fields in documents:
+            self.add(doc_id, fields)
+        logger.info("Search index rebuilt with %s documents", len(self))
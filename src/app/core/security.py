@@ -1,22 +1,24 @@
 from datetime import datetime, timedelta, timezone
-from typing import Optional, Annotated
+from typing import Dict, Optional, Annotated, Set, Tuple
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
 import logging
+import threading
+import time
 
+from app.core.cache import MemoryCache
 from app.core.config import settings
 from app.core.password import verify_password
+from app.db.models import User
+from app.db.session import get_async_db, get_db
 from app.schemas.user import UserInDB
 
 logger = logging.getLogger(__name__)
 
-def get_db():
-    from app.db.session import get_db as _get_db
-
-    return _get_db()
-
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
 def create_access_token(subject: str, expires_delta: Optional[timedelta] = None) -> str:
@@ -29,20 +31,67 @@ def create_access_token(subject: str, expires_delta: Optional[timedelta] = None)
             to_encode, settings.JWT_SECRET_KEY, algorithm=settings.JWT_ALGORITHM
         )
     except Exception as e:
-        logger.error(f"Token creation failed: {str(e)}")
+        logger.error("Token creation failed: %s", e)
         raise
 
 
-def get_current_user(token: Annotated[str, Depends(oauth2_scheme)]) -> UserInDB:
-    from app.db.session import get_db
-    from app.crud.user import user as crud_user
+class PrincipalCache:
+    def __init__(self, max_entries: int, ttl: float):
+        self.ttl = ttl
+        self._entries = MemoryCache(max_entries=max_entries)
+        self._tokens_by_user: Dict[int, Set[str]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, token: str) -> Optional[UserInDB]:
+        return self._entries.get(token)
+
+    def put(self, token: str, user: UserInDB, expires_at: float) -> None:
+        # Never outlive the token itself.
+        ttl = min(self.ttl, expires_at - time.time())
+        if ttl <= 0:
+            return
+        with self._lock:
+            # Forget tokens that already expired or were evicted.
+            tokens = {
+                t
+                for t in self._tokens_by_user.get(user.id, ())
+                if self._entries.get(t) is not None
+            }
+            tokens.add(token)
+            self._tokens_by_user[user.id] = tokens
+            self._entries.set(token, user, ttl)
+
+    def invalidate_user(self, user_id: int) -> None:
+        with self._lock:
+            tokens = self._tokens_by_user.pop(user_id, set())
+            self._entries.delete(*tokens)
+        if tokens:
+            logger.info("Dropped %s cached tokens for user ID=%s", len(tokens), user_id)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._tokens_by_user.clear()
+        self._entries.clear()
+
 
-    credentials_exception = HTTPException(
+principal_cache = PrincipalCache(
+    max_entries=settings.AUTH_CACHE_MAX_ENTRIES, ttl=settings.AUTH_CACHE_TTL_SECONDS
+)
+
+
+def invalidate_user(user_id: int) -> None:
+    principal_cache.invalidate_user(user_id)
+
+
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
 
+
+def _decode_token(token: str) -> Tuple[int, float]:
     try:
         payload = jwt.decode(
             token, settings.JWT_SECRET_KEY, algorithms=[settings.JWT_ALGORITHM]
@@ -50,23 +99,64 @@ def get_current_user(token: Annotated[str, Depends(oauth2_scheme)]) -> UserInDB:
         user_id: str = payload.get("sub")
         if user_id is None:
             logger.warning("JWT token missing 'sub' claim")
-            raise credentials_exception
-    except JWTError as e:
-        logger.error(f"JWT decode error: {str(e)}")
-        raise credentials_exception
+            raise _credentials_exception()
+        return int(user_id), float(payload.get("exp", 0))
+    except (JWTError, ValueError) as e:
+        logger.error("JWT decode error: %s", e)
+        raise _credentials_exception()
+
+
+def token_user_id(token: str) -> Optional[int]:
+    # For admission control, which runs before any route: the cached
+    # principal's id, else the verified sub claim. None for a token that
+    # get_current_user would reject; that request gets its 401 later.
+    principal = principal_cache.get(token)
+    if principal is not None:
+        return principal.id
     try:
-        db_gen = get_db()
-        db = next(db_gen)
-        user = crud_user.get(db, id=int(user_id))
-        if user is None:
-            logger.warning(f"User not found for ID: {user_id}")
-            raise credentials_exception
-        return UserInDB.model_validate(user)
-    except Exception as e:
-        logger.error(f"Error retrieving user: {str(e)}")
-        raise credentials_exception
-    finally:
-        try:
-            next(db_gen)
-        except StopIteration:
-            pass
+        payload = jwt.decode(
+            token, settings.JWT_SECRET_KEY, algorithms=[settings.JWT_ALGORITHM]
+        )
+        return int(payload["sub"])
+    except (JWTError, KeyError, TypeError, ValueError):
+        return None
+
+
+def get_current_user(
+    token: Annotated[str, Depends(oauth2_scheme)],
+    db: Session = Depends(get_db),
+) -> UserInDB:
+    # Shares the route's request-scoped session: FastAPI resolves get_db once
+    # per request.
+    principal = principal_cache.get(token)
+    if principal is not None:
+        return principal
+
+    user_id, expires_at = _decode_token(token)
+    user = db.get(User, user_id)
+    if user is None:
+        logger.warning("User not found for ID: %s", user_id)
+        raise _credentials_exception()
+
+    principal = UserInDB.model_validate(user)
+    principal_cache.put(token, principal, expires_at)
+    return principal
+
+
+async def get_current_user_async(
+    token: Annotated[str, Depends(oauth2_scheme)],
+    db: AsyncSession = Depends(get_async_db),
+) -> UserInDB:
+    principal = principal_cache.get(token)
+    if principal is not None:
+        return principal
+
+    user_id, expires_at = _decode_token(token)
+    user = await db.get(User, user_id)
+    if user is None:
+        logger.warning("User not found for ID: %s", user_id)
+        raise _credentials_exception()
+
+    principal = UserInDB.model_validate(user)
+    principal_cache.put(token, principal, expires_at)
+    return principal
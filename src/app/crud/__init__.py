@@ -1,6 +1,13 @@
-from .book import book as book_crud
+from .book import book as book_crud, async_book as async_book_crud
 from .borrow import borrow as borrow_crud
-from .reader import reader as reader_crud
+from .reader import reader as reader_crud, async_reader as async_reader_crud
 from .user import user as user_crud
 
-__all__ = ["book_crud", "borrow_crud", "reader_crud", "user_crud"]
+__all__ = [
+    "book_crud",
+    "async_book_crud",
+    "borrow_crud",
+    "reader_crud",
+    "async_reader_crud",
+    "user_crud",
+]
@@ -1,12 +1,71 @@
-from sqlalchemy.orm import Session
-from typing import Optional, List
+from sqlalchemy import Select, event, func, insert, literal_column, select, tuple_
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.engine import Engine, Row
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, load_only
+from typing import Any, Dict, Iterable, Iterator, Optional, List, Set, Tuple
+from datetime import datetime
+import csv
+import io
 import logging
+import threading
 
+import orjson
+
+from app.core.cache import entity_cache
+from app.core.fields import fetched_fields
+from app.core.pagination import decode_cursor, split_page
+from app.core.search import InvertedIndex
 from app.db.models import Book
-from app.schemas.book import BookCreate, BookUpdate
+from app.schemas.book import BookCreate, BookUpdate, BookRead
 
 logger = logging.getLogger(__name__)
 
+SEARCH_VECTOR = literal_column("search_vector", type_=TSVECTOR)
+
+
+# In-process fallback for backends without the Postgres search_vector column.
+class BookSearchIndex:
+    def __init__(self):
+        self._index = InvertedIndex()
+        self._lock = threading.Lock()
+        self._generation = 0
+        self._built_generation = -1
+        self._bind_url = None
+
+    def invalidate(self, *args) -> None:
+        self._generation += 1
+
+    def search(self, db: Session, query: str, limit: int) -> List[Tuple[int, float]]:
+        with self._lock:
+            bind_url = str(db.get_bind().url)
+            generation = self._generation
+            if generation != self._built_generation or bind_url != self._bind_url:
+                rows = db.execute(
+                    select(Book.id, Book.title, Book.author, Book.description)
+                )
+                self._index.rebuild(
+                    (
+                        row.id,
+                        {
+                            "title": row.title,
+                            "author": row.author,
+                            "description": row.description,
+                        },
+                    )
+                    for row in rows
+                )
+                self._built_generation = generation
+                self._bind_url = bind_url
+            return self._index.search(query, limit)
+
+
+search_index = BookSearchIndex()
+
+for _event_name in ("after_insert", "after_update", "after_delete"):
+    event.listen(Book, _event_name, search_index.invalidate)
+
 
 class CRUDBook:
     def get(self, db: Session, id: int) -> Optional[Book]:
@@ -15,8 +74,141 @@ class CRUDBook:
     def get_by_isbn(self, db: Session, isbn: str) -> Optional[Book]:
         return db.query(Book).filter(Book.isbn == isbn).first()
 
-    def get_multi(self, db: Session, *, skip: int = 0, limit: int = 100) -> List[Book]:
-        return db.query(Book).offset(skip).limit(limit).all()
+    def serialize(self, book: Optional[Book]) -> Optional[bytes]:
+        if book is None:
+            return None
+        return BookRead.model_validate(book).model_dump_json().encode()
+
+    def get_payload(self, db: Session, id: int) -> Optional[bytes]:
+        return entity_cache.get_or_load(
+            f"book:{id}", lambda: self.serialize(self.get(db, id=id))
+        )
+
+    def get_payload_by_isbn(self, db: Session, isbn: str) -> Optional[bytes]:
+        return entity_cache.get_or_load(
+            f"book:isbn:{isbn}", lambda: self.serialize(self.get_by_isbn(db, isbn=isbn))
+        )
+
+    def invalidate_cache(self, id: int, *isbns: Optional[str]) -> None:
+        entity_cache.invalidate(
+            f"book:{id}", *(f"book:isbn:{isbn}" for isbn in isbns if isbn)
+        )
+
+    # BookRead fields, in order. The list endpoints fetch the requested ones
+    # as plain rows and encode them directly, without building Book instances.
+    LIST_FIELDS = tuple(BookRead.model_fields)
+    # description runs to 1000 characters and list views do not show it, so
+    # lists only fetch it when ?fields= asks for it.
+    DEFAULT_LIST_FIELDS = tuple(f for f in LIST_FIELDS if f != "description")
+
+    def list_columns(self, fields: Iterable[str], sort: str = "id") -> tuple:
+        return tuple(
+            getattr(Book, name)
+            for name in fetched_fields(fields, self.LIST_FIELDS, sort)
+        )
+
+    def get_multi(
+        self,
+        db: Session,
+        *,
+        skip: int = 0,
+        limit: int = 100,
+        fields: Iterable[str] = DEFAULT_LIST_FIELDS,
+    ) -> List[Row]:
+        stmt = select(*self.list_columns(fields)).offset(skip).limit(limit)
+        return db.execute(stmt).all()
+
+    SORT_COLUMNS = {"id": Book.id, "title": Book.title, "author": Book.author}
+
+    def page_statement(
+        self, sort: str, cursor: Optional[str], limit: int, columns=(Book,)
+    ) -> Select:
+        column = self.SORT_COLUMNS[sort]
+        stmt = select(*columns)
+        if cursor:
+            value, last_id = decode_cursor(cursor, sort, column)
+            if sort == "id":
+                stmt = stmt.where(Book.id > last_id)
+            else:
+                stmt = stmt.where(tuple_(column, Book.id) > tuple_(value, last_id))
+        # One extra row tells split_page whether another page exists.
+        return stmt.order_by(column, Book.id).limit(limit + 1)
+
+    def get_page(
+        self,
+        db: Session,
+        *,
+        sort: str = "id",
+        cursor: Optional[str] = None,
+        limit: int = 100,
+        fields: Iterable[str] = DEFAULT_LIST_FIELDS,
+    ) -> Tuple[List[Row], Optional[str]]:
+        columns = self.list_columns(fields, sort)
+        rows = db.execute(self.page_statement(sort, cursor, limit, columns)).all()
+        return split_page(list(rows), sort, limit)
+
+    def search(
+        self,
+        db: Session,
+        *,
+        q: str,
+        limit: int = 20,
+        fields: Iterable[str] = DEFAULT_LIST_FIELDS,
+    ) -> List[Row]:
+        columns = self.list_columns(fields)
+        if db.get_bind().dialect.name == "postgresql":
+            ts_query = func.websearch_to_tsquery("simple", q)
+            rank = func.ts_rank_cd(SEARCH_VECTOR, ts_query)
+            return db.execute(
+                select(*columns)
+                .where(SEARCH_VECTOR.op("@@")(ts_query))
+                .order_by(rank.desc(), Book.id)
+                .limit(limit)
+            ).all()
+
+        ranked = search_index.search(db, q, limit)
+        if not ranked:
+            return []
+        books = {
+            row.id: row
+            for row in db.execute(
+                select(*columns).where(Book.id.in_([id for id, _ in ranked]))
+            )
+        }
+        return [books[id] for id, _ in ranked if id in books]
+
+    EXPORT_COLUMNS = (
+        Book.id,
+        Book.title,
+        Book.author,
+        Book.year,
+        Book.isbn,
+        Book.copies_available,
+        Book.description,
+        Book.updated_at,
+    )
+
+    def stream_export(
+        self,
+        bind: Engine,
+        *,
+        since: Optional[datetime] = None,
+        chunk_size: int = 1000,
+    ) -> Iterator[bytes]:
+        # Runs on its own connection so the stream outlives the request session.
+        stmt = select(*self.EXPORT_COLUMNS).order_by(Book.id)
+        if since is not None:
+            stmt = stmt.where(Book.updated_at >= since)
+
+        exported = 0
+        with bind.connect() as conn:
+            result = conn.execution_options(
+                stream_results=True, yield_per=chunk_size
+            ).execute(stmt)
+            for rows in result.partitions():
+                exported += len(rows)
+                yield b"".join(orjson.dumps(row._asdict()) + b"\n" for row in rows)
+        logger.info("Exported %s books", exported)
 
     def create(self, db: Session, *, obj_in: BookCreate) -> Book:
         try:
@@ -24,14 +216,70 @@ class CRUDBook:
             db.add(db_book)
             db.commit()
             db.refresh(db_book)
-            logger.info(f"Book created: ID={db_book.id}, Title={db_book.title}")
+            logger.info("Book created: ID=%s, Title=%s", db_book.id, db_book.title)
             return db_book
         except Exception as e:
             db.rollback()
-            logger.error(f"Error creating book: {str(e)}")
+            logger.error("Error creating book: %s", e)
             raise
 
+    IMPORT_COLUMNS = (
+        "title",
+        "author",
+        "year",
+        "isbn",
+        "copies_available",
+        "description",
+    )
+
+    def existing_isbns(self, db: Session, isbns: Iterable[str]) -> Set[str]:
+        isbns = list(isbns)
+        if not isbns:
+            return set()
+        return set(db.scalars(select(Book.isbn).where(Book.isbn.in_(isbns))))
+
+    def bulk_insert(self, db: Session, rows: List[Dict[str, Any]]) -> int:
+        # Caller owns the transaction; rows must already be validated.
+        if not rows:
+            return 0
+        if db.get_bind().dialect.driver == "psycopg2":
+            self._copy_rows(db, rows)
+        else:
+            db.execute(
+                insert(Book),
+                [
+                    {column: row.get(column) for column in self.IMPORT_COLUMNS}
+                    for row in rows
+                ],
+            )
+        search_index.invalidate()
+        return len(rows)
+
+    def _copy_rows(self, db: Session, rows: List[Dict[str, Any]]) -> None:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for row in rows:
+            writer.writerow(
+                ["\\N" if row.get(c) is None else row[c] for c in self.IMPORT_COLUMNS]
+            )
+        buffer.seek(0)
+
+        dialect = db.get_bind().dialect
+        table = dialect.identifier_preparer.format_table(Book.__table__)
+        statement = (
+            f"COPY {table} ({', '.join(self.IMPORT_COLUMNS)}) "
+            "FROM STDIN WITH (FORMAT csv, NULL '\\N')"
+        )
+        cursor = db.connection().connection.cursor()
+        try:
+            cursor.copy_expert(statement, buffer)
+        except dialect.dbapi.IntegrityError as e:
+            raise IntegrityError(statement, None, e)
+        finally:
+            cursor.close()
+
     def update(self, db: Session, *, db_obj: Book, obj_in: BookUpdate) -> Book:
+        old_isbn = db_obj.isbn
         try:
             update_data = obj_in.model_dump(exclude_unset=True)
             for field, value in update_data.items():
@@ -39,11 +287,12 @@ class CRUDBook:
             db.add(db_obj)
             db.commit()
             db.refresh(db_obj)
-            logger.info(f"Book updated: ID={db_obj.id}")
+            self.invalidate_cache(db_obj.id, old_isbn, db_obj.isbn)
+            logger.info("Book updated: ID=%s", db_obj.id)
             return db_obj
         except Exception as e:
             db.rollback()
-            logger.error(f"Error updating book ID={db_obj.id}: {str(e)}")
+            logger.error("Error updating book ID=%s: %s", db_obj.id, e)
             raise
 
     def remove(self, db: Session, *, id: int) -> Optional[Book]:
@@ -52,13 +301,115 @@ class CRUDBook:
             try:
                 db.delete(book)
                 db.commit()
-                logger.info(f"Book deleted: ID={id}")
+                self.invalidate_cache(id, book.isbn)
+                logger.info("Book deleted: ID=%s", id)
                 return book
             except Exception as e:
                 db.rollback()
-                logger.error(f"Error deleting book ID={id}: {str(e)}")
+                logger.error("Error deleting book ID=%s: %s", id, e)
                 raise
         return None
 
 
 book = CRUDBook()
+
+
+class AsyncCRUDBook:
+    async def get(self, db: AsyncSession, id: int) -> Optional[Book]:
+        return await db.get(Book, id)
+
+    async def get_by_isbn(self, db: AsyncSession, isbn: str) -> Optional[Book]:
+        return await db.scalar(select(Book).where(Book.isbn == isbn).limit(1))
+
+    async def get_payload(self, db: AsyncSession, id: int) -> Optional[bytes]:
+        async def load():
+            return book.serialize(await self.get(db, id=id))
+
+        return await entity_cache.aget_or_load(f"book:{id}", load)
+
+    async def get_payload_by_isbn(self, db: AsyncSession, isbn: str) -> Optional[bytes]:
+        async def load():
+            return book.serialize(await self.get_by_isbn(db, isbn=isbn))
+
+        return await entity_cache.aget_or_load(f"book:isbn:{isbn}", load)
+
+    LIST_FIELDS = book.LIST_FIELDS
+    DEFAULT_LIST_FIELDS = book.DEFAULT_LIST_FIELDS
+
+    # Unrequested columns are left unloaded; reading one would lazy-load,
+    # which AsyncSession does not allow, so callers must stick to fields.
+    async def get_multi(
+        self,
+        db: AsyncSession,
+        *,
+        skip: int = 0,
+        limit: int = 100,
+        fields: Iterable[str] = DEFAULT_LIST_FIELDS,
+    ) -> List[Book]:
+        stmt = select(Book).options(load_only(*book.list_columns(fields)))
+        return list(await db.scalars(stmt.offset(skip).limit(limit)))
+
+    async def get_page(
+        self,
+        db: AsyncSession,
+        *,
+        sort: str = "id",
+        cursor: Optional[str] = None,
+        limit: int = 100,
+        fields: Iterable[str] = DEFAULT_LIST_FIELDS,
+    ) -> Tuple[List[Book], Optional[str]]:
+        stmt = book.page_statement(sort, cursor, limit).options(
+            load_only(*book.list_columns(fields, sort))
+        )
+        rows = await db.scalars(stmt)
+        return split_page(list(rows), sort, limit)
+
+    async def create(self, db: AsyncSession, *, obj_in: BookCreate) -> Book:
+        try:
+            db_book = Book(**obj_in.model_dump())
+            db.add(db_book)
+            await db.commit()
+            await db.refresh(db_book)
+            logger.info("Book created: ID=%s, Title=%s", db_book.id, db_book.title)
+            return db_book
+        except Exception as e:
+            await db.rollback()
+            logger.error("Error creating book: %s", e)
+            raise
+
+    async def update(
+        self, db: AsyncSession, *, db_obj: Book, obj_in: BookUpdate
+    ) -> Book:
+        old_isbn = db_obj.isbn
+        try:
+            update_data = obj_in.model_dump(exclude_unset=True)
+            for field, value in update_data.items():
+                setattr(db_obj, field, value)
+            db.add(db_obj)
+            await db.commit()
+            await db.refresh(db_obj)
+            book.invalidate_cache(db_obj.id, old_isbn, db_obj.isbn)
+            logger.info("Book updated: ID=%s", db_obj.id)
+            return db_obj
+        except Exception as e:
+            await db.rollback()
+            logger.error("Error updating book ID=%s: %s", db_obj.id, e)
+            raise
+
+    async def remove(self, db: AsyncSession, *, id: int) -> Optional[Book]:
+        db_book = await self.get(db, id=id)
+        if db_book:
+            try:
+                await db.delete(db_book)
+                await db.commit()
+                book.invalidate_cache(id, db_book.isbn)
+                logger.info("Book deleted: ID=%s", id)
+                return db_book
+            except Exception as e:
+                await db.rollback()
+                logger.error("Error deleting book ID=%s: %s", id, e)
+                raise
+        return None
+
+
+async_book = AsyncCRUDBook()
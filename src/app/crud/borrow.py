@@ -1,14 +1,101 @@
 from datetime import datetime, timezone
-from typing import List, Optional
+from functools import cached_property
+from typing import Dict, List, Literal, Optional, Sequence, Tuple, Union
 import logging
 
-from sqlalchemy.orm import Session
+from sqlalchemy import (
+    DateTime,
+    Integer,
+    Select,
+    String,
+    and_,
+    bindparam,
+    case,
+    exists,
+    func,
+    insert,
+    literal,
+    or_,
+    select,
+    tuple_,
+    update,
+)
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Session, contains_eager, make_transient_to_detached
 
-from app.db.models import BorrowedBook, Book, Reader
-from app.schemas.borrow import BorrowCreate
+from app.core.config import settings
+from app.core.pagination import InvalidCursor, decode_cursor, split_page
+from app.crud.book import book as crud_book
+from app.db.models import BorrowedBook, Book, CirculationEvent, Reader, utcnow
+from app.schemas.borrow import BatchBookRef, BorrowCreate, ReturnBatchItem
 
 logger = logging.getLogger(__name__)
 
+books = Book.__table__
+readers = Reader.__table__
+borrowed_books = BorrowedBook.__table__
+circulation_events = CirculationEvent.__table__
+
+EVENT_BORROW = "borrow"
+EVENT_RETURN = "return"
+EVENT_COLUMNS = [
+    "kind",
+    "borrow_id",
+    "book_id",
+    "reader_id",
+    "borrow_date",
+    "occurred_at",
+]
+
+
+class BorrowError(ValueError):
+    pass
+
+
+class BookNotFound(BorrowError):
+    def __init__(self):
+        super().__init__("Book not found")
+
+
+class ReaderNotFound(BorrowError):
+    def __init__(self):
+        super().__init__("Reader not found")
+
+
+class NoCopiesAvailable(BorrowError):
+    def __init__(self):
+        super().__init__("No available copies of this book")
+
+
+class BorrowLimitReached(BorrowError):
+    def __init__(self):
+        super().__init__("Reader has reached the maximum limit of borrowed books")
+
+
+class BorrowNotFound(BorrowError):
+    def __init__(self):
+        super().__init__("Borrow record not found")
+
+
+class AlreadyReturned(BorrowError):
+    def __init__(self):
+        super().__init__("This book has already been returned")
+
+
+class NoOpenLoan(BorrowError):
+    def __init__(self):
+        super().__init__("No open loan for this book")
+
+
+BatchOutcome = Union[BorrowedBook, BorrowError]
+
+
+def _naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    # borrow_date is a naive UTC timestamp; aware bounds are converted.
+    if value is not None and value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
 
 class CRUDBorrow:
     MAX_ACTIVE_BORROWS = 3
@@ -25,57 +112,675 @@ class CRUDBorrow:
             .all()
         )
 
+    HISTORY_SORT = "borrow_date"
+
+    def history_statement(
+        self,
+        reader_id: int,
+        *,
+        cursor: Optional[str] = None,
+        limit: int = 50,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        status: Literal["all", "active", "returned"] = "all",
+    ) -> Select:
+        # Newest first, keyset on (borrow_date, id) so every page is a range
+        # scan of ix_borrowed_books_reader_borrow_date. The book summary
+        # comes from the same query through an inner join.
+        stmt = (
+            select(BorrowedBook)
+            .join(BorrowedBook.book)
+            .options(
+                contains_eager(BorrowedBook.book).load_only(
+                    Book.id, Book.title, Book.author, Book.year, Book.isbn
+                )
+            )
+            .where(BorrowedBook.reader_id == reader_id)
+        )
+        if since is not None:
+            stmt = stmt.where(BorrowedBook.borrow_date >= _naive_utc(since))
+        if until is not None:
+            stmt = stmt.where(BorrowedBook.borrow_date < _naive_utc(until))
+        if status == "active":
+            stmt = stmt.where(BorrowedBook.return_date.is_(None))
+        elif status == "returned":
+            stmt = stmt.where(BorrowedBook.return_date.is_not(None))
+        if cursor:
+            value, last_id = decode_cursor(
+                cursor, self.HISTORY_SORT, BorrowedBook.borrow_date
+            )
+            try:
+                value = datetime.fromisoformat(value)
+            except (TypeError, ValueError):
+                raise InvalidCursor("Malformed cursor")
+            stmt = stmt.where(
+                tuple_(BorrowedBook.borrow_date, BorrowedBook.id)
+                < tuple_(value, last_id)
+            )
+        return stmt.order_by(
+            BorrowedBook.borrow_date.desc(), BorrowedBook.id.desc()
+        ).limit(limit + 1)
+
+    def get_history(
+        self, db: Session, *, reader_id: int, limit: int = 50, **filters
+    ) -> Tuple[List[BorrowedBook], Optional[str]]:
+        rows = db.scalars(
+            self.history_statement(reader_id, limit=limit, **filters)
+        ).all()
+        return split_page(list(rows), self.HISTORY_SORT, limit)
+
+    def count_active(self, db: Session, reader_id: int) -> int:
+        return db.scalar(select(self._active_count(reader_id)))
+
+    def _active_count(self, reader_id):
+        # Served by the partial index ix_borrowed_books_active_reader.
+        return (
+            select(func.count())
+            .select_from(borrowed_books)
+            .where(
+                borrowed_books.c.reader_id == reader_id,
+                borrowed_books.c.return_date.is_(None),
+            )
+            .scalar_subquery()
+        )
+
+    def _take_copy(self, book_id, now, *criteria):
+        # Conditional decrement: concurrent borrowers of the last copy are
+        # serialized on the row lock and the loser matches zero rows.
+        return (
+            update(books)
+            .where(books.c.id == book_id, books.c.copies_available > 0, *criteria)
+            .values(
+                copies_available=books.c.copies_available - 1,
+                version=books.c.version + 1,
+                updated_at=now,
+            )
+        )
+
+    def _restock(self, book_id, now):
+        return (
+            update(books)
+            .where(books.c.id == book_id)
+            .values(
+                copies_available=books.c.copies_available + 1,
+                version=books.c.version + 1,
+                updated_at=now,
+            )
+        )
+
+    def _claim_slot(self, reader_id, max_active):
+        # Same trick as _take_copy for the reader: borrows by one reader are
+        # serialized on the reader row, so the limit is exact.
+        return (
+            update(readers)
+            .where(readers.c.id == reader_id, readers.c.active_borrows < max_active)
+            .values(active_borrows=readers.c.active_borrows + 1)
+        )
+
+    def _release_slot(self, reader_id):
+        return (
+            update(readers)
+            .where(readers.c.id == reader_id, readers.c.active_borrows > 0)
+            .values(active_borrows=readers.c.active_borrows - 1)
+        )
+
+    def _build_borrow_statement(self, counter: bool) -> Select:
+        # WITH taken AS (UPDATE books ... WHERE copies_available > 0 RETURNING
+        # id, isbn), inserted AS (INSERT INTO borrowed_books SELECT ... FROM
+        # taken RETURNING *) SELECT inserted.*, taken.isbn
+        # The reader check is either a COUNT of open loans or a claimed slot
+        # on readers.active_borrows. If any step matches nothing the insert
+        # is empty and create() rolls the whole statement back.
+        # Sibling CTEs run in no defined order, so taken filters on claimed:
+        # the reader row is always locked before the book row, as in the
+        # batch paths.
+        book_id = bindparam("book_id", type_=Integer)
+        reader_id = bindparam("reader_id", type_=Integer)
+        max_active = bindparam("max_active", type_=Integer)
+        now = bindparam("now", type_=DateTime)
+        if counter:
+            claimed = (
+                self._claim_slot(reader_id, max_active)
+                .returning(readers.c.id)
+                .cte("claimed")
+            )
+            taken = (
+                self._take_copy(book_id, now, select(claimed.c.id).exists())
+                .returning(books.c.id, books.c.isbn)
+                .cte("taken")
+            )
+            source = select(taken.c.id, reader_id, now)
+        else:
+            reader_ok = exists().where(
+                readers.c.id == reader_id,
+                self._active_count(reader_id) < max_active,
+            )
+            taken = (
+                self._take_copy(book_id, now, reader_ok)
+                .returning(books.c.id, books.c.isbn)
+                .cte("taken")
+            )
+            source = select(taken.c.id, reader_id, now)
+        inserted = (
+            insert(borrowed_books)
+            .from_select(["book_id", "reader_id", "borrow_date"], source)
+            .returning(*borrowed_books.c)
+            .cte("inserted")
+        )
+        stmt = select(inserted, taken.c.isbn).join_from(
+            inserted, taken, inserted.c.book_id == taken.c.id
+        )
+        return stmt.add_cte(
+            self._event_cte(inserted, EVENT_BORROW, inserted.c.borrow_date)
+        )
+
+    def _build_return_statement(self, counter: bool) -> Select:
+        now = bindparam("now", type_=DateTime)
+        returned = (
+            update(borrowed_books)
+            .where(
+                borrowed_books.c.id == bindparam("borrow_id", type_=Integer),
+                borrowed_books.c.return_date.is_(None),
+            )
+            .values(return_date=now)
+            .returning(*borrowed_books.c)
+            .cte("returned")
+        )
+        book_id = returned.c.book_id
+        if counter:
+            released = (
+                self._release_slot(returned.c.reader_id)
+                .returning(readers.c.id)
+                .cte("released")
+            )
+            # Taking the book id through released orders the reader lock
+            # before the book lock, like borrows. The outer join keeps the
+            # restock when the counter was already at zero.
+            book_id = (
+                select(returned.c.book_id)
+                .outerjoin(released, released.c.id == returned.c.reader_id)
+                .scalar_subquery()
+            )
+        restocked = (
+            self._restock(book_id, now)
+            .returning(books.c.id, books.c.isbn)
+            .cte("restocked")
+        )
+        stmt = select(returned, restocked.c.isbn).outerjoin_from(
+            returned, restocked, returned.c.book_id == restocked.c.id
+        )
+        return stmt.add_cte(
+            self._event_cte(returned, EVENT_RETURN, returned.c.return_date)
+        )
+
+    def _event_cte(self, loans, kind: str, occurred_at):
+        # Not referenced by the outer SELECT; add_cte() still emits it and
+        # Postgres always runs data-modifying CTEs.
+        return (
+            insert(circulation_events)
+            .from_select(
+                EVENT_COLUMNS,
+                select(
+                    literal(kind, String),
+                    loans.c.id,
+                    loans.c.book_id,
+                    loans.c.reader_id,
+                    loans.c.borrow_date,
+                    occurred_at,
+                ),
+            )
+            .cte(f"{kind}_events")
+        )
+
+    def _record_events(self, db: Session, kind: str, loans: Sequence[Row]) -> None:
+        db.execute(
+            insert(circulation_events),
+            [
+                {
+                    "kind": kind,
+                    "borrow_id": loan.id,
+                    "book_id": loan.book_id,
+                    "reader_id": loan.reader_id,
+                    "borrow_date": loan.borrow_date,
+                    "occurred_at": (
+                        loan.borrow_date if kind == EVENT_BORROW else loan.return_date
+                    ),
+                }
+                for loan in loans
+            ],
+        )
+
+    # Built once with bind parameters so each call skips statement
+    # construction and cache-key generation.
+    @cached_property
+    def _borrow_statements(self) -> Dict[bool, Select]:
+        return {
+            counter: self._build_borrow_statement(counter) for counter in (False, True)
+        }
+
+    @cached_property
+    def _return_statements(self) -> Dict[bool, Select]:
+        return {
+            counter: self._build_return_statement(counter) for counter in (False, True)
+        }
+
+    @staticmethod
+    def _detached(row: Row) -> BorrowedBook:
+        db_borrow = BorrowedBook(
+            id=row.id,
+            book_id=row.book_id,
+            reader_id=row.reader_id,
+            borrow_date=row.borrow_date,
+            return_date=row.return_date,
+        )
+        make_transient_to_detached(db_borrow)
+        return db_borrow
+
+    def _borrow_failure(self, db: Session, obj_in: BorrowCreate) -> BorrowError:
+        # Only runs once the atomic statement matched nothing, to tell the
+        # caller why.
+        if settings.BORROW_ACTIVE_COUNTER:
+            active = (
+                select(readers.c.active_borrows)
+                .where(readers.c.id == obj_in.reader_id)
+                .scalar_subquery()
+            )
+        else:
+            active = self._active_count(obj_in.reader_id)
+        state = db.execute(
+            select(
+                books.c.copies_available,
+                exists().where(readers.c.id == obj_in.reader_id),
+                active,
+            ).where(books.c.id == obj_in.book_id)
+        ).first()
+        if state is None:
+            return BookNotFound()
+        copies, reader_exists, active = state
+        if not reader_exists:
+            return ReaderNotFound()
+        if copies < 1:
+            return NoCopiesAvailable()
+        if active >= self.MAX_ACTIVE_BORROWS:
+            return BorrowLimitReached()
+        return NoCopiesAvailable()
+
+    def _create_postgresql(
+        self, db: Session, obj_in: BorrowCreate, now
+    ) -> Optional[Row]:
+        return db.execute(
+            self._borrow_statements[settings.BORROW_ACTIVE_COUNTER],
+            {
+                "book_id": obj_in.book_id,
+                "reader_id": obj_in.reader_id,
+                "now": now,
+                "max_active": self.MAX_ACTIVE_BORROWS,
+            },
+        ).first()
+
+    def _create_generic(self, db: Session, obj_in: BorrowCreate, now) -> Optional[Row]:
+        if settings.BORROW_ACTIVE_COUNTER:
+            claim = self._claim_slot(obj_in.reader_id, self.MAX_ACTIVE_BORROWS)
+            if db.execute(claim).rowcount != 1:
+                return None
+        else:
+            active = db.scalar(
+                select(self._active_count(obj_in.reader_id)).where(
+                    exists().where(readers.c.id == obj_in.reader_id)
+                )
+            )
+            if active is None or active >= self.MAX_ACTIVE_BORROWS:
+                return None
+        if db.execute(self._take_copy(obj_in.book_id, now)).rowcount != 1:
+            return None
+        borrow_id = db.execute(
+            insert(borrowed_books).values(
+                book_id=obj_in.book_id, reader_id=obj_in.reader_id, borrow_date=now
+            )
+        ).inserted_primary_key[0]
+        row = db.execute(
+            select(borrowed_books, books.c.isbn)
+            .join(books, books.c.id == borrowed_books.c.book_id)
+            .where(borrowed_books.c.id == borrow_id)
+        ).first()
+        self._record_events(db, EVENT_BORROW, [row])
+        return row
+
     def create(self, db: Session, *, obj_in: BorrowCreate) -> BorrowedBook:
+        now = utcnow()
         try:
-            book = db.get(Book, obj_in.book_id)
-            if not book or book.copies_available < 1:
-                raise ValueError("Book not available")
-            active_borrows = self.get_active_by_reader(db, reader_id=obj_in.reader_id)
-            if len(active_borrows) >= self.MAX_ACTIVE_BORROWS:
-                raise ValueError("Reader has reached the borrow limit")
+            if db.get_bind().dialect.name == "postgresql":
+                row = self._create_postgresql(db, obj_in, now)
+            else:
+                row = self._create_generic(db, obj_in, now)
+            error = None
+            if row is None:
+                # Undo whichever half of the statement did match before
+                # looking at the state.
+                db.rollback()
+                error = self._borrow_failure(db, obj_in)
+                db.rollback()
+            else:
+                db.commit()
+        except Exception as e:
+            db.rollback()
+            logger.error("Borrow failed: %s", e)
+            raise
+        if error:
+            raise error
 
-            db_borrow = BorrowedBook(
-                book_id=obj_in.book_id,
-                reader_id=obj_in.reader_id,
-                borrow_date=datetime.now(timezone.utc),
-            )
+        crud_book.invalidate_cache(row.book_id, row.isbn)
+        logger.info(
+            "Book borrowed: Book ID=%s, Reader ID=%s, Record ID=%s",
+            row.book_id,
+            row.reader_id,
+            row.id,
+        )
+        return self._detached(row)
 
-            book.copies_available -= 1
+    def _return_postgresql(self, db: Session, id: int, now) -> Optional[Row]:
+        return db.execute(
+            self._return_statements[settings.BORROW_ACTIVE_COUNTER],
+            {"borrow_id": id, "now": now},
+        ).first()
 
-            db.add(db_borrow)
-            db.add(book)
-            db.commit()
-            db.refresh(db_borrow)
-            logger.info(
-                f"Book borrowed: Book ID={book.id}, Reader ID={obj_in.reader_id}"
+    def _return_generic(self, db: Session, id: int, now) -> Optional[Row]:
+        result = db.execute(
+            update(borrowed_books)
+            .where(borrowed_books.c.id == id, borrowed_books.c.return_date.is_(None))
+            .values(return_date=now)
+        )
+        if result.rowcount != 1:
+            return None
+        book_id, reader_id = db.execute(
+            select(borrowed_books.c.book_id, borrowed_books.c.reader_id).where(
+                borrowed_books.c.id == id
             )
-            return db_borrow
+        ).one()
+        if settings.BORROW_ACTIVE_COUNTER:
+            db.execute(self._release_slot(reader_id))
+        db.execute(self._restock(book_id, now))
+        row = db.execute(
+            select(borrowed_books, books.c.isbn)
+            .outerjoin(books, books.c.id == borrowed_books.c.book_id)
+            .where(borrowed_books.c.id == id)
+        ).first()
+        self._record_events(db, EVENT_RETURN, [row])
+        return row
+
+    def return_book(self, db: Session, *, id: int) -> BorrowedBook:
+        now = utcnow()
+        try:
+            if db.get_bind().dialect.name == "postgresql":
+                row = self._return_postgresql(db, id, now)
+            else:
+                row = self._return_generic(db, id, now)
+            error = None
+            if row is None:
+                found = db.scalar(
+                    select(borrowed_books.c.id).where(borrowed_books.c.id == id)
+                )
+                error = AlreadyReturned() if found else BorrowNotFound()
+                db.rollback()
+            else:
+                db.commit()
         except Exception as e:
             db.rollback()
-            logger.error(f"Borrow failed: {str(e)}")
+            logger.error("Return failed: %s", e)
             raise
+        if error:
+            raise error
+
+        crud_book.invalidate_cache(row.book_id, row.isbn)
+        logger.info("Book returned: Borrow ID=%s, Book ID=%s", row.id, row.book_id)
+        return self._detached(row)
 
-    def return_book(self, db: Session, *, db_obj: BorrowedBook) -> BorrowedBook:
+    # Batch checkout/check-in. Every batch runs in one transaction and takes
+    # its row locks in a fixed order - borrowed_books by id, readers, then
+    # books by id - the same order the single-item statements use, so
+    # concurrent batches and single borrows cannot deadlock. FOR NO KEY
+    # UPDATE leaves the foreign key checks of other inserts unblocked.
+    # Outcomes are returned per item, in request order.
+
+    def _lock_books(self, db: Session, ids=(), isbns=()) -> List[Row]:
+        return db.execute(
+            select(books.c.id, books.c.isbn, books.c.copies_available)
+            .where(or_(books.c.id.in_(ids), books.c.isbn.in_(isbns)))
+            .order_by(books.c.id)
+            .with_for_update(key_share=True)
+        ).all()
+
+    def _restock_many(self, db: Session, counts: Dict[int, int], now) -> None:
+        db.execute(
+            update(books)
+            .where(books.c.id.in_(counts))
+            .values(
+                copies_available=books.c.copies_available
+                + case(counts, value=books.c.id),
+                version=books.c.version + 1,
+                updated_at=now,
+            )
+        )
+
+    def create_batch(
+        self, db: Session, *, reader_id: int, items: Sequence[BatchBookRef]
+    ) -> List[BatchOutcome]:
+        now = utcnow()
+        counter = settings.BORROW_ACTIVE_COUNTER
+        outcomes: List[Optional[BatchOutcome]] = [None] * len(items)
         try:
-            if db_obj.return_date:
-                raise ValueError("Book already returned")
+            reader = db.execute(
+                select(readers.c.id, readers.c.active_borrows)
+                .where(readers.c.id == reader_id)
+                .with_for_update(key_share=True)
+            ).first()
+            if reader is None:
+                db.rollback()
+                return [ReaderNotFound() for _ in items]
+            stock = self._lock_books(
+                db,
+                ids={item.book_id for item in items if item.book_id is not None},
+                isbns={item.isbn for item in items if item.isbn is not None},
+            )
+            by_id = {row.id: row for row in stock}
+            by_isbn = {row.isbn: row for row in stock if row.isbn}
+            active = (
+                reader.active_borrows if counter else self.count_active(db, reader_id)
+            )
+            slots = self.MAX_ACTIVE_BORROWS - active
 
-            db_obj.return_date = datetime.now(timezone.utc)
+            taken: Dict[int, int] = {}
+            accepted = []
+            for index, item in enumerate(items):
+                row = (
+                    by_id.get(item.book_id)
+                    if item.isbn is None
+                    else by_isbn.get(item.isbn)
+                )
+                if row is None:
+                    outcomes[index] = BookNotFound()
+                elif row.copies_available - taken.get(row.id, 0) < 1:
+                    outcomes[index] = NoCopiesAvailable()
+                elif slots < 1:
+                    outcomes[index] = BorrowLimitReached()
+                else:
+                    slots -= 1
+                    taken[row.id] = taken.get(row.id, 0) + 1
+                    accepted.append((index, row))
 
-            book = db.get(Book, db_obj.book_id)
-            if book:
-                book.copies_available += 1
-                db.add(book)
+            if accepted:
+                self._restock_many(db, {id: -n for id, n in taken.items()}, now)
+                inserted = db.execute(
+                    insert(borrowed_books).returning(
+                        *borrowed_books.c, sort_by_parameter_order=True
+                    ),
+                    [
+                        {"book_id": row.id, "reader_id": reader_id, "borrow_date": now}
+                        for _, row in accepted
+                    ],
+                ).all()
+                if counter:
+                    db.execute(
+                        update(readers)
+                        .where(readers.c.id == reader_id)
+                        .values(active_borrows=readers.c.active_borrows + len(accepted))
+                    )
+                self._record_events(db, EVENT_BORROW, inserted)
+                for (index, _), row in zip(accepted, inserted):
+                    outcomes[index] = self._detached(row)
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            logger.error("Batch borrow failed: %s", e)
+            raise
 
-            db.add(db_obj)
+        for row in {row.id: row for _, row in accepted}.values():
+            crud_book.invalidate_cache(row.id, row.isbn)
+        logger.info(
+            "Batch borrow: Reader ID=%s, %s of %s items borrowed",
+            reader_id,
+            len(accepted),
+            len(items),
+        )
+        return outcomes
+
+    def return_batch(
+        self, db: Session, *, items: Sequence[ReturnBatchItem]
+    ) -> List[BatchOutcome]:
+        now = utcnow()
+        outcomes: List[Optional[BatchOutcome]] = [None] * len(items)
+        try:
+            borrow_ids = {i.borrow_id for i in items if i.borrow_id is not None}
+            book_ids = {i.book_id for i in items if i.book_id is not None}
+            isbns = {i.isbn for i in items if i.isbn is not None}
+            loans = db.execute(
+                select(
+                    borrowed_books.c.id,
+                    borrowed_books.c.book_id,
+                    borrowed_books.c.reader_id,
+                    borrowed_books.c.borrow_date,
+                    borrowed_books.c.return_date,
+                    books.c.isbn,
+                )
+                .outerjoin(books, books.c.id == borrowed_books.c.book_id)
+                .where(
+                    or_(
+                        borrowed_books.c.id.in_(borrow_ids),
+                        and_(
+                            borrowed_books.c.return_date.is_(None),
+                            or_(
+                                borrowed_books.c.book_id.in_(book_ids),
+                                books.c.isbn.in_(isbns),
+                            ),
+                        ),
+                    )
+                )
+                .order_by(borrowed_books.c.id)
+                .with_for_update(of=borrowed_books)
+            ).all()
+
+            chosen: Dict[int, int] = {}
+            by_id = {loan.id: loan for loan in loans}
+            # Explicit borrow ids first, so a book-level item cannot take a
+            # loan that a later item names directly.
+            for index, item in enumerate(items):
+                if item.borrow_id is None:
+                    continue
+                loan = by_id.get(item.borrow_id)
+                if loan is None:
+                    outcomes[index] = BorrowNotFound()
+                elif loan.return_date is not None or loan.id in chosen:
+                    outcomes[index] = AlreadyReturned()
+                else:
+                    chosen[loan.id] = index
+            # A book-level item returns the oldest open loan of that book.
+            open_loans = sorted(
+                (loan for loan in loans if loan.return_date is None),
+                key=lambda loan: (loan.borrow_date, loan.id),
+            )
+            for index, item in enumerate(items):
+                if item.borrow_id is not None:
+                    continue
+                loan = next(
+                    (
+                        loan
+                        for loan in open_loans
+                        if loan.id not in chosen
+                        and (
+                            loan.book_id == item.book_id
+                            if item.isbn is None
+                            else loan.isbn == item.isbn
+                        )
+                        and item.reader_id in (None, loan.reader_id)
+                    ),
+                    None,
+                )
+                if loan is None:
+                    outcomes[index] = NoOpenLoan()
+                else:
+                    chosen[loan.id] = index
+
+            if chosen:
+                restocked: Dict[int, int] = {}
+                released: Dict[int, int] = {}
+                for loan_id in chosen:
+                    loan = by_id[loan_id]
+                    restocked[loan.book_id] = restocked.get(loan.book_id, 0) + 1
+                    released[loan.reader_id] = released.get(loan.reader_id, 0) + 1
+                returned = db.execute(
+                    update(borrowed_books)
+                    .where(borrowed_books.c.id.in_(chosen))
+                    .values(return_date=now)
+                    .returning(*borrowed_books.c)
+                ).all()
+                if settings.BORROW_ACTIVE_COUNTER:
+                    db.execute(
+                        select(readers.c.id)
+                        .where(readers.c.id.in_(released))
+                        .order_by(readers.c.id)
+                        .with_for_update(key_share=True)
+                    )
+                    count = case(released, value=readers.c.id)
+                    db.execute(
+                        update(readers)
+                        .where(readers.c.id.in_(released))
+                        .values(
+                            active_borrows=case(
+                                (
+                                    readers.c.active_borrows > count,
+                                    readers.c.active_borrows - count,
+                                ),
+                                else_=0,
+                            )
+                        )
+                    )
+                self._lock_books(db, ids=restocked)
+                self._restock_many(db, restocked, now)
+                self._record_events(db, EVENT_RETURN, returned)
+                for row in returned:
+                    outcomes[chosen[row.id]] = self._detached(row)
             db.commit()
-            db.refresh(db_obj)
-            logger.info(f"Book returned: Borrow ID={db_obj.id}, Book ID={book.id}")
-            return db_obj
         except Exception as e:
             db.rollback()
-            logger.error(f"Return failed: {str(e)}")
+            logger.error("Batch return failed: %s", e)
             raise
 
+        for loan in {by_id[id].book_id: by_id[id] for id in chosen}.values():
+            crud_book.invalidate_cache(loan.book_id, loan.isbn)
+        logger.info("Batch return: %s of %s items returned", len(chosen), len(items))
+        return outcomes
+
+    def resync_active_borrows(self, db: Session) -> int:
+        # Recomputes readers.active_borrows from borrowed_books, e.g. after
+        # turning BORROW_ACTIVE_COUNTER on.
+        result = db.execute(
+            update(readers)
+            .values(active_borrows=self._active_count(readers.c.id))
+            .where(readers.c.active_borrows != self._active_count(readers.c.id))
+        )
+        db.commit()
+        logger.info("Resynced active_borrows for %s readers", result.rowcount)
+        return result.rowcount
+
 
 borrow = CRUDBorrow()
@@ -1,9 +1,15 @@
-from sqlalchemy.orm import Session
-from typing import Optional, List
+from sqlalchemy import Select, select, tuple_
+from sqlalchemy.engine import Row
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, load_only
+from typing import Iterable, Optional, List, Tuple
 import logging
 
+from app.core.cache import entity_cache
+from app.core.fields import fetched_fields
+from app.core.pagination import decode_cursor, split_page
 from app.db.models import Reader
-from app.schemas.reader import ReaderCreate, ReaderUpdate
+from app.schemas.reader import ReaderCreate, ReaderUpdate, ReaderRead
 
 logger = logging.getLogger(__name__)
 
@@ -12,13 +18,71 @@ class CRUDReader:
     def get(self, db: Session, id: int) -> Optional[Reader]:
         return db.get(Reader, id)
 
+    def serialize(self, reader: Optional[Reader]) -> Optional[bytes]:
+        if reader is None:
+            return None
+        return ReaderRead.model_validate(reader).model_dump_json().encode()
+
+    def get_payload(self, db: Session, id: int) -> Optional[bytes]:
+        return entity_cache.get_or_load(
+            f"reader:{id}", lambda: self.serialize(self.get(db, id=id))
+        )
+
+    def invalidate_cache(self, id: int) -> None:
+        entity_cache.invalidate(f"reader:{id}")
+
     def get_by_email(self, db: Session, email: str) -> Optional[Reader]:
         return db.query(Reader).filter(Reader.email == email).first()
 
+    # ReaderRead fields, in order. The list endpoints fetch the requested ones
+    # as plain rows and encode them directly, without building Reader instances.
+    LIST_FIELDS = tuple(ReaderRead.model_fields)
+    DEFAULT_LIST_FIELDS = LIST_FIELDS
+
+    def list_columns(self, fields: Iterable[str], sort: str = "id") -> tuple:
+        return tuple(
+            getattr(Reader, name)
+            for name in fetched_fields(fields, self.LIST_FIELDS, sort)
+        )
+
     def get_multi(
-        self, db: Session, *, skip: int = 0, limit: int = 100
-    ) -> List[Reader]:
-        return db.query(Reader).offset(skip).limit(limit).all()
+        self,
+        db: Session,
+        *,
+        skip: int = 0,
+        limit: int = 100,
+        fields: Iterable[str] = DEFAULT_LIST_FIELDS,
+    ) -> List[Row]:
+        stmt = select(*self.list_columns(fields)).offset(skip).limit(limit)
+        return db.execute(stmt).all()
+
+    SORT_COLUMNS = {"id": Reader.id, "name": Reader.name, "email": Reader.email}
+
+    def page_statement(
+        self, sort: str, cursor: Optional[str], limit: int, columns=(Reader,)
+    ) -> Select:
+        column = self.SORT_COLUMNS[sort]
+        stmt = select(*columns)
+        if cursor:
+            value, last_id = decode_cursor(cursor, sort, column)
+            if sort == "id":
+                stmt = stmt.where(Reader.id > last_id)
+            else:
+                stmt = stmt.where(tuple_(column, Reader.id) > tuple_(value, last_id))
+        return stmt.order_by(column, Reader.id).limit(limit + 1)
+
+    def get_page(
+        self,
+        db: Session,
+        *,
+        sort: str = "id",
+        cursor: Optional[str] = None,
+        limit: int = 100,
+        fields: Iterable[str] = DEFAULT_LIST_FIELDS,
+    ) -> Tuple[List[Row], Optional[str]]:
+        columns = self.list_columns(fields, sort)
+        rows = db.execute(self.page_statement(sort, cursor, limit, columns)).all()
+        return split_page(list(rows), sort, limit)
 
     def create(self, db: Session, *, obj_in: ReaderCreate) -> Reader:
         try:
@@ -26,11 +90,11 @@ class CRUDReader:
             db.add(db_reader)
             db.commit()
             db.refresh(db_reader)
-            logger.info(f"Reader created: ID={db_reader.id}, Name={db_reader.name}")
+            logger.info("Reader created: ID=%s, Name=%s", db_reader.id, db_reader.name)
             return db_reader
         except Exception as e:
             db.rollback()
-            logger.error(f"Error creating reader: {str(e)}")
+            logger.error("Error creating reader: %s", e)
             raise
 
     def update(self, db: Session, *, db_obj: Reader, obj_in: ReaderUpdate) -> Reader:
@@ -41,11 +105,12 @@ class CRUDReader:
             db.add(db_obj)
             db.commit()
             db.refresh(db_obj)
-            logger.info(f"Reader updated: ID={db_obj.id}")
+            self.invalidate_cache(db_obj.id)
+            logger.info("Reader updated: ID=%s", db_obj.id)
             return db_obj
         except Exception as e:
             db.rollback()
-            logger.error(f"Error updating reader ID={db_obj.id}: {str(e)}")
+            logger.error("Error updating reader ID=%s: %s", db_obj.id, e)
             raise
 
     def remove(self, db: Session, *, id: int) -> Optional[Reader]:
@@ -54,13 +119,107 @@ class CRUDReader:
             try:
                 db.delete(reader)
                 db.commit()
-                logger.info(f"Reader deleted: ID={id}")
+                self.invalidate_cache(id)
+                logger.info("Reader deleted: ID=%s", id)
                 return reader
             except Exception as e:
                 db.rollback()
-                logger.error(f"Error deleting reader ID={id}: {str(e)}")
+                logger.error("Error deleting reader ID=%s: %s", id, e)
                 raise
         return None
 
 
 reader = CRUDReader()
+
+
+class AsyncCRUDReader:
+    async def get(self, db: AsyncSession, id: int) -> Optional[Reader]:
+        return await db.get(Reader, id)
+
+    async def get_payload(self, db: AsyncSession, id: int) -> Optional[bytes]:
+        async def load():
+            return reader.serialize(await self.get(db, id=id))
+
+        return await entity_cache.aget_or_load(f"reader:{id}", load)
+
+    async def get_by_email(self, db: AsyncSession, email: str) -> Optional[Reader]:
+        return await db.scalar(select(Reader).where(Reader.email == email).limit(1))
+
+    LIST_FIELDS = reader.LIST_FIELDS
+    DEFAULT_LIST_FIELDS = reader.DEFAULT_LIST_FIELDS
+
+    # Same contract as AsyncCRUDBook.get_multi: only fields are loaded.
+    async def get_multi(
+        self,
+        db: AsyncSession,
+        *,
+        skip: int = 0,
+        limit: int = 100,
+        fields: Iterable[str] = DEFAULT_LIST_FIELDS,
+    ) -> List[Reader]:
+        stmt = select(Reader).options(load_only(*reader.list_columns(fields)))
+        return list(await db.scalars(stmt.offset(skip).limit(limit)))
+
+    async def get_page(
+        self,
+        db: AsyncSession,
+        *,
+        sort: str = "id",
+        cursor: Optional[str] = None,
+        limit: int = 100,
+        fields: Iterable[str] = DEFAULT_LIST_FIELDS,
+    ) -> Tuple[List[Reader], Optional[str]]:
+        stmt = reader.page_statement(sort, cursor, limit).options(
+            load_only(*reader.list_columns(fields, sort))
+        )
+        rows = await db.scalars(stmt)
+        return split_page(list(rows), sort, limit)
+
+    async def create(self, db: AsyncSession, *, obj_in: ReaderCreate) -> Reader:
+        try:
+            db_reader = Reader(**obj_in.model_dump())
+            db.add(db_reader)
+            await db.commit()
+            await db.refresh(db_reader)
+            logger.info("Reader created: ID=%s, Name=%s", db_reader.id, db_reader.name)
+            return db_reader
+        except Exception as e:
+            await db.rollback()
+            logger.error("Error creating reader: %s", e)
+            raise
+
+    async def update(
+        self, db: AsyncSession, *, db_obj: Reader, obj_in: ReaderUpdate
+    ) -> Reader:
+        try:
+            update_data = obj_in.model_dump(exclude_unset=True)
+            for field, value in update_data.items():
+                setattr(db_obj, field, value)
+            db.add(db_obj)
+            await db.commit()
+            await db.refresh(db_obj)
+            reader.invalidate_cache(db_obj.id)
+            logger.info("Reader updated: ID=%s", db_obj.id)
+            return db_obj
+        except Exception as e:
+            await db.rollback()
+            logger.error("Error updating reader ID=%s: %s", db_obj.id, e)
+            raise
+
+    async def remove(self, db: AsyncSession, *, id: int) -> Optional[Reader]:
+        db_reader = await self.get(db, id=id)
+        if db_reader:
+            try:
+                await db.delete(db_reader)
+                await db.commit()
+                reader.invalidate_cache(id)
+                logger.info("Reader deleted: ID=%s", id)
+                return db_reader
+            except Exception as e:
+                await db.rollback()
+                logger.error("Error deleting reader ID=%s: %s", id, e)
+                raise
+        return None
+
+
+async_reader = AsyncCRUDReader()
@@ -0,0 +1,319 @@
+from collections import Counter
+from datetime import date, timedelta
+from typing import Dict, List, Sequence, Tuple
+import logging
+
+from sqlalchemy import Date, cast, delete, func, insert, literal, select, text
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Session, load_only
+
+from app.crud.borrow import EVENT_BORROW, borrowed_books, circulation_events
+from app.db.models import (
+    Book,
+    DailyBookLoans,
+    DailyCirculation,
+    DailyReaderActivity,
+    Reader,
+)
+
+logger = logging.getLogger(__name__)
+
+daily_circulation = DailyCirculation.__table__
+daily_book_loans = DailyBookLoans.__table__
+daily_reader_activity = DailyReaderActivity.__table__
+
+ROLLUPS = (daily_circulation, daily_book_loans, daily_reader_activity)
+
+
+class CRUDStats:
+    # Dashboards read only the daily rollups, so their cost depends on the
+    # date range, not on the size of borrowed_books. The rollups are fed by
+    # draining circulation_events; rebuild() recomputes them from scratch.
+
+    def _drain(self, db: Session, batch_size: int) -> List[Row]:
+        # SKIP LOCKED lets two refreshers run without counting an event twice.
+        batch = (
+            select(circulation_events.c.id)
+            .order_by(circulation_events.c.id)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+            .scalar_subquery()
+        )
+        return db.execute(
+            delete(circulation_events)
+            .where(circulation_events.c.id.in_(batch))
+            .returning(*circulation_events.c)
+        ).all()
+
+    def _upsert(
+        self, db: Session, table, keys: Sequence[str], rows: List[Dict]
+    ) -> None:
+        if not rows:
+            return
+        dialect = db.get_bind().dialect.name
+        stmt = (postgresql if dialect == "postgresql" else sqlite).insert(table)
+        counters = [c.name for c in table.c if c.name not in keys]
+        db.execute(
+            stmt.on_conflict_do_update(
+                index_elements=keys,
+                set_={name: table.c[name] + stmt.excluded[name] for name in counters},
+            ),
+            rows,
+        )
+
+    def refresh(self, db: Session, *, batch_size: int = 10000) -> int:
+        try:
+            events = self._drain(db, batch_size)
+            daily: Dict[date, Counter] = {}
+            book_loans: Counter = Counter()
+            reader_activity: Dict[Tuple[date, int], Counter] = {}
+            for event in events:
+                day = event.occurred_at.date()
+                column = "borrows" if event.kind == EVENT_BORROW else "returns"
+                daily.setdefault(day, Counter())[column] += 1
+                # open_loans is kept on the day the loan started.
+                daily.setdefault(event.borrow_date.date(), Counter())["open_loans"] += (
+                    1 if event.kind == EVENT_BORROW else -1
+                )
+                reader_activity.setdefault((day, event.reader_id), Counter())[
+                    column
+                ] += 1
+                if event.kind == EVENT_BORROW:
+                    book_loans[(day, event.book_id)] += 1
+
+            self._upsert(
+                db,
+                daily_circulation,
+                ["day"],
+                [
+                    {
+                        "day": day,
+                        "borrows": c["borrows"],
+                        "returns": c["returns"],
+                        "open_loans": c["open_loans"],
+                    }
+                    for day, c in daily.items()
+                ],
+            )
+            self._upsert(
+                db,
+                daily_book_loans,
+                ["day", "book_id"],
+                [
+                    {"day": day, "book_id": book_id, "borrows": n}
+                    for (day, book_id), n in book_loans.items()
+                ],
+            )
+            self._upsert(
+                db,
+                daily_reader_activity,
+                ["day", "reader_id"],
+                [
+                    {
+                        "day": day,
+                        "reader_id": reader_id,
+                        "borrows": c["borrows"],
+                        "returns": c["returns"],
+                    }
+                    for (day, reader_id), c in reader_activity.items()
+                ],
+            )
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            logger.error("Stats refresh failed: %s", e)
+            raise
+
+        if events:
+            logger.info("Stats refreshed from %s circulation events", len(events))
+        return len(events)
+
+    def rebuild(self, db: Session) -> int:
+        # Full recomputation for the initial load or after a manual data fix.
+        # Borrows and returns wait on the table lock until it commits, so no
+        # event is counted twice or lost.
+        postgres = db.get_bind().dialect.name == "postgresql"
+        # SQLite has no DATE type; date() yields the same ISO string.
+        day_of = (lambda column: cast(column, Date)) if postgres else func.date
+        borrow_day = day_of(borrowed_books.c.borrow_date)
+        return_day = day_of(borrowed_books.c.return_date)
+        returned = borrowed_books.c.return_date.is_not(None)
+        try:
+            if postgres:
+                db.execute(
+                    text(
+                        f"LOCK TABLE {borrowed_books.fullname} IN SHARE ROW EXCLUSIVE MODE"
+                    )
+                )
+            db.execute(delete(circulation_events))
+            for table in ROLLUPS:
+                db.execute(delete(table))
+
+            borrows = (
+                select(
+                    borrow_day.label("day"),
+                    func.count().label("borrows"),
+                    func.count().filter(~returned).label("open_loans"),
+                )
+                .group_by(borrow_day)
+                .subquery()
+            )
+            returns = (
+                select(return_day.label("day"), func.count().label("returns"))
+                .where(returned)
+                .group_by(return_day)
+                .subquery()
+            )
+            days = select(borrows.c.day).union(select(returns.c.day)).subquery()
+            db.execute(
+                insert(daily_circulation).from_select(
+                    ["day", "borrows", "returns", "open_loans"],
+                    select(
+                        days.c.day,
+                        func.coalesce(borrows.c.borrows, 0),
+                        func.coalesce(returns.c.returns, 0),
+                        func.coalesce(borrows.c.open_loans, 0),
+                    )
+                    .outerjoin(borrows, borrows.c.day == days.c.day)
+                    .outerjoin(returns, returns.c.day == days.c.day),
+                )
+            )
+            db.execute(
+                insert(daily_book_loans).from_select(
+                    ["day", "book_id", "borrows"],
+                    select(borrow_day, borrowed_books.c.book_id, func.count()).group_by(
+                        borrow_day, borrowed_books.c.book_id
+                    ),
+                )
+            )
+            activity = (
+                select(
+                    borrow_day.label("day"),
+                    borrowed_books.c.reader_id,
+                    func.count().label("borrows"),
+                    literal(0).label("returns"),
+                )
+                .group_by(borrow_day, borrowed_books.c.reader_id)
+                .union_all(
+                    select(
+                        return_day,
+                        borrowed_books.c.reader_id,
+                        literal(0),
+                        func.count(),
+                    )
+                    .where(returned)
+                    .group_by(return_day, borrowed_books.c.reader_id)
+                )
+                .subquery()
+            )
+            db.execute(
+                insert(daily_reader_activity).from_select(
+                    ["day", "reader_id", "borrows", "returns"],
+                    select(
+                        activity.c.day,
+                        activity.c.reader_id,
+                        func.sum(activity.c.borrows),
+                        func.sum(activity.c.returns),
+                    ).group_by(activity.c.day, activity.c.reader_id),
+                )
+            )
+            days_count = db.scalar(select(func.count()).select_from(daily_circulation))
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            logger.error("Stats rebuild failed: %s", e)
+            raise
+
+        logger.info("Stats rebuilt for %s days", days_count)
+        return days_count
+
+    def daily(self, db: Session, *, since: date, until: date) -> List[Row]:
+        return db.execute(
+            select(
+                daily_circulation.c.day,
+                daily_circulation.c.borrows,
+                daily_circulation.c.returns,
+            )
+            .where(daily_circulation.c.day.between(since, until))
+            .order_by(daily_circulation.c.day)
+        ).all()
+
+    def top_books(
+        self, db: Session, *, since: date, until: date, limit: int = 10
+    ) -> List[Tuple[Book, int]]:
+        totals = (
+            select(
+                daily_book_loans.c.book_id,
+                func.sum(daily_book_loans.c.borrows).label("borrows"),
+            )
+            .where(daily_book_loans.c.day.between(since, until))
+            .group_by(daily_book_loans.c.book_id)
+            .subquery()
+        )
+        return db.execute(
+            select(Book, totals.c.borrows)
+            .join(totals, totals.c.book_id == Book.id)
+            .options(load_only(Book.id, Book.title, Book.author, Book.year, Book.isbn))
+            .order_by(totals.c.borrows.desc(), Book.id)
+            .limit(limit)
+        ).all()
+
+    def top_readers(
+        self, db: Session, *, since: date, until: date, limit: int = 10
+    ) -> List[Row]:
+        totals = (
+            select(
+                daily_reader_activity.c.reader_id,
+                func.sum(daily_reader_activity.c.borrows).label("borrows"),
+                func.sum(daily_reader_activity.c.returns).label("returns"),
+                func.count().label("active_days"),
+            )
+            .where(daily_reader_activity.c.day.between(since, until))
+            .group_by(daily_reader_activity.c.reader_id)
+            .subquery()
+        )
+        return db.execute(
+            select(
+                totals.c.reader_id,
+                Reader.name,
+                totals.c.borrows,
+                totals.c.returns,
+                totals.c.active_days,
+            )
+            .join(Reader, Reader.id == totals.c.reader_id)
+            .order_by(totals.c.borrows.desc(), totals.c.reader_id)
+            .limit(limit)
+        ).all()
+
+    def active_readers(self, db: Session, *, since: date, until: date) -> int:
+        return db.scalar(
+            select(func.count(func.distinct(daily_reader_activity.c.reader_id))).where(
+                daily_reader_activity.c.day.between(since, until)
+            )
+        )
+
+    def overdue(self, db: Session, *, today: date, loan_days: int) -> Dict[str, int]:
+        # Day granularity: a loan is overdue once borrow day + loan_days has
+        # passed.
+        due_before = today - timedelta(days=loan_days)
+        open_loans, overdue = db.execute(
+            select(
+                func.coalesce(func.sum(daily_circulation.c.open_loans), 0),
+                func.coalesce(
+                    func.sum(daily_circulation.c.open_loans).filter(
+                        daily_circulation.c.day < due_before
+                    ),
+                    0,
+                ),
+            )
+        ).one()
+        pending = db.scalar(select(func.count()).select_from(circulation_events))
+        return {
+            "open_loans": open_loans,
+            "overdue": overdue,
+            "pending_events": pending,
+        }
+
+
+stats = CRUDStats()
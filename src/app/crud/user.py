@@ -1,8 +1,12 @@
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 import logging
 
 from app.db.models import User
 from app.core.password import get_password_hash, verify_password
+from app.core.hashing import password_hasher
+from app.core.security import invalidate_user
+from app.schemas.user import UserInDB
 
 logger = logging.getLogger(__name__)
 
@@ -20,25 +24,95 @@ class CRUDUser:
             db.add(db_user)
             db.commit()
             db.refresh(db_user)
-            logger.info(f"User created: {db_user.email}")
+            logger.info("User created: %s", db_user.email)
             return db_user
         except Exception as e:
             db.rollback()
-            logger.error(f"Error creating user: {str(e)}")
+            logger.error("Error creating user: %s", e)
             raise
 
+    def update_password(
+        self, db: Session, *, db_obj: User, hashed_password: str
+    ) -> User:
+        try:
+            db_obj.hashed_password = hashed_password
+            db.add(db_obj)
+            db.commit()
+            db.refresh(db_obj)
+            invalidate_user(db_obj.id)
+            logger.info("Password changed for user: %s", db_obj.email)
+            return db_obj
+        except Exception as e:
+            db.rollback()
+            logger.error("Error changing password for user ID=%s: %s", db_obj.id, e)
+            raise
+
+    def remove(self, db: Session, *, id: int) -> User | None:
+        db_user = self.get(db, id=id)
+        if db_user:
+            try:
+                db.delete(db_user)
+                db.commit()
+                invalidate_user(id)
+                logger.info("User deleted: ID=%s", id)
+                return db_user
+            except Exception as e:
+                db.rollback()
+                logger.error("Error deleting user ID=%s: %s", id, e)
+                raise
+        return None
+
     def authenticate(self, db: Session, email: str, password: str) -> User | None:
         user = self.get_by_email(db, email=email)
         if not user:
-            logger.warning(f"Authentication failed: user {email} not found")
+            logger.warning("Authentication failed: user %s not found", email)
             return None
 
         if not verify_password(password, user.hashed_password):
-            logger.warning(f"Authentication failed: invalid password for {email}")
+            logger.warning("Authentication failed: invalid password for %s", email)
             return None
 
-        logger.info(f"User authenticated: {email}")
+        logger.info("User authenticated: %s", email)
         return user
 
+    def rehash(self, db: Session, *, id: int, hashed_password: str) -> None:
+        db_user = self.get(db, id=id)
+        if db_user:
+            self.update_password(db, db_obj=db_user, hashed_password=hashed_password)
+
+    async def authenticate_async(
+        self, db: Session, email: str, password: str
+    ) -> UserInDB | None:
+        # Hashing runs in the password pool; a hash made with an outdated
+        # cost is replaced on the first successful login.
+        password_hasher.check_capacity()
+        user = await run_in_threadpool(self.get_by_email, db, email=email)
+        if not user:
+            logger.warning("Authentication failed: user %s not found", email)
+            return None
+
+        hashed_password = user.hashed_password
+        # The rollback below expires the instance, and reading it afterwards
+        # would refresh it with a blocking query on the event loop.
+        snapshot = UserInDB.model_validate(user)
+        # Hand the connection back to the pool while the hash runs; a login
+        # burst would otherwise pin every pooled connection for ~250 ms.
+        await run_in_threadpool(db.rollback)
+
+        verified, new_hash = await password_hasher.verify_and_update(
+            password, hashed_password
+        )
+        if not verified:
+            logger.warning("Authentication failed: invalid password for %s", email)
+            return None
+
+        if new_hash:
+            await run_in_threadpool(
+                self.rehash, db, id=snapshot.id, hashed_password=new_hash
+            )
+            logger.info("Password rehashed with the current cost for %s", email)
+        logger.info("User authenticated: %s", email)
+        return snapshot
+
 
 user = CRUDUser()
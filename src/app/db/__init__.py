@@ -1,6 +1,13 @@
 from .base import Base
 from .models import User, Book, Reader, BorrowedBook
-from .session import engine, SessionLocal, get_db, create_tables
+from .session import (
+    engine,
+    SessionLocal,
+    get_db,
+    get_read_db,
+    get_async_db,
+    create_tables,
+)
 
 __all__ = [
     "Base",
@@ -11,5 +18,7 @@ __all__ = [
     "engine",
     "SessionLocal",
     "get_db",
+    "get_read_db",
+    "get_async_db",
     "create_tables",
 ]
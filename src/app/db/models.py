@@ -1,11 +1,16 @@
 from sqlalchemy import (
+    DDL,
     Column,
     Integer,
     String,
+    Date,
     DateTime,
     ForeignKey,
     CheckConstraint,
+    Index,
     Text,
+    event,
+    func,
 )
 from sqlalchemy.orm import relationship
 from datetime import datetime, timezone
@@ -15,15 +20,19 @@ import logging
 logger = logging.getLogger(__name__)
 
 
+# Columns are TIMESTAMP WITHOUT TIME ZONE holding UTC; asyncpg refuses aware
+# datetimes for them, so the defaults are stored naive.
+def utcnow() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
 class User(Base):
     __tablename__ = "users"
 
     id = Column(Integer, primary_key=True, index=True)
     email = Column(String, unique=True, index=True, nullable=False)
     hashed_password = Column(String, nullable=False)
-    created_at = Column(
-        DateTime, default=lambda: datetime.now(timezone.utc), nullable=False
-    )
+    created_at = Column(DateTime, default=utcnow, nullable=False)
 
     def __repr__(self):
         return f"<User(id={self.id}, email={self.email})>"
@@ -39,12 +48,24 @@ class Book(Base):
     isbn = Column(String, unique=True, index=True, nullable=True)
     copies_available = Column(Integer, default=1, nullable=False)
     description = Column(String, nullable=True)
+    updated_at = Column(
+        DateTime,
+        default=utcnow,
+        onupdate=utcnow,
+        server_default=func.now(),
+        index=True,
+        nullable=False,
+    )
+    version = Column(Integer, default=1, server_default="1", nullable=False)
 
     borrows = relationship("BorrowedBook", back_populates="book")
 
     __table_args__ = (
         CheckConstraint("copies_available >= 0", name="copies_available_non_negative"),
+        Index("ix_books_title_id", "title", "id"),
+        Index("ix_books_author_id", "author", "id"),
     )
+    __mapper_args__ = {"version_id_col": version}
 
     def __repr__(self):
         return (
@@ -52,33 +73,81 @@ class Book(Base):
         )
 
 
+# Postgres keeps a weighted tsvector of title/author/description in a generated
+# column; it is not mapped on the model so other backends are unaffected.
+BOOK_SEARCH_VECTOR = (
+    "setweight(to_tsvector('simple', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(author, '')), 'B') || "
+    "setweight(to_tsvector('simple', coalesce(description, '')), 'C')"
+)
+
+event.listen(
+    Book.__table__,
+    "after_create",
+    DDL(
+        "ALTER TABLE %(fullname)s ADD COLUMN search_vector tsvector "
+        f"GENERATED ALWAYS AS ({BOOK_SEARCH_VECTOR}) STORED"
+    ).execute_if(dialect="postgresql"),
+)
+event.listen(
+    Book.__table__,
+    "after_create",
+    DDL(
+        "CREATE INDEX ix_books_search_vector ON %(fullname)s USING gin (search_vector)"
+    ).execute_if(dialect="postgresql"),
+)
+
+
 class Reader(Base):
     __tablename__ = "readers"
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, nullable=False)
     email = Column(String, unique=True, index=True, nullable=False)
+    updated_at = Column(
+        DateTime,
+        default=utcnow,
+        onupdate=utcnow,
+        server_default=func.now(),
+        nullable=False,
+    )
+    version = Column(Integer, default=1, server_default="1", nullable=False)
+    # Maintained by CRUDBorrow when BORROW_ACTIVE_COUNTER is on.
+    active_borrows = Column(Integer, default=0, server_default="0", nullable=False)
 
     borrows = relationship("BorrowedBook", back_populates="reader")
 
+    __table_args__ = (Index("ix_readers_name_id", "name", "id"),)
+    __mapper_args__ = {"version_id_col": version}
+
     def __repr__(self):
         return f"<Reader(id={self.id}, name={self.name})>"
 
 
 class BorrowedBook(Base):
+    # Range-partitioned by month of borrow_date on Postgres, where the table
+    # key is (id, borrow_date); see app/db/partitions.py.
     __tablename__ = "borrowed_books"
 
     id = Column(Integer, primary_key=True, index=True)
     book_id = Column(Integer, ForeignKey("books.id"), nullable=False)
     reader_id = Column(Integer, ForeignKey("readers.id"), nullable=False)
-    borrow_date = Column(
-        DateTime, default=lambda: datetime.now(timezone.utc), nullable=False
-    )
+    borrow_date = Column(DateTime, default=utcnow, nullable=False)
     return_date = Column(DateTime, nullable=True)
 
     book = relationship("Book", back_populates="borrows")
     reader = relationship("Reader", back_populates="borrows")
 
+    __table_args__ = (
+        Index(
+            "ix_borrowed_books_active_reader",
+            "reader_id",
+            postgresql_where=return_date.is_(None),
+            sqlite_where=return_date.is_(None),
+        ),
+        Index("ix_borrowed_books_reader_borrow_date", "reader_id", "borrow_date", "id"),
+    )
+
     def __repr__(self):
         return (
             f"<BorrowedBook(id={self.id}, book_id={self.book_id}, "
@@ -86,4 +155,50 @@ class BorrowedBook(Base):
         )
 
 
+# Borrow/return events appended in the same transaction as the loan change
+# and drained by the stats refresher into the daily rollups below. No
+# foreign keys: the log outlives deleted books and readers.
+class CirculationEvent(Base):
+    __tablename__ = "circulation_events"
+
+    id = Column(Integer, primary_key=True)
+    kind = Column(String(6), nullable=False)
+    borrow_id = Column(Integer, nullable=False)
+    book_id = Column(Integer, nullable=False)
+    reader_id = Column(Integer, nullable=False)
+    borrow_date = Column(DateTime, nullable=False)
+    occurred_at = Column(DateTime, nullable=False)
+
+    __table_args__ = (
+        CheckConstraint("kind IN ('borrow', 'return')", name="check_event_kind"),
+    )
+
+
+class DailyCirculation(Base):
+    __tablename__ = "daily_circulation"
+
+    day = Column(Date, primary_key=True)
+    borrows = Column(Integer, default=0, server_default="0", nullable=False)
+    returns = Column(Integer, default=0, server_default="0", nullable=False)
+    # Loans borrowed on this day that are still out.
+    open_loans = Column(Integer, default=0, server_default="0", nullable=False)
+
+
+class DailyBookLoans(Base):
+    __tablename__ = "daily_book_loans"
+
+    day = Column(Date, primary_key=True)
+    book_id = Column(Integer, primary_key=True)
+    borrows = Column(Integer, default=0, server_default="0", nullable=False)
+
+
+class DailyReaderActivity(Base):
+    __tablename__ = "daily_reader_activity"
+
+    day = Column(Date, primary_key=True)
+    reader_id = Column(Integer, primary_key=True)
+    borrows = Column(Integer, default=0, server_default="0", nullable=False)
+    returns = Column(Integer, default=0, server_default="0", nullable=False)
+
+
 logger.info("Database models defined")
@@ -0,0 +1,281 @@
+from datetime import date
+from pathlib import Path
+from typing import Dict, List, Optional
+import gzip
+import logging
+
+import orjson
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+from app.db.models import BorrowedBook, utcnow
+
+logger = logging.getLogger(__name__)
+
+# borrowed_books is range-partitioned by month of borrow_date on Postgres
+# (migration 2e6b9f4c7a13). The ORM model still declares the plain table:
+# create_all() builds it unpartitioned and every helper here is a no-op
+# on such a table.
+loans = BorrowedBook.__table__
+
+PARTITION_PREFIX = f"{loans.name}_p"
+DEFAULT_PARTITION = f"{loans.name}_default"
+# Arbitrary key for pg_advisory_xact_lock so app instances starting
+# together do not race on CREATE TABLE.
+PARTITION_LOCK_KEY = 727001
+
+
+def _qualify(name: str, schema: Optional[str] = None) -> str:
+    schema = schema if schema is not None else loans.schema
+    return f'"{schema}"."{name}"' if schema else f'"{name}"'
+
+
+def add_months(day: date, months: int) -> date:
+    # First day of the month `months` after the one containing `day`.
+    index = day.year * 12 + day.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(start: date) -> str:
+    return f"{PARTITION_PREFIX}{start:%Y_%m}"
+
+
+def partition_start(name: str) -> Optional[date]:
+    if not name.startswith(PARTITION_PREFIX):
+        return None
+    year, month = name[len(PARTITION_PREFIX) :].split("_")
+    return date(int(year), int(month), 1)
+
+
+def is_partitioned(conn: Connection) -> bool:
+    if conn.dialect.name != "postgresql":
+        return False
+    return bool(
+        conn.scalar(
+            text(
+                "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table "
+                "WHERE partrelid = to_regclass(:name))"
+            ),
+            {"name": _qualify(loans.name)},
+        )
+    )
+
+
+def list_partitions(conn: Connection) -> List[str]:
+    return list(
+        conn.scalars(
+            text(
+                "SELECT c.relname FROM pg_inherits i "
+                "JOIN pg_class c ON c.oid = i.inhrelid "
+                "WHERE i.inhparent = to_regclass(:name) ORDER BY c.relname"
+            ),
+            {"name": _qualify(loans.name)},
+        )
+    )
+
+
+def create_partition(conn: Connection, start: date) -> str:
+    # Postgres refuses a new partition over rows the default partition holds
+    # for its range (loans written after the window ran out). Those are moved
+    # across: the default is detached for the duration, inside the caller's
+    # transaction, so other sessions only see the finished result.
+    name = partition_name(start)
+    end = add_months(start, 1)
+    bounds = {"start": start, "end": end}
+    stranded = False
+    missing = conn.scalar(
+        text("SELECT to_regclass(:default) IS NOT NULL AND to_regclass(:name) IS NULL"),
+        {"default": _qualify(DEFAULT_PARTITION), "name": _qualify(name)},
+    )
+    if missing:
+        stranded = conn.scalar(
+            text(
+                f"SELECT EXISTS (SELECT 1 FROM {_qualify(DEFAULT_PARTITION)} "
+                "WHERE borrow_date >= :start AND borrow_date < :end)"
+            ),
+            bounds,
+        )
+    if stranded:
+        conn.execute(
+            text(
+                f"ALTER TABLE {_qualify(loans.name)} "
+                f"DETACH PARTITION {_qualify(DEFAULT_PARTITION)}"
+            )
+        )
+    conn.execute(
+        text(
+            f"CREATE TABLE IF NOT EXISTS {_qualify(name)} "
+            f"PARTITION OF {_qualify(loans.name)} "
+            f"FOR VALUES FROM ('{start}') TO ('{end}')"
+        )
+    )
+    if stranded:
+        moved = conn.execute(
+            text(
+                f"WITH moved AS (DELETE FROM {_qualify(DEFAULT_PARTITION)} "
+                "WHERE borrow_date >= :start AND borrow_date < :end "
+                "RETURNING id, book_id, reader_id, borrow_date, return_date) "
+                f"INSERT INTO {_qualify(loans.name)} "
+                "(id, book_id, reader_id, borrow_date, return_date) "
+                "SELECT id, book_id, reader_id, borrow_date, return_date FROM moved"
+            ),
+            bounds,
+        ).rowcount
+        conn.execute(
+            text(
+                f"ALTER TABLE {_qualify(loans.name)} "
+                f"ATTACH PARTITION {_qualify(DEFAULT_PARTITION)} DEFAULT"
+            )
+        )
+        logger.warning(
+            "Moved %s loans from %s into new partition %s",
+            moved,
+            DEFAULT_PARTITION,
+            name,
+        )
+    return name
+
+
+def ensure_partitions(
+    conn: Connection, *, months_ahead: int, today: Optional[date] = None
+) -> List[str]:
+    # Monthly partitions from the current month up to months_ahead. Run at
+    # startup and by the stats refresher, so the window keeps moving; loans
+    # that still landed in the default partition are moved out on creation.
+    if not is_partitioned(conn):
+        return []
+    conn.execute(
+        text("SELECT pg_advisory_xact_lock(:key)"), {"key": PARTITION_LOCK_KEY}
+    )
+    existing = set(list_partitions(conn))
+    current = add_months(today or utcnow().date(), 0)
+    created = []
+    for offset in range(months_ahead + 1):
+        start = add_months(current, offset)
+        if partition_name(start) not in existing:
+            created.append(create_partition(conn, start))
+    if created:
+        logger.info("Created borrowed_books partitions: %s", ", ".join(created))
+    return created
+
+
+def partition_borrowed_books(conn: Connection, *, months_ahead: int) -> None:
+    # Rebuilds the plain table as a partitioned one and copies the rows over:
+    # the layout of migration 2e6b9f4c7a13, for databases built with
+    # create_all() such as the test database.
+    # The primary key has to include the partition key, so it becomes
+    # (id, borrow_date); id stays unique through its sequence.
+    old = f"{loans.name}_unpartitioned"
+    for index in loans.indexes:
+        conn.execute(text(f"DROP INDEX IF EXISTS {_qualify(index.name)}"))
+    conn.execute(text(f'ALTER TABLE {_qualify(loans.name)} RENAME TO "{old}"'))
+    conn.execute(
+        text(
+            f'ALTER TABLE {_qualify(old)} RENAME CONSTRAINT "{loans.name}_pkey" '
+            f'TO "{old}_pkey"'
+        )
+    )
+    sequence = _qualify(f"{loans.name}_id_seq")
+    conn.execute(
+        text(
+            f"CREATE TABLE {_qualify(loans.name)} ("
+            f"id INTEGER NOT NULL DEFAULT nextval('{sequence}'::regclass), "
+            f"book_id INTEGER NOT NULL REFERENCES {_qualify('books')} (id), "
+            f"reader_id INTEGER NOT NULL REFERENCES {_qualify('readers')} (id), "
+            "borrow_date TIMESTAMP WITHOUT TIME ZONE NOT NULL, "
+            "return_date TIMESTAMP WITHOUT TIME ZONE, "
+            f'CONSTRAINT "{loans.name}_pkey" PRIMARY KEY (id, borrow_date)'
+            ") PARTITION BY RANGE (borrow_date)"
+        )
+    )
+    conn.execute(text(f"ALTER SEQUENCE {sequence} OWNED BY {_qualify(loans.name)}.id"))
+
+    first = conn.scalar(text(f"SELECT min(borrow_date) FROM {_qualify(old)}"))
+    current = add_months(utcnow().date(), 0)
+    start = add_months(first.date(), 0) if first else current
+    while start <= add_months(current, months_ahead):
+        create_partition(conn, start)
+        start = add_months(start, 1)
+    conn.execute(
+        text(
+            f"CREATE TABLE {_qualify(DEFAULT_PARTITION)} "
+            f"PARTITION OF {_qualify(loans.name)} DEFAULT"
+        )
+    )
+
+    conn.execute(
+        text(
+            f"INSERT INTO {_qualify(loans.name)} "
+            "(id, book_id, reader_id, borrow_date, return_date) "
+            f"SELECT id, book_id, reader_id, borrow_date, return_date FROM {_qualify(old)}"
+        )
+    )
+    conn.execute(text(f"DROP TABLE {_qualify(old)}"))
+    # Created on the parent, so Postgres builds them on every partition.
+    for index in loans.indexes:
+        index.create(conn)
+
+
+def _export_partition(conn: Connection, name: str, directory: Path) -> Path:
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / f"{name}.ndjson.gz"
+    result = conn.execute(
+        text(
+            f"SELECT id, book_id, reader_id, borrow_date, return_date "
+            f"FROM {_qualify(name)} ORDER BY id"
+        ),
+        execution_options={"stream_results": True},
+    )
+    with gzip.open(path, "wb") as stream:
+        for rows in result.partitions(1000):
+            stream.write(b"".join(orjson.dumps(r._asdict()) + b"\n" for r in rows))
+    return path
+
+
+def archive_partitions(
+    conn: Connection,
+    *,
+    before: date,
+    archive_schema: str,
+    export_dir: Optional[Path] = None,
+) -> List[Dict]:
+    # Detaches monthly partitions that end on or before `before`. They are
+    # moved to archive_schema, or, with export_dir, written out as gzipped
+    # NDJSON and dropped. A partition that still holds an open loan is kept.
+    report = []
+    if not is_partitioned(conn):
+        return report
+    for name in list_partitions(conn):
+        start = partition_start(name)
+        if start is None or add_months(start, 1) > before:
+            continue
+        open_loans = conn.scalar(
+            text(f"SELECT count(*) FROM {_qualify(name)} WHERE return_date IS NULL")
+        )
+        if open_loans:
+            logger.warning("Not archiving %s: %s loans still open", name, open_loans)
+            report.append(
+                {"partition": name, "action": "skipped", "open_loans": open_loans}
+            )
+            continue
+
+        conn.execute(
+            text(
+                f"ALTER TABLE {_qualify(loans.name)} DETACH PARTITION {_qualify(name)}"
+            )
+        )
+        # The archived copy must not keep drawing ids from the live sequence.
+        conn.execute(text(f"ALTER TABLE {_qualify(name)} ALTER COLUMN id DROP DEFAULT"))
+        if export_dir is not None:
+            path = _export_partition(conn, name, export_dir)
+            conn.execute(text(f"DROP TABLE {_qualify(name)}"))
+            entry = {"partition": name, "action": "exported", "path": str(path)}
+        else:
+            conn.execute(text(f'CREATE SCHEMA IF NOT EXISTS "{archive_schema}"'))
+            conn.execute(
+                text(f'ALTER TABLE {_qualify(name)} SET SCHEMA "{archive_schema}"')
+            )
+            entry = {"partition": name, "action": "detached", "schema": archive_schema}
+        logger.info("Archived borrowed_books partition %s: %s", name, entry["action"])
+        report.append(entry)
+    return report
@@ -0,0 +1,165 @@
+from bisect import bisect_left
+from typing import Any, Dict, Optional, Type
+import logging
+import math
+import threading
+import time
+
+from sqlalchemy import event, exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import Pool, QueuePool
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds in seconds, Prometheus style; the last bucket is +Inf.
+WAIT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# recent_wait(): weight of each new wait, and how fast the average fades
+# once no connection is being asked for.
+RECENT_WAIT_WEIGHT = 0.2
+RECENT_WAIT_DECAY_SECONDS = 2.0
+
+
+class PoolMetrics:
+    def __init__(self, name: str):
+        self.name = name
+        self.pool: Optional[Pool] = None
+        self._lock = threading.Lock()
+        self.connects = 0
+        self.checkouts = 0
+        self.checkins = 0
+        self.invalidations = 0
+        self.soft_invalidations = 0
+        self.timeouts = 0
+        self.overflow_peak = 0
+        self.wait_buckets = [0] * (len(WAIT_BUCKETS) + 1)
+        self.wait_count = 0
+        self.wait_sum = 0.0
+        self.wait_max = 0.0
+        self._recent_wait = 0.0
+        self._recent_at = time.monotonic()
+
+    def observe_wait(self, seconds: float, timed_out: bool = False) -> None:
+        with self._lock:
+            self.wait_buckets[bisect_left(WAIT_BUCKETS, seconds)] += 1
+            self.wait_count += 1
+            self.wait_sum += seconds
+            self.wait_max = max(self.wait_max, seconds)
+            if timed_out:
+                self.timeouts += 1
+            now = time.monotonic()
+            recent = self._recent_value(now)
+            self._recent_wait = recent + RECENT_WAIT_WEIGHT * (seconds - recent)
+            self._recent_at = now
+
+    def _recent_value(self, now: float) -> float:
+        age = now - self._recent_at
+        return self._recent_wait * math.exp(-age / RECENT_WAIT_DECAY_SECONDS)
+
+    def recent_wait(self) -> float:
+        # Moving average of checkout waits that decays while the pool is
+        # idle, so load shedding keyed on it lets traffic back in by itself.
+        with self._lock:
+            return self._recent_value(time.monotonic())
+
+    def _on_connect(self, dbapi_connection, connection_record) -> None:
+        with self._lock:
+            self.connects += 1
+
+    def _on_checkout(self, dbapi_connection, connection_record, connection_proxy):
+        overflow = self.pool.overflow() if isinstance(self.pool, QueuePool) else 0
+        with self._lock:
+            self.checkouts += 1
+            self.overflow_peak = max(self.overflow_peak, overflow)
+
+    def _on_checkin(self, dbapi_connection, connection_record) -> None:
+        with self._lock:
+            self.checkins += 1
+
+    def _on_invalidate(self, dbapi_connection, connection_record, exception) -> None:
+        with self._lock:
+            self.invalidations += 1
+        logger.warning("Pool %s: connection invalidated: %s", self.name, exception)
+
+    def _on_soft_invalidate(self, dbapi_connection, connection_record, exception):
+        with self._lock:
+            self.soft_invalidations += 1
+
+    def instrument(self, engine: Engine) -> None:
+        # Listeners on the engine follow the pool across dispose()/recreate().
+        self.pool = engine.pool
+        event.listen(engine, "connect", self._on_connect)
+        event.listen(engine, "checkout", self._on_checkout)
+        event.listen(engine, "checkin", self._on_checkin)
+        event.listen(engine, "invalidate", self._on_invalidate)
+        event.listen(engine, "soft_invalidate", self._on_soft_invalidate)
+        event.listen(engine, "engine_disposed", self._on_disposed)
+
+    def _on_disposed(self, engine: Engine) -> None:
+        self.pool = engine.pool
+
+    def stats(self) -> Dict[str, Any]:
+        pool = self.pool
+        gauges = {}
+        if isinstance(pool, QueuePool):
+            gauges = {
+                "size": pool.size(),
+                "checked_out": pool.checkedout(),
+                "checked_in": pool.checkedin(),
+                # Negative while the pool has not opened all of pool_size yet.
+                "overflow": pool.overflow(),
+                "max_overflow": pool._max_overflow,
+                "timeout": pool.timeout(),
+            }
+        with self._lock:
+            cumulative = 0
+            buckets = {}
+            for bound, count in zip(WAIT_BUCKETS + ("+Inf",), self.wait_buckets):
+                cumulative += count
+                buckets[str(bound)] = cumulative
+            return {
+                "name": self.name,
+                **gauges,
+                "connects": self.connects,
+                "checkouts": self.checkouts,
+                "checkins": self.checkins,
+                "invalidations": self.invalidations,
+                "soft_invalidations": self.soft_invalidations,
+                "timeouts": self.timeouts,
+                "overflow_peak": self.overflow_peak,
+                "wait_seconds": {
+                    "count": self.wait_count,
+                    "sum": round(self.wait_sum, 6),
+                    "max": round(self.wait_max, 6),
+                    "buckets": buckets,
+                },
+            }
+
+
+def timed_pool(base: Type[Pool], metrics: PoolMetrics) -> Type[Pool]:
+    # Pool events fire only once a connection is handed out, so the time
+    # spent waiting for it is taken around Pool.connect(). A subclass keeps
+    # the metrics when the engine recreates its pool.
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            connection = base.connect(self)
+        except exc.TimeoutError:
+            metrics.observe_wait(time.perf_counter() - started, timed_out=True)
+            raise
+        metrics.observe_wait(time.perf_counter() - started)
+        return connection
+
+    return type(f"Timed{base.__name__}", (base,), {"connect": connect})
+
+
+def pool_options(metrics: PoolMetrics, base: Type[Pool] = QueuePool) -> Dict[str, Any]:
+    return {
+        "poolclass": timed_pool(base, metrics),
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
@@ -0,0 +1,158 @@
+from itertools import count
+from typing import Callable, List, Optional
+import logging
+import threading
+import time
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import sessionmaker
+
+from app.core.config import settings
+from app.core.profiler import instrument_queries
+
+from .pool import PoolMetrics, pool_options
+
+logger = logging.getLogger(__name__)
+
+BALANCE_STRATEGIES = ("round_robin", "least_connections")
+
+# Seconds the replica has yet to replay. A replica that has replayed all
+# the WAL it received is current even if the primary has been idle, which
+# pg_last_xact_replay_timestamp() alone would report as growing lag.
+LAG_QUERY = text(
+    "SELECT CASE "
+    "WHEN NOT pg_is_in_recovery() THEN 0 "
+    "WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) "
+    "END"
+)
+
+
+def probe_lag(engine: Engine) -> float:
+    with engine.connect() as conn:
+        return float(conn.scalar(LAG_QUERY))
+
+
+class Replica:
+    def __init__(self, url: str, name: str):
+        self.name = name
+        self.url = make_url(url).render_as_string(hide_password=True)
+        self.metrics = PoolMetrics(name)
+        # Read-only transactions: a routing mistake fails loudly instead of
+        # writing to a replica (or, in tests, to a second primary).
+        self.engine = create_engine(
+            url,
+            execution_options={"postgresql_readonly": True},
+            **pool_options(self.metrics),
+        )
+        self.metrics.instrument(self.engine)
+        instrument_queries(self.engine)
+        self.session_factory = sessionmaker(
+            autocommit=False, autoflush=False, bind=self.engine
+        )
+        self.lag: Optional[float] = None
+        self.checked_at = float("-inf")
+
+    def in_use(self) -> int:
+        return self.engine.pool.checkedout()
+
+
+class ReplicaRouter:
+    # Picks a replica for read-only sessions. Replicas whose lag exceeds
+    # max_lag, or which could not be probed, are skipped; with none left the
+    # caller falls back to the primary.
+    def __init__(
+        self,
+        urls: List[str],
+        *,
+        balance: str = "round_robin",
+        max_lag: float = 5.0,
+        check_interval: float = 2.0,
+        lag_probe: Callable[[Engine], float] = probe_lag,
+    ):
+        if balance not in BALANCE_STRATEGIES:
+            raise ValueError(f"Unknown replica balance strategy: {balance}")
+        self.replicas = [
+            Replica(url, f"replica{i}") for i, url in enumerate(urls, start=1)
+        ]
+        self.balance = balance
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self.lag_probe = lag_probe
+        self._turn = count()
+        self._lock = threading.Lock()
+        self.fallbacks = 0
+
+    @classmethod
+    def from_settings(cls) -> "ReplicaRouter":
+        urls = [
+            url.strip()
+            for url in settings.DATABASE_REPLICA_URLS.split(",")
+            if url.strip()
+        ]
+        return cls(
+            urls,
+            balance=settings.DB_REPLICA_BALANCE,
+            max_lag=settings.DB_REPLICA_MAX_LAG_SECONDS,
+            check_interval=settings.DB_REPLICA_CHECK_SECONDS,
+        )
+
+    def _refresh_lag(self, replica: Replica) -> None:
+        # One thread probes an expired replica; the rest use the last value.
+        with self._lock:
+            now = time.monotonic()
+            if now - replica.checked_at < self.check_interval:
+                return
+            replica.checked_at = now
+        try:
+            replica.lag = self.lag_probe(replica.engine)
+        except Exception as e:
+            replica.lag = None
+            logger.warning("Replica %s lag check failed: %s", replica.name, e)
+
+    def _usable(self, replica: Replica) -> bool:
+        if time.monotonic() - replica.checked_at >= self.check_interval:
+            self._refresh_lag(replica)
+        return replica.lag is not None and replica.lag <= self.max_lag
+
+    def pick(self) -> Optional[Replica]:
+        if not self.replicas:
+            return None
+        candidates = [r for r in self.replicas if self._usable(r)]
+        if not candidates:
+            self.fallbacks += 1
+            return None
+        turn = next(self._turn)
+        if self.balance == "least_connections":
+            # Ties rotate so idle replicas share the load.
+            return min(
+                candidates,
+                key=lambda r: (
+                    r.in_use(),
+                    (self.replicas.index(r) - turn) % len(self.replicas),
+                ),
+            )
+        return candidates[turn % len(candidates)]
+
+    def stats(self) -> dict:
+        return {
+            "balance": self.balance,
+            "max_lag": self.max_lag,
+            "fallbacks": self.fallbacks,
+            "replicas": [
+                {
+                    "name": r.name,
+                    "url": r.url,
+                    "lag": r.lag,
+                    "in_use": r.in_use(),
+                    "pool": r.metrics.stats(),
+                }
+                for r in self.replicas
+            ],
+        }
+
+    def dispose(self) -> None:
+        for replica in self.replicas:
+            replica.engine.dispose()
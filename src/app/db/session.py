@@ -1,10 +1,23 @@
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
 from sqlalchemy.orm import sessionmaker, Session
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from sqlalchemy.exc import SQLAlchemyError
-from typing import Generator
+from typing import AsyncGenerator, Generator, Optional
 import logging
 import os
 
+from app.core.profiler import instrument_queries
+
+from .pool import PoolMetrics, pool_options
+from .replicas import ReplicaRouter
+
 logger = logging.getLogger(__name__)
 
 
@@ -20,12 +33,16 @@ def get_database_url():
 
 
 database_url = get_database_url()
+pool_metrics = PoolMetrics("sync")
+async_pool_metrics = PoolMetrics("async")
 
 try:
-    engine = create_engine(database_url, pool_pre_ping=True)
-    logger.info(f"Database engine created for: {database_url}")
+    engine = create_engine(database_url, **pool_options(pool_metrics))
+    pool_metrics.instrument(engine)
+    instrument_queries(engine)
+    logger.info("Database engine created for: %s", database_url)
 except Exception as e:
-    logger.error(f"Error creating database engine: {str(e)}")
+    logger.error("Error creating database engine: %s", e)
     raise
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -39,7 +56,7 @@ def get_db() -> Generator[Session, None, None]:
         logger.debug("Database session started")
         yield db
     except SQLAlchemyError as e:
-        logger.error(f"Database session error: {str(e)}")
+        logger.error("Database session error: %s", e)
         db.rollback()
         raise
     finally:
@@ -47,6 +64,72 @@ def get_db() -> Generator[Session, None, None]:
         db.close()
 
 
+replica_router = ReplicaRouter.from_settings()
+
+
+def get_read_db() -> Generator[Session, None, None]:
+    # For endpoints that only read and can tolerate replication lag up to
+    # DB_REPLICA_MAX_LAG_SECONDS. Falls back to the primary.
+    replica = replica_router.pick()
+    db = replica.session_factory() if replica else SessionLocal()
+    try:
+        yield db
+    except SQLAlchemyError as e:
+        logger.error("Database read session error: %s", e)
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+ASYNC_DRIVERS = {"postgresql": "asyncpg", "sqlite": "aiosqlite"}
+
+
+def get_async_database_url(url: str) -> str:
+    parsed = make_url(url)
+    driver = ASYNC_DRIVERS.get(parsed.get_backend_name())
+    if driver is None:
+        raise ValueError(f"No async driver configured for {parsed.drivername}")
+    return parsed.set(
+        drivername=f"{parsed.get_backend_name()}+{driver}"
+    ).render_as_string(hide_password=False)
+
+
+# Created on first use so the sync-only deployment does not need asyncpg.
+async_engine: Optional[AsyncEngine] = None
+AsyncSessionLocal: Optional[async_sessionmaker] = None
+
+
+def get_async_engine() -> AsyncEngine:
+    global async_engine, AsyncSessionLocal
+    if async_engine is None:
+        async_engine = create_async_engine(
+            get_async_database_url(database_url),
+            **pool_options(async_pool_metrics, AsyncAdaptedQueuePool),
+        )
+        async_pool_metrics.instrument(async_engine.sync_engine)
+        instrument_queries(async_engine.sync_engine)
+        AsyncSessionLocal = async_sessionmaker(
+            async_engine, autoflush=False, expire_on_commit=False
+        )
+        logger.info("Async database engine created")
+    return async_engine
+
+
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    get_async_engine()
+    async with AsyncSessionLocal() as db:
+        try:
+            logger.debug("Async database session started")
+            yield db
+        except SQLAlchemyError as e:
+            logger.error("Async database session error: %s", e)
+            await db.rollback()
+            raise
+        finally:
+            logger.debug("Async database session closed")
+
+
 def create_tables():
     if os.getenv("TESTING"):
         logger.info("Skipping table creation in testing mode")
@@ -59,5 +142,5 @@ def create_tables():
         Base.metadata.create_all(bind=engine)
         logger.info("Database tables created")
     except Exception as e:
-        logger.error(f"Error creating tables: {str(e)}")
+        logger.error("Error creating tables: %s", e)
         raise
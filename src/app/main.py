@@ -1,6 +1,6 @@
 import sys
 from pathlib import Path
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 import logging
@@ -11,23 +11,47 @@ SRC_DIR = BASE_DIR / "src"
 sys.path.insert(0, str(SRC_DIR))
 
 from app.api.router import api_router
-from app.db.session import create_tables
+from app.core.admission import AdmissionMiddleware
+from app.core.compression import CompressionMiddleware
+from app.core.hashing import password_hasher
+from app.core.logs import log_pipeline
+from app.core.config import settings
+from app.core.metrics import CONTENT_TYPE, MetricsMiddleware, request_metrics
+from app.core.refresher import stats_refresher
+from app.db.session import (
+    async_pool_metrics,
+    create_tables,
+    engine,
+    pool_metrics,
+    replica_router,
+)
 
 logger = logging.getLogger(__name__)
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    log_pipeline.start()
     if not os.getenv("TESTING"):
         try:
             create_tables()
             logger.info("Database tables created")
         except Exception as e:
-            logger.error(f"Error creating tables: {str(e)}")
+            logger.error("Error creating tables: %s", e)
+            raise
+        try:
+            stats_refresher.ensure_partitions()
+        except Exception as e:
+            logger.error("Error creating borrowed_books partitions: %s", e)
             raise
+        stats_refresher.start()
     else:
         logger.info("Running in TESTING mode, skipping table creation")
     yield
+    stats_refresher.stop()
+    replica_router.dispose()
+    password_hasher.shutdown()
+    log_pipeline.stop()
 
 
 app = FastAPI(
@@ -44,6 +68,7 @@ def read_root():
     return {"message": "Welcome to Library API", "docs": "/docs", "redoc": "/redoc"}
 
 
+app.add_middleware(AdmissionMiddleware)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -51,6 +76,9 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(CompressionMiddleware)
+# Added last so it wraps CORS and sees every response.
+app.add_middleware(MetricsMiddleware)
 
 
 @app.get("/")
@@ -67,4 +95,14 @@ def health_check():
     return {"status": "ok", "message": "Service is running"}
 
 
+# Per process: with several workers, each exposes its own counters.
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    pools = [pool_metrics]
+    if async_pool_metrics.pool is not None:
+        pools.append(async_pool_metrics)
+    pools.extend(replica.metrics for replica in replica_router.replicas)
+    return Response(request_metrics.render(pools), media_type=CONTENT_TYPE)
+
+
 app.include_router(api_router)
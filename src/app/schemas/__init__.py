@@ -1,7 +1,34 @@
-from .book import BookBase, BookCreate, BookUpdate, BookRead
+from .book import (
+    BookBase,
+    BookCreate,
+    BookUpdate,
+    BookRead,
+    BookSummary,
+    BookImportError,
+    BookImportReport,
+)
 from .reader import ReaderBase, ReaderCreate, ReaderUpdate, ReaderRead
 from .user import UserBase, UserCreate, UserUpdate, UserInDB
-from .borrow import BorrowBase, BorrowCreate, BorrowRead
+from .borrow import (
+    BorrowBase,
+    BorrowCreate,
+    BorrowRead,
+    BorrowHistoryRead,
+    BatchBookRef,
+    BorrowBatchCreate,
+    ReturnBatchItem,
+    ReturnBatch,
+    BatchItemResult,
+    BatchReport,
+)
+from .stats import (
+    DailyStats,
+    BookStats,
+    ReaderStats,
+    ReaderActivity,
+    OverdueStats,
+    StatsRefreshReport,
+)
 from .token import Token
 
 __all__ = [
@@ -9,6 +36,9 @@ __all__ = [
     "BookCreate",
     "BookUpdate",
     "BookRead",
+    "BookSummary",
+    "BookImportError",
+    "BookImportReport",
     "ReaderBase",
     "ReaderCreate",
     "ReaderUpdate",
@@ -20,5 +50,18 @@ __all__ = [
     "BorrowBase",
     "BorrowCreate",
     "BorrowRead",
+    "BorrowHistoryRead",
+    "BatchBookRef",
+    "BorrowBatchCreate",
+    "ReturnBatchItem",
+    "ReturnBatch",
+    "BatchItemResult",
+    "BatchReport",
+    "DailyStats",
+    "BookStats",
+    "ReaderStats",
+    "ReaderActivity",
+    "OverdueStats",
+    "StatsRefreshReport",
     "Token",
 ]
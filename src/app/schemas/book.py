@@ -1,5 +1,6 @@
 from pydantic import BaseModel, Field, ConfigDict
-from typing import Optional
+from datetime import datetime
+from typing import List, Optional
 
 
 class BookBase(BaseModel):
@@ -45,4 +46,30 @@ class BookUpdate(BaseModel):
 
 class BookRead(BookBase):
     id: int
+    version: int = 1
+    updated_at: Optional[datetime] = None
     model_config = ConfigDict(from_attributes=True)
+
+
+class BookSummary(BaseModel):
+    id: int
+    title: str
+    author: str
+    year: Optional[int] = None
+    isbn: Optional[str] = None
+    model_config = ConfigDict(from_attributes=True)
+
+
+class BookImportError(BaseModel):
+    row: int
+    isbn: Optional[str] = None
+    errors: List[str]
+
+
+class BookImportReport(BaseModel):
+    total: int = 0
+    imported: int = 0
+    duplicates: int = 0
+    failed: int = 0
+    errors: List[BookImportError] = []
+    errors_truncated: bool = False
@@ -1,6 +1,8 @@
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field, model_validator
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
+
+from .book import BookSummary
 
 
 class BorrowBase(BaseModel):
@@ -19,3 +21,57 @@ class BorrowRead(BaseModel):
     borrow_date: datetime
     return_date: Optional[datetime] = None
     model_config = ConfigDict(from_attributes=True)
+
+
+class BorrowHistoryRead(BorrowRead):
+    book: BookSummary
+
+
+class BatchBookRef(BaseModel):
+    # A book is named either by id or by ISBN.
+    book_id: Optional[int] = None
+    isbn: Optional[str] = Field(None, min_length=10, max_length=13)
+
+    @model_validator(mode="after")
+    def check_reference(self):
+        if (self.book_id is None) == (self.isbn is None):
+            raise ValueError("Exactly one of book_id or isbn is required")
+        return self
+
+
+class BorrowBatchCreate(BaseModel):
+    reader_id: int
+    items: List[BatchBookRef] = Field(..., min_length=1, max_length=100)
+
+
+class ReturnBatchItem(BaseModel):
+    # Either a borrow record id, or a book (id or ISBN) whose oldest open
+    # loan is returned, optionally narrowed to one reader.
+    borrow_id: Optional[int] = None
+    book_id: Optional[int] = None
+    isbn: Optional[str] = Field(None, min_length=10, max_length=13)
+    reader_id: Optional[int] = None
+
+    @model_validator(mode="after")
+    def check_reference(self):
+        given = [v for v in (self.borrow_id, self.book_id, self.isbn) if v is not None]
+        if len(given) != 1:
+            raise ValueError("Exactly one of borrow_id, book_id or isbn is required")
+        return self
+
+
+class ReturnBatch(BaseModel):
+    items: List[ReturnBatchItem] = Field(..., min_length=1, max_length=100)
+
+
+class BatchItemResult(BaseModel):
+    index: int
+    status_code: int
+    borrow: Optional[BorrowRead] = None
+    detail: Optional[str] = None
+
+
+class BatchReport(BaseModel):
+    succeeded: int
+    failed: int
+    results: List[BatchItemResult]
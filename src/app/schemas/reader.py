@@ -1,4 +1,5 @@
 from pydantic import BaseModel, EmailStr, Field, ConfigDict
+from datetime import datetime
 from typing import Optional
 
 
@@ -20,4 +21,6 @@ class ReaderUpdate(BaseModel):
 
 class ReaderRead(ReaderBase):
     id: int
+    version: int = 1
+    updated_at: Optional[datetime] = None
     model_config = ConfigDict(from_attributes=True)
@@ -0,0 +1,40 @@
+from pydantic import BaseModel
+from datetime import date
+from typing import List
+
+from .book import BookSummary
+
+
+class DailyStats(BaseModel):
+    day: date
+    borrows: int
+    returns: int
+
+
+class BookStats(BaseModel):
+    book: BookSummary
+    borrows: int
+
+
+class ReaderStats(BaseModel):
+    reader_id: int
+    name: str
+    borrows: int
+    returns: int
+    active_days: int
+
+
+class ReaderActivity(BaseModel):
+    active_readers: int
+    top: List[ReaderStats]
+
+
+class OverdueStats(BaseModel):
+    open_loans: int
+    overdue: int
+    loan_period_days: int
+    pending_events: int
+
+
+class StatsRefreshReport(BaseModel):
+    processed: int
@@ -0,0 +1,218 @@
+import asyncio
+import math
+
+import pytest
+
+from app.core.admission import (
+    AdmissionController,
+    MemoryBucketStore,
+    RedisBucketStore,
+    admission,
+    parse_route_costs,
+)
+from app.core.config import settings
+from app.core.security import create_access_token, token_user_id
+from app.db.pool import PoolMetrics
+
+
+class FakeRedis:
+    # Stand-in for a shared redis: runs TAKE_SCRIPT's logic in Python over a
+    # dict, on a clock the test controls.
+    def __init__(self):
+        self.hashes = {}
+        self.now = 1000.0
+
+    def eval(self, script, numkeys, key, rate, burst, cost):
+        state = self.hashes.get(key, {})
+        tokens = float(state.get("tokens", burst))
+        at = float(state.get("at", self.now))
+        tokens = min(burst, tokens + max(0.0, self.now - at) * rate)
+        allowed, wait = 0, (cost - tokens) / rate
+        if tokens >= cost:
+            tokens, allowed, wait = tokens - cost, 1, 0
+        self.hashes[key] = {"tokens": str(tokens), "at": str(self.now)}
+        return [allowed, str(wait).encode()]
+
+    def scan_iter(self, match):
+        return [key for key in self.hashes if key.startswith(match.rstrip("*"))]
+
+    def delete(self, *keys):
+        for key in keys:
+            self.hashes.pop(key, None)
+
+
+class BrokenStore(MemoryBucketStore):
+    def take(self, key, rate, burst, cost):
+        raise ConnectionError("down")
+
+
+@pytest.fixture
+def limits(monkeypatch):
+    monkeypatch.setattr(settings, "RATE_LIMIT_PER_SECOND", 1.0)
+    monkeypatch.setattr(settings, "RATE_LIMIT_BURST", 3)
+    monkeypatch.setattr(settings, "RATE_LIMIT_AUTH_PER_SECOND", 0.5)
+    monkeypatch.setattr(settings, "RATE_LIMIT_AUTH_BURST", 2)
+    admission.store.clear()
+    yield
+    admission.store.clear()
+
+
+def scope(path="/books/", method="GET", token=None, ip="10.0.0.1"):
+    headers = [(b"authorization", f"Bearer {token}".encode())] if token else []
+    return {
+        "type": "http",
+        "method": method,
+        "path": path,
+        "headers": headers,
+        "client": (ip, 1234),
+    }
+
+
+def test_memory_bucket_refills_over_time():
+    clock = [0.0]
+    store = MemoryBucketStore(clock=lambda: clock[0])
+
+    assert store.take("k", 2.0, 4, 3) == 0
+    assert store.take("k", 2.0, 4, 3) == pytest.approx(1.0)
+    clock[0] = 0.5
+    assert store.take("k", 2.0, 4, 3) == pytest.approx(0.5)
+    clock[0] = 1.0
+    assert store.take("k", 2.0, 4, 3) == 0
+    # Refill stops at burst however long the bucket sat idle.
+    clock[0] = 100.0
+    assert store.take("k", 2.0, 4, 4) == 0
+    assert store.take("k", 2.0, 4, 1) > 0
+
+
+def test_memory_bucket_evicts_least_recently_used():
+    store = MemoryBucketStore(max_keys=2)
+    for key in ("a", "b", "a", "c"):
+        store.take(key, 1.0, 5, 1)
+    assert list(store._buckets) == ["a", "c"]
+
+
+def test_route_costs_match_longest_prefix():
+    costs = parse_route_costs("GET /books=2, GET /books/export=20,POST /borrow=5,bad,,")
+    assert costs[0] == ("GET", "/books/export", 20)
+
+    controller = AdmissionController(MemoryBucketStore(), pools=())
+    controller.route_costs = costs
+    assert controller.cost("GET", "/books/export") == 20
+    assert controller.cost("GET", "/books/7") == 2
+    assert controller.cost("POST", "/books/") == 1
+    assert controller.cost("POST", "/borrow/batch") == 5
+
+
+def test_token_user_id():
+    assert token_user_id(create_access_token("42")) == 42
+    assert token_user_id("not-a-token") is None
+
+
+def test_rate_limit_per_user(auth_client, limits):
+    for _ in range(3):
+        assert auth_client.get("/books/").status_code == 200
+    response = auth_client.get("/books/")
+    assert response.status_code == 429
+    assert response.headers["retry-after"] == "1"
+    assert response.json() == {"detail": "Rate limit exceeded"}
+    # CORSMiddleware wraps admission, so rejections are still readable.
+    response = auth_client.get("/books/", headers={"Origin": "http://example.com"})
+    assert response.headers["access-control-allow-origin"] == "*"
+
+    other = {"Authorization": f"Bearer {create_access_token('999999')}"}
+    assert auth_client.get("/books/", headers=other).status_code != 429
+    assert auth_client.get("/health").status_code == 200
+    assert admission.stats()["rejected"]["rate"] >= 2
+
+
+def test_expensive_routes_drain_the_bucket(limits):
+    controller = AdmissionController(MemoryBucketStore(), pools=())
+    token = create_access_token("7")
+
+    # Costs more than the burst: clamped to it, so it runs on a full bucket.
+    assert asyncio.run(controller.admit(scope("/books/export", token=token))) is None
+    status, retry_after, _ = asyncio.run(controller.admit(scope(token=token)))
+    assert (status, retry_after) == (429, 1)
+    # The anonymous caller on the same address has a bucket of its own.
+    assert asyncio.run(controller.admit(scope())) is None
+
+
+def test_auth_routes_limited_per_ip(limits):
+    controller = AdmissionController(MemoryBucketStore(), pools=())
+    token = create_access_token("7")
+
+    for _ in range(2):
+        assert (
+            asyncio.run(controller.admit(scope("/auth/login", "POST", token))) is None
+        )
+    status, retry_after, _ = asyncio.run(controller.admit(scope("/auth/login", "POST")))
+    assert (status, retry_after) == (429, 2)
+    assert (
+        asyncio.run(controller.admit(scope("/auth/login", "POST", ip="10.0.0.2")))
+        is None
+    )
+    # The user's API bucket is untouched.
+    assert asyncio.run(controller.admit(scope(token=token))) is None
+
+
+def test_shed_on_in_flight(monkeypatch):
+    monkeypatch.setattr(settings, "SHED_MAX_IN_FLIGHT", 2)
+    controller = AdmissionController(MemoryBucketStore(), pools=())
+
+    controller.in_flight = 1
+    assert asyncio.run(controller.admit(scope())) is None
+    controller.in_flight = 2
+    status, retry_after, detail = asyncio.run(controller.admit(scope()))
+    assert (status, retry_after) == (503, settings.SHED_RETRY_AFTER_SECONDS)
+    assert controller.stats()["rejected"]["in_flight"] == 1
+
+
+def test_shed_on_pool_wait(client, monkeypatch):
+    monkeypatch.setattr(PoolMetrics, "recent_wait", lambda self: 2.5)
+
+    response = client.get("/books/")
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == str(settings.SHED_RETRY_AFTER_SECONDS)
+    # Health checks and scrapes still answer.
+    assert client.get("/health").status_code == 200
+    assert client.get("/metrics").status_code == 200
+
+    monkeypatch.setattr(settings, "SHED_POOL_WAIT_SECONDS", 0)
+    assert client.get("/books/").status_code != 503
+
+
+def test_pool_recent_wait_decays(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr("app.db.pool.time.monotonic", lambda: now[0])
+    metrics = PoolMetrics("test")
+
+    for _ in range(20):
+        metrics.observe_wait(2.0)
+    assert metrics.recent_wait() == pytest.approx(2.0, rel=0.02)
+    now[0] += 2.0
+    assert metrics.recent_wait() == pytest.approx(2.0 / math.e, rel=0.02)
+    now[0] += 60.0
+    assert metrics.recent_wait() < 0.001
+
+
+def test_shared_backend_across_controllers(limits):
+    redis = FakeRedis()
+    first = AdmissionController(RedisBucketStore(redis), pools=())
+    second = AdmissionController(RedisBucketStore(redis), pools=())
+    token = create_access_token("7")
+
+    for controller in (first, second, first):
+        assert asyncio.run(controller.admit(scope(token=token))) is None
+    status, _, _ = asyncio.run(second.admit(scope(token=token)))
+    assert status == 429
+    redis.now += 1.0
+    assert asyncio.run(second.admit(scope(token=token))) is None
+
+    first.store.clear()
+    assert redis.hashes == {}
+
+
+def test_backend_failure_admits(limits):
+    controller = AdmissionController(BrokenStore(), pools=())
+    assert asyncio.run(controller.admit(scope())) is None
+    assert controller.stats()["rejected"]["rate"] == 0
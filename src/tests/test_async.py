@@ -0,0 +1,149 @@
+import os
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+pytest.importorskip("asyncpg")
+
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app.api.books_async import router as books_async_router
+from app.api.readers_async import router as readers_async_router
+from app.db.session import get_async_database_url, get_async_db
+
+
+@pytest.fixture(scope="function")
+def async_client(auth_client):
+    # NullPool: TestClient runs each request on its own event loop, and
+    # asyncpg connections cannot move between loops.
+    engine = create_async_engine(
+        get_async_database_url(os.environ["DATABASE_URL"]), poolclass=NullPool
+    )
+    AsyncTestingSessionLocal = async_sessionmaker(engine, expire_on_commit=False)
+
+    async def override_get_async_db():
+        async with AsyncTestingSessionLocal() as db:
+            yield db
+
+    app = FastAPI()
+    app.include_router(books_async_router, prefix="/books")
+    app.include_router(readers_async_router, prefix="/readers")
+    app.dependency_overrides[get_async_db] = override_get_async_db
+
+    with TestClient(app) as c:
+        c.headers.update(auth_client.headers)
+        yield c
+
+
+def test_get_async_database_url():
+    assert (
+        get_async_database_url("postgresql://u:p@localhost/db")
+        == "postgresql+asyncpg://u:p@localhost/db"
+    )
+    assert (
+        get_async_database_url("postgresql+psycopg2://u:p@localhost/db")
+        == "postgresql+asyncpg://u:p@localhost/db"
+    )
+    assert get_async_database_url("sqlite:///./x.db") == "sqlite+aiosqlite:///./x.db"
+
+
+def test_async_requires_auth(async_client):
+    async_client.headers.pop("Authorization")
+    response = async_client.get("/books/")
+    assert response.status_code == 401
+
+
+def test_async_book_crud(async_client):
+    response = async_client.post(
+        "/books/",
+        json={"title": "Async Book", "author": "Author", "isbn": "9780000000001"},
+    )
+    assert response.status_code == 201
+    book_id = response.json()["id"]
+
+    response = async_client.get(f"/books/{book_id}")
+    assert response.status_code == 200
+    assert response.json()["title"] == "Async Book"
+    etag = response.headers["etag"]
+
+    response = async_client.get("/books/isbn/9780000000001")
+    assert response.status_code == 200
+    assert response.json()["id"] == book_id
+
+    response = async_client.put(
+        f"/books/{book_id}", json={"title": "Renamed"}, headers={"If-Match": etag}
+    )
+    assert response.status_code == 200
+    assert response.json()["title"] == "Renamed"
+    assert response.json()["version"] == 2
+
+    response = async_client.put(
+        f"/books/{book_id}", json={"title": "Stale"}, headers={"If-Match": etag}
+    )
+    assert response.status_code == 412
+
+    response = async_client.delete(f"/books/{book_id}")
+    assert response.status_code == 204
+    assert async_client.get(f"/books/{book_id}").status_code == 404
+
+
+def test_async_duplicate_isbn(async_client):
+    book = {"title": "Async Book", "author": "Author", "isbn": "9780000000002"}
+    assert async_client.post("/books/", json=book).status_code == 201
+    response = async_client.post("/books/", json=book)
+    assert response.status_code == 400
+
+
+def test_async_read_books_pages(async_client, db):
+    from app.db.models import Book
+
+    db.add_all(Book(title=f"Book {i}", author="Author") for i in range(5))
+    db.commit()
+
+    response = async_client.get("/books/", params={"limit": 3})
+    assert response.status_code == 200
+    assert [b["title"] for b in response.json()] == ["Book 0", "Book 1", "Book 2"]
+
+    response = async_client.get(
+        "/books/", params={"limit": 3, "cursor": response.headers["x-next-cursor"]}
+    )
+    assert [b["title"] for b in response.json()] == ["Book 3", "Book 4"]
+    assert "x-next-cursor" not in response.headers
+
+    response = async_client.get("/books/", params={"cursor": "garbage"})
+    assert response.status_code == 400
+
+
+def test_async_read_books_fields(async_client, test_book):
+    # description is deferred: serializing it from the instance would fail
+    # with a lazy load outside the greenlet.
+    books = async_client.get("/books/").json()
+    assert books[0]["title"] == test_book.title and "description" not in books[0]
+
+    response = async_client.get("/books/", params={"fields": "id,description"})
+    assert response.json() == [{"id": test_book.id, "description": None}]
+    response = async_client.get("/readers/", params={"fields": "email", "skip": 0})
+    assert response.status_code == 200
+    assert async_client.get("/books/", params={"fields": "x"}).status_code == 400
+
+
+def test_async_reader_crud(async_client, test_reader):
+    response = async_client.get(f"/readers/{test_reader.id}")
+    assert response.status_code == 200
+    assert response.json()["email"] == test_reader.email
+
+    response = async_client.post(
+        "/readers/", json={"name": "Other", "email": test_reader.email}
+    )
+    assert response.status_code == 400
+
+    response = async_client.put(f"/readers/{test_reader.id}", json={"name": "New"})
+    assert response.status_code == 200
+    assert response.json()["name"] == "New"
+
+    response = async_client.get("/readers/")
+    assert [r["name"] for r in response.json()] == ["New"]
+
+    assert async_client.delete(f"/readers/{test_reader.id}").status_code == 204
+    assert async_client.get(f"/readers/{test_reader.id}").status_code == 404
@@ -65,3 +65,153 @@ def test_protected_endpoint(auth_client):
 def test_unprotected_endpoint(client):
     response = client.get("/books/")
     assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+def test_authenticated_requests_reuse_cached_principal(auth_client, monkeypatch):
+    from app.core import security
+
+    assert auth_client.get("/books/").status_code == status.HTTP_200_OK
+    token = auth_client.headers["Authorization"].split()[1]
+    assert security.principal_cache.get(token) is not None
+
+    def fail(token):
+        raise AssertionError("token decoded again")
+
+    monkeypatch.setattr(security, "_decode_token", fail)
+    assert auth_client.get("/books/").status_code == status.HTTP_200_OK
+
+
+def test_deleted_user_loses_access(auth_client, db):
+    from app.crud.user import user as crud_user
+
+    assert auth_client.get("/books/").status_code == status.HTTP_200_OK
+    user = crud_user.get_by_email(db, email="test@example.com")
+    crud_user.remove(db, id=user.id)
+
+    response = auth_client.get("/books/")
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+def test_password_change_drops_cached_principal(auth_client, db):
+    from app.core.password import get_password_hash
+    from app.core.security import principal_cache
+    from app.crud.user import user as crud_user
+
+    assert auth_client.get("/books/").status_code == status.HTTP_200_OK
+    token = auth_client.headers["Authorization"].split()[1]
+    user = crud_user.get_by_email(db, email="test@example.com")
+    crud_user.update_password(
+        db, db_obj=user, hashed_password=get_password_hash("newpassword")
+    )
+    assert principal_cache.get(token) is None
+
+
+def test_principal_cache_never_outlives_token():
+    import time
+    from datetime import datetime
+    from app.core.security import PrincipalCache
+    from app.schemas.user import UserInDB
+
+    cache = PrincipalCache(max_entries=10, ttl=60)
+    user = UserInDB(id=1, email="test@example.com", created_at=datetime.now())
+    cache.put("expired", user, expires_at=time.time() - 1)
+    cache.put("valid", user, expires_at=time.time() + 60)
+    assert cache.get("expired") is None
+    assert cache.get("valid") == user
+
+    cache.invalidate_user(1)
+    assert cache.get("valid") is None
+
+
+def test_login_returns_503_when_hashing_pool_is_full(client, monkeypatch):
+    from app.core.hashing import password_hasher
+
+    client.post(
+        "/auth/register", json={"email": "test@example.com", "password": "testpassword"}
+    )
+    monkeypatch.setattr(password_hasher, "capacity", 0)
+
+    response = client.post(
+        "/auth/login", data={"username": "test@example.com", "password": "testpassword"}
+    )
+    assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+    assert int(response.headers["retry-after"]) >= 1
+
+
+def test_login_rehashes_outdated_cost(client, db):
+    from passlib.context import CryptContext
+    from app.core.config import settings
+    from app.crud.user import user as crud_user
+
+    old_hash = CryptContext(schemes=["bcrypt"], bcrypt__rounds=4).hash("testpassword")
+    crud_user.create(db, email="test@example.com", hashed_password=old_hash)
+
+    response = client.post(
+        "/auth/login", data={"username": "test@example.com", "password": "testpassword"}
+    )
+    assert response.status_code == status.HTTP_200_OK
+
+    db.expire_all()
+    new_hash = crud_user.get_by_email(db, email="test@example.com").hashed_password
+    assert new_hash != old_hash
+    assert new_hash.startswith(f"$2b${settings.PASSWORD_HASH_ROUNDS:02d}$")
+
+
+def test_password_hasher_rejects_beyond_capacity():
+    import asyncio
+    from app.core.hashing import HashingBusy, PasswordHasher, thread_pool
+
+    hasher = PasswordHasher(workers=1, queue_size=0, executor_factory=thread_pool)
+
+    async def storm():
+        return await asyncio.gather(
+            hasher.hash("one"), hasher.hash("two"), return_exceptions=True
+        )
+
+    try:
+        first, second = asyncio.run(storm())
+    finally:
+        hasher.shutdown()
+    assert first.startswith("$2b$")
+    assert isinstance(second, HashingBusy)
+    assert hasher.stats()["rejected"] == 1
+    assert hasher.stats()["pending"] == 0
+
+
+def test_password_hasher_process_pool_roundtrip():
+    import asyncio
+    from app.core.hashing import PasswordHasher
+
+    hasher = PasswordHasher(workers=1, queue_size=1)
+
+    async def roundtrip():
+        hashed = await hasher.hash("secret")
+        return await hasher.verify_and_update("secret", hashed)
+
+    try:
+        assert asyncio.run(roundtrip()) == (True, None)
+    finally:
+        hasher.shutdown()
+
+
+def test_authenticate_async_result_needs_no_queries(db, query_budget):
+    import asyncio
+    from passlib.context import CryptContext
+    from app.crud.user import user as crud_user
+
+    old_hash = CryptContext(schemes=["bcrypt"], bcrypt__rounds=4).hash("testpassword")
+    user_id = crud_user.create(
+        db, email="test@example.com", hashed_password=old_hash
+    ).id
+
+    async def login():
+        user = await crud_user.authenticate_async(
+            db, "test@example.com", "testpassword"
+        )
+        # Read on the event loop, as the route does: must not refresh.
+        with query_budget(0):
+            return user.id, user.email
+
+    # The first login rehashes the outdated hash, the second does not.
+    for _ in range(2):
+        assert asyncio.run(login()) == (user_id, "test@example.com")
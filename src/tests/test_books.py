@@ -1,6 +1,12 @@
+import json
+from datetime import datetime
+
 import pytest
 from fastapi import status
+from app.core.pagination import encode_cursor
+from app.core.profiler import profile_queries
 from app.db.models import Book
+from app.schemas.book import BookRead
 
 
 def test_create_book(auth_client, db):
@@ -104,3 +110,393 @@ def test_delete_book(auth_client, test_book):
 def test_delete_nonexistent_book(auth_client):
     response = auth_client.delete("/books/9999")
     assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+def test_get_books_cursor_pagination(auth_client, db):
+    for title in ["Gamma", "Alpha", "Beta", "Alpha"]:
+        db.add(Book(title=title, author="Author", copies_available=1))
+    db.commit()
+
+    response = auth_client.get("/books/", params={"sort": "title", "limit": 2})
+    assert response.status_code == status.HTTP_200_OK
+    first_page = response.json()
+    assert [b["title"] for b in first_page] == ["Alpha", "Alpha"]
+    assert first_page[0]["id"] < first_page[1]["id"]
+    cursor = response.headers["X-Next-Cursor"]
+
+    response = auth_client.get(
+        "/books/", params={"sort": "title", "limit": 2, "cursor": cursor}
+    )
+    assert response.status_code == status.HTTP_200_OK
+    assert [b["title"] for b in response.json()] == ["Beta", "Gamma"]
+    assert "X-Next-Cursor" not in response.headers
+
+
+def test_get_books_invalid_cursor(auth_client, db):
+    for i in range(2):
+        db.add(Book(title=f"Book {i}", author="Author", copies_available=1))
+    db.commit()
+
+    response = auth_client.get("/books/", params={"cursor": "not-a-cursor"})
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    first_page = auth_client.get("/books/", params={"limit": 1, "sort": "id"})
+    response = auth_client.get(
+        "/books/",
+        params={"sort": "author", "cursor": first_page.headers["X-Next-Cursor"]},
+    )
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    # Well-formed, but with a key that does not fit the sort column.
+    for sort, value, last_id in (
+        ("title", {"a": 1}, 1),
+        ("title", 5, 1),
+        ("title", None, 1),
+        ("id", "1", 1),
+        ("title", "Book 0", True),
+    ):
+        response = auth_client.get(
+            "/books/",
+            params={"sort": sort, "cursor": encode_cursor(sort, value, last_id)},
+        )
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+def test_get_books_legacy_offset(auth_client, db):
+    for i in range(3):
+        db.add(Book(title=f"Book {i}", author="Author", copies_available=1))
+    db.commit()
+
+    response = auth_client.get("/books/", params={"skip": 1, "limit": 10})
+    assert response.status_code == status.HTTP_200_OK
+    assert len(response.json()) == 2
+    assert "X-Next-Cursor" not in response.headers
+
+
+def test_search_books_ranked(auth_client, db):
+    db.add(Book(title="Python Cookbook", author="David Beazley"))
+    db.add(
+        Book(
+            title="Fluent Code",
+            author="Luciano Ramalho",
+            description="Idiomatic Python for experienced developers",
+        )
+    )
+    db.add(Book(title="The Great Gatsby", author="F. Scott Fitzgerald"))
+    db.commit()
+
+    response = auth_client.get("/books/search", params={"q": "python"})
+    assert response.status_code == status.HTTP_200_OK
+    titles = [b["title"] for b in response.json()]
+    assert titles == ["Python Cookbook", "Fluent Code"]
+
+    response = auth_client.get("/books/search", params={"q": "gatsby fitzgerald"})
+    assert [b["title"] for b in response.json()] == ["The Great Gatsby"]
+
+
+def test_search_books_requires_query(auth_client):
+    response = auth_client.get("/books/search")
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
+def test_inverted_index_fallback():
+    from app.core.search import InvertedIndex
+
+    index = InvertedIndex()
+    index.add(1, {"title": "Python Cookbook", "author": "David Beazley"})
+    index.add(2, {"title": "Fluent Code", "description": "Idiomatic Python"})
+    index.add(3, {"title": "Python Crash Course", "author": "Eric Matthes"})
+
+    assert [doc_id for doc_id, _ in index.search("python")] == [1, 3, 2]
+    assert [doc_id for doc_id, _ in index.search("python -crash")] == [1, 2]
+    assert index.search("python missing") == []
+
+    index.remove(1)
+    assert [doc_id for doc_id, _ in index.search("python")] == [3, 2]
+
+
+def test_import_books_csv(auth_client, test_book, db):
+    test_book.isbn = "1111111111"
+    db.commit()
+
+    content = (
+        "title,author,year,isbn,copies_available\n"
+        "First,Author A,2001,2222222222,2\n"
+        "Duplicate In File,Author B,2002,2222222222,1\n"
+        "Existing,Author C,,1111111111,1\n"
+        ",Missing Title,,,1\n"
+        "No Isbn,Author D,,,3\n"
+    )
+    response = auth_client.post(
+        "/books/import",
+        files={"file": ("books.csv", content.encode(), "text/csv")},
+        params={"batch_size": 2},
+    )
+    assert response.status_code == status.HTTP_200_OK
+    report = response.json()
+    assert report["total"] == 5
+    assert report["imported"] == 2
+    assert report["duplicates"] == 2
+    assert report["failed"] == 3
+    assert sorted(error["row"] for error in report["errors"]) == [2, 3, 4]
+
+    titles = {b.title for b in db.query(Book).all()}
+    assert {"First", "No Isbn"} <= titles
+    assert "Duplicate In File" not in titles
+
+
+def test_import_books_reports_constraint_failures(auth_client, db, monkeypatch):
+    from sqlalchemy import text
+    from app.crud.book import book as crud_book
+
+    db.add(Book(title="Taken", author="Author", isbn="4444444444"))
+    db.execute(
+        text(
+            "ALTER TABLE test_schema.books"
+            " ADD CONSTRAINT no_anonymous CHECK (author <> 'Anon')"
+        )
+    )
+    db.commit()
+    # As if another writer inserted the ISBN after the importer looked.
+    monkeypatch.setattr(crud_book, "existing_isbns", lambda db, isbns: set())
+    content = (
+        "title,author,isbn\n"
+        "Clash,Author,4444444444\n"
+        "Nameless,Anon,5555555555\n"
+        "Fine,Author,6666666666\n"
+    )
+    try:
+        response = auth_client.post(
+            "/books/import",
+            files={"file": ("books.csv", content.encode(), "text/csv")},
+        )
+    finally:
+        db.execute(text("ALTER TABLE test_schema.books DROP CONSTRAINT no_anonymous"))
+        db.commit()
+    report = response.json()
+    assert report["imported"] == 1
+    assert report["duplicates"] == 1
+    assert report["errors"][0] == {
+        "row": 1,
+        "isbn": "4444444444",
+        "errors": ["Book with this ISBN already exists"],
+    }
+    assert report["errors"][1]["row"] == 2
+    assert "no_anonymous" in report["errors"][1]["errors"][0]
+
+
+def test_import_books_ndjson(auth_client, db):
+    content = (
+        '{"title": "Json Book", "author": "Author", "isbn": "3333333333"}\n'
+        "\n"
+        "not json\n"
+        '{"title": "Bad Copies", "author": "Author", "copies_available": -1}\n'
+    )
+    response = auth_client.post(
+        "/books/import",
+        files={"file": ("books.ndjson", content.encode(), "application/x-ndjson")},
+    )
+    assert response.status_code == status.HTTP_200_OK
+    report = response.json()
+    assert report["imported"] == 1
+    assert report["failed"] == 2
+    assert [error["row"] for error in report["errors"]] == [3, 4]
+    assert db.query(Book).filter(Book.isbn == "3333333333").count() == 1
+
+
+def test_import_books_rejects_undecodable_rows(auth_client, db):
+    # A Latin-1 row past the first read buffer, between valid UTF-8 rows.
+    good = "".join(f"Book {i},Author,,,1\n" for i in range(600))
+    content = ("title,author,year,isbn,copies_available\n" + good).encode()
+    content += "Café,Auteur,,,1\n".encode("latin-1") + b"Last,Author,,,1\n"
+
+    response = auth_client.post(
+        "/books/import",
+        files={"file": ("books.csv", content, "text/csv")},
+        params={"batch_size": 100},
+    )
+    assert response.status_code == status.HTTP_200_OK
+    report = response.json()
+    assert report["imported"] == 601
+    assert report["errors"] == [
+        {"row": 601, "isbn": None, "errors": ["Row is not valid UTF-8 text"]}
+    ]
+    assert db.query(Book).count() == 601
+
+
+def test_import_books_malformed_rows(auth_client, db):
+    content = (
+        "title,author\n"
+        "First,Author\n"
+        f'"{"x" * 200000}",Author\n'
+        "Nul\0,Author\n"
+        "Last,Author\n"
+    )
+    response = auth_client.post(
+        "/books/import", files={"file": ("books.csv", content.encode(), "text/csv")}
+    )
+    assert response.status_code == status.HTTP_200_OK
+    report = response.json()
+    assert report["imported"] == 2
+    assert [(e["row"], e["errors"][0][:13]) for e in report["errors"]] == [
+        (2, "Malformed CSV"),
+        (3, "Row is not va"),
+    ]
+
+    content = '{"title": "Nul\\u0000", "author": "Author"}\n'
+    response = auth_client.post(
+        "/books/import",
+        files={"file": ("books.ndjson", content.encode(), "application/x-ndjson")},
+    )
+    assert response.json()["errors"][0]["errors"] == ["Row is not valid UTF-8 text"]
+
+
+def test_export_books_ndjson(auth_client, db):
+    for i in range(3):
+        db.add(Book(title=f"Export {i}", author="Author", copies_available=i))
+    db.commit()
+
+    response = auth_client.get("/books/export")
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [row["title"] for row in rows] == ["Export 0", "Export 1", "Export 2"]
+    assert rows[2]["copies_available"] == 2
+
+
+def test_export_books_since_gzip(auth_client, db):
+    db.add(Book(title="Old", author="Author", updated_at=datetime(2020, 1, 1)))
+    db.add(Book(title="Recent", author="Author", updated_at=datetime(2025, 1, 1)))
+    db.commit()
+
+    response = auth_client.get(
+        "/books/export", params={"since": "2024-01-01T00:00:00", "gzip": True}
+    )
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-encoding"] == "gzip"
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [row["title"] for row in rows] == ["Recent"]
+
+
+def test_get_book_by_isbn(auth_client, db):
+    db.add(Book(title="Isbn Book", author="Author", isbn="9780743273565"))
+    db.commit()
+
+    response = auth_client.get("/books/isbn/9780743273565")
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["title"] == "Isbn Book"
+
+    response = auth_client.get("/books/isbn/0000000000")
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+def test_get_book_conditional(auth_client, test_book):
+    response = auth_client.get(f"/books/{test_book.id}")
+    etag = response.headers["ETag"]
+    last_modified = response.headers["Last-Modified"]
+    assert response.json()["version"] == 1
+
+    response = auth_client.get(
+        f"/books/{test_book.id}", headers={"If-None-Match": etag}
+    )
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+    assert response.content == b""
+    assert response.headers["ETag"] == etag
+
+    response = auth_client.get(
+        f"/books/{test_book.id}", headers={"If-Modified-Since": last_modified}
+    )
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+    auth_client.put(f"/books/{test_book.id}", json={"title": "Changed"})
+    response = auth_client.get(
+        f"/books/{test_book.id}", headers={"If-None-Match": etag}
+    )
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["ETag"] != etag
+
+
+def test_get_books_conditional(auth_client, test_book):
+    response = auth_client.get("/books/")
+    etag = response.headers["ETag"]
+    assert etag.startswith('W/"')
+
+    response = auth_client.get("/books/", headers={"If-None-Match": etag})
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+    auth_client.put(f"/books/{test_book.id}", json={"copies_available": 4})
+    response = auth_client.get("/books/", headers={"If-None-Match": etag})
+    assert response.status_code == status.HTTP_200_OK
+
+
+def test_update_book_if_match(auth_client, test_book):
+    etag = auth_client.get(f"/books/{test_book.id}").headers["ETag"]
+
+    response = auth_client.put(
+        f"/books/{test_book.id}", json={"title": "First"}, headers={"If-Match": etag}
+    )
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["ETag"] != etag
+
+    response = auth_client.put(
+        f"/books/{test_book.id}", json={"title": "Second"}, headers={"If-Match": etag}
+    )
+    assert response.status_code == status.HTTP_412_PRECONDITION_FAILED
+    assert auth_client.get(f"/books/{test_book.id}").json()["title"] == "First"
+
+
+def test_get_books_matches_single_book_payload(auth_client, db):
+    auth_client.post(
+        "/books/",
+        json={
+            "title": "Lean Path",
+            "author": "Author",
+            "year": 1999,
+            "isbn": "9780000000011",
+            "description": "Same JSON as the detail endpoint",
+        },
+    )
+    every_field = {"fields": ",".join(BookRead.model_fields)}
+    listed = auth_client.get("/books/", params=every_field).json()
+    assert listed == [auth_client.get(f"/books/{listed[0]['id']}").json()]
+    assert (
+        auth_client.get("/books/", params={"skip": 0, **every_field}).json() == listed
+    )
+
+
+def test_get_books_defers_description(auth_client, test_book):
+    with profile_queries() as profile:
+        books = auth_client.get("/books/").json()
+
+    assert "description" not in books[0]
+    assert books[0]["title"] == test_book.title
+    assert not any("description" in s for s, _, _ in profile.statements)
+
+
+def test_get_books_sparse_fieldset(auth_client, test_book):
+    with profile_queries() as profile:
+        response = auth_client.get(
+            "/books/", params={"fields": "title,id", "sort": "author"}
+        )
+
+    assert response.json() == [{"id": test_book.id, "title": test_book.title}]
+    # The ETag and cursor columns are fetched, nothing else.
+    (select,) = [s for s, _, _ in profile.statements if "books.id" in s]
+    assert "isbn" not in select and "copies_available" not in select
+    assert "books.author" in select
+
+    search = auth_client.get("/books/search", params={"q": "Test", "fields": "id"})
+    assert search.json() == [{"id": test_book.id}]
+
+
+def test_get_books_unknown_field(auth_client):
+    response = auth_client.get("/books/", params={"fields": "title,password"})
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert response.json()["detail"] == "Unknown fields: password"
+    assert auth_client.get("/books/", params={"fields": ","}).status_code == 400
+
+
+def test_get_books_etag_depends_on_fields(auth_client, test_book):
+    full = auth_client.get("/books/")
+    sparse = auth_client.get("/books/", params={"fields": "id"})
+    assert full.headers["ETag"] != sparse.headers["ETag"]
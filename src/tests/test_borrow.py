@@ -115,3 +115,405 @@ def test_get_reader_borrows(auth_client, test_book, test_reader):
 def test_get_nonexistent_reader_borrows(auth_client):
     response = auth_client.get("/borrow/reader/9999")
     assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+def test_borrow_bumps_book_version(auth_client, test_book, test_reader):
+    etag = auth_client.get(f"/books/{test_book.id}").headers["etag"]
+    auth_client.post(
+        "/borrow/", json={"book_id": test_book.id, "reader_id": test_reader.id}
+    )
+
+    response = auth_client.get(f"/books/{test_book.id}")
+    assert response.headers["etag"] != etag
+    assert response.json()["copies_available"] == 0
+
+
+def test_concurrent_borrows_never_oversell(db):
+    from concurrent.futures import ThreadPoolExecutor
+    from app.crud.borrow import NoCopiesAvailable, borrow as crud_borrow
+    from app.schemas.borrow import BorrowCreate
+    from tests.conftest import TestingSessionLocal
+
+    book = Book(title="Hot Book", author="Author", copies_available=5)
+    readers = [Reader(name=f"Reader {i}", email=f"r{i}@example.com") for i in range(20)]
+    db.add(book)
+    db.add_all(readers)
+    db.commit()
+
+    def attempt(reader_id):
+        with TestingSessionLocal() as session:
+            try:
+                crud_borrow.create(
+                    session, obj_in=BorrowCreate(book_id=book.id, reader_id=reader_id)
+                )
+                return True
+            except NoCopiesAvailable:
+                return False
+
+    with ThreadPoolExecutor(max_workers=10) as pool:
+        results = list(pool.map(attempt, [r.id for r in readers]))
+
+    db.refresh(book)
+    assert results.count(True) == 5
+    assert book.copies_available == 0
+    assert book.version == 6
+
+
+@pytest.fixture
+def active_counter(monkeypatch):
+    from app.core.config import settings
+
+    monkeypatch.setattr(settings, "BORROW_ACTIVE_COUNTER", True)
+
+
+def test_borrow_limit_with_active_counter(auth_client, test_reader, db, active_counter):
+    books = [Book(title=f"Book {i}", author="Author") for i in range(4)]
+    db.add_all(books)
+    db.commit()
+
+    borrow_ids = []
+    for book in books[:3]:
+        response = auth_client.post(
+            "/borrow/", json={"book_id": book.id, "reader_id": test_reader.id}
+        )
+        assert response.status_code == status.HTTP_201_CREATED
+        borrow_ids.append(response.json()["id"])
+
+    response = auth_client.post(
+        "/borrow/", json={"book_id": books[3].id, "reader_id": test_reader.id}
+    )
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert "maximum limit" in response.json()["detail"]
+    db.refresh(test_reader)
+    assert test_reader.active_borrows == 3
+
+    auth_client.post(f"/borrow/return/{borrow_ids[0]}")
+    db.refresh(test_reader)
+    assert test_reader.active_borrows == 2
+
+    response = auth_client.post(
+        "/borrow/", json={"book_id": books[3].id, "reader_id": test_reader.id}
+    )
+    assert response.status_code == status.HTTP_201_CREATED
+
+
+def test_failed_borrow_keeps_active_counter(
+    auth_client, test_reader, db, active_counter
+):
+    book = Book(title="Gone", author="Author", copies_available=0)
+    db.add(book)
+    db.commit()
+
+    response = auth_client.post(
+        "/borrow/", json={"book_id": book.id, "reader_id": test_reader.id}
+    )
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    db.refresh(test_reader)
+    assert test_reader.active_borrows == 0
+
+
+def test_concurrent_borrows_by_one_reader_respect_limit(
+    db, test_reader, active_counter
+):
+    from concurrent.futures import ThreadPoolExecutor
+    from app.crud.borrow import BorrowLimitReached, borrow as crud_borrow
+    from app.schemas.borrow import BorrowCreate
+    from tests.conftest import TestingSessionLocal
+
+    books = [Book(title=f"Book {i}", author="Author") for i in range(10)]
+    db.add_all(books)
+    db.commit()
+
+    def attempt(book_id):
+        with TestingSessionLocal() as session:
+            try:
+                crud_borrow.create(
+                    session,
+                    obj_in=BorrowCreate(book_id=book_id, reader_id=test_reader.id),
+                )
+                return True
+            except BorrowLimitReached:
+                return False
+
+    with ThreadPoolExecutor(max_workers=10) as pool:
+        results = list(pool.map(attempt, [b.id for b in books]))
+
+    assert results.count(True) == crud_borrow.MAX_ACTIVE_BORROWS
+    assert crud_borrow.count_active(db, test_reader.id) == 3
+    db.refresh(test_reader)
+    assert test_reader.active_borrows == 3
+
+
+def test_resync_active_borrows(auth_client, test_book, test_reader, db):
+    from app.crud.borrow import borrow as crud_borrow
+
+    auth_client.post(
+        "/borrow/", json={"book_id": test_book.id, "reader_id": test_reader.id}
+    )
+    db.refresh(test_reader)
+    assert test_reader.active_borrows == 0
+
+    assert crud_borrow.resync_active_borrows(db) == 1
+    db.refresh(test_reader)
+    assert test_reader.active_borrows == 1
+
+
+def test_borrow_batch(auth_client, test_reader, db):
+    books = [
+        Book(title="By id", author="Author", copies_available=1),
+        Book(title="By ISBN", author="Author", isbn="9780000000001"),
+        Book(title="Gone", author="Author", copies_available=0),
+    ]
+    db.add_all(books)
+    db.commit()
+
+    response = auth_client.post(
+        "/borrow/batch",
+        json={
+            "reader_id": test_reader.id,
+            "items": [
+                {"book_id": books[0].id},
+                {"isbn": "9780000000001"},
+                {"book_id": books[2].id},
+                {"isbn": "9789999999999"},
+                {"book_id": books[0].id},
+            ],
+        },
+    )
+    assert response.status_code == status.HTTP_200_OK
+    data = response.json()
+    assert data["succeeded"] == 2
+    assert data["failed"] == 3
+    assert [r["status_code"] for r in data["results"]] == [201, 201, 400, 404, 400]
+    assert data["results"][1]["borrow"]["book_id"] == books[1].id
+    assert "No available copies" in data["results"][4]["detail"]
+
+    db.refresh(books[0])
+    assert books[0].copies_available == 0
+    assert books[0].version == 2
+
+
+def test_borrow_batch_respects_limit(auth_client, test_reader, db, active_counter):
+    books = [Book(title=f"Book {i}", author="Author") for i in range(4)]
+    db.add_all(books)
+    db.commit()
+
+    response = auth_client.post(
+        "/borrow/batch",
+        json={
+            "reader_id": test_reader.id,
+            "items": [{"book_id": b.id} for b in books],
+        },
+    )
+    data = response.json()
+    assert [r["status_code"] for r in data["results"]] == [201, 201, 201, 400]
+    assert "maximum limit" in data["results"][3]["detail"]
+    db.refresh(test_reader)
+    assert test_reader.active_borrows == 3
+
+
+def test_borrow_batch_unknown_reader(auth_client, test_book):
+    response = auth_client.post(
+        "/borrow/batch", json={"reader_id": 9999, "items": [{"book_id": test_book.id}]}
+    )
+    assert response.json()["results"][0]["status_code"] == 404
+
+
+def test_borrow_batch_item_needs_one_reference(auth_client, test_reader, test_book):
+    response = auth_client.post(
+        "/borrow/batch",
+        json={
+            "reader_id": test_reader.id,
+            "items": [{"book_id": test_book.id, "isbn": "9780000000001"}],
+        },
+    )
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
+def test_return_batch(auth_client, test_reader, db, active_counter):
+    test_book = Book(
+        title="Two copies", author="Author", isbn="9780000000002", copies_available=2
+    )
+    db.add(test_book)
+    db.commit()
+    borrow_ids = [
+        auth_client.post(
+            "/borrow/", json={"book_id": test_book.id, "reader_id": test_reader.id}
+        ).json()["id"]
+        for _ in range(2)
+    ]
+
+    response = auth_client.post(
+        "/borrow/return/batch",
+        json={
+            "items": [
+                {"isbn": test_book.isbn},
+                {"borrow_id": borrow_ids[0]},
+                {"book_id": test_book.id},
+                {"borrow_id": borrow_ids[0]},
+                {"borrow_id": 9999},
+            ]
+        },
+    )
+    assert response.status_code == status.HTTP_200_OK
+    data = response.json()
+    assert [r["status_code"] for r in data["results"]] == [200, 200, 404, 400, 404]
+    # The explicit id keeps its loan; the ISBN item takes the other one.
+    assert data["results"][0]["borrow"]["id"] == borrow_ids[1]
+    assert data["results"][1]["borrow"]["return_date"] is not None
+
+    db.refresh(test_book)
+    db.refresh(test_reader)
+    assert test_book.copies_available == 2
+    assert test_reader.active_borrows == 0
+
+
+def _book_lockable_while_reader_held(db, book, reader, call):
+    # Holds the reader row the way a batch does, runs call in another
+    # session and checks the book row is still free once call is waiting:
+    # a single-item statement that locked the book first would deadlock
+    # against a batch that goes on to lock it.
+    import threading
+    import time
+    from sqlalchemy import select, text
+    from sqlalchemy.exc import OperationalError
+    from app.crud.borrow import books, readers
+    from tests.conftest import TestingSessionLocal
+
+    with TestingSessionLocal() as holder, TestingSessionLocal() as probe:
+        holder.execute(
+            select(readers.c.id)
+            .where(readers.c.id == reader.id)
+            .with_for_update(key_share=True)
+        )
+        worker = threading.Thread(target=call)
+        worker.start()
+        for _ in range(100):
+            waiting = db.scalar(
+                text(
+                    "SELECT count(*) FROM pg_stat_activity"
+                    " WHERE wait_event_type = 'Lock' AND datname = current_database()"
+                )
+            )
+            db.rollback()
+            if waiting:
+                break
+            time.sleep(0.05)
+        try:
+            probe.execute(
+                select(books.c.id)
+                .where(books.c.id == book.id)
+                .with_for_update(key_share=True, nowait=True)
+            )
+            free = True
+        except OperationalError:
+            free = False
+        probe.rollback()
+        holder.rollback()
+        worker.join()
+    return free
+
+
+def test_single_borrow_locks_reader_before_book(
+    db, test_book, test_reader, active_counter
+):
+    from app.crud.borrow import borrow as crud_borrow
+    from app.schemas.borrow import BorrowCreate
+    from tests.conftest import TestingSessionLocal
+
+    def borrow():
+        with TestingSessionLocal() as session:
+            crud_borrow.create(
+                session,
+                obj_in=BorrowCreate(book_id=test_book.id, reader_id=test_reader.id),
+            )
+
+    assert _book_lockable_while_reader_held(db, test_book, test_reader, borrow)
+    assert crud_borrow.count_active(db, test_reader.id) == 1
+
+    loan_id = crud_borrow.get_active_by_reader(db, test_reader.id)[0].id
+
+    def give_back():
+        with TestingSessionLocal() as session:
+            crud_borrow.return_book(session, id=loan_id)
+
+    assert _book_lockable_while_reader_held(db, test_book, test_reader, give_back)
+    db.refresh(test_reader)
+    db.refresh(test_book)
+    assert test_reader.active_borrows == 0
+    assert test_book.copies_available == 1
+
+
+def _seed_history(db, reader, count):
+    from datetime import timedelta
+    from app.db.models import BorrowedBook
+
+    book = Book(title="History Book", author="Author", isbn="9780000000003")
+    db.add(book)
+    db.commit()
+    start = datetime(2025, 1, 1)
+    loans = [
+        BorrowedBook(
+            book_id=book.id,
+            reader_id=reader.id,
+            borrow_date=start + timedelta(days=i),
+            return_date=start + timedelta(days=i, hours=5) if i % 2 else None,
+        )
+        for i in range(count)
+    ]
+    db.add_all(loans)
+    db.commit()
+    return book, loans
+
+
+def test_reader_history_pages(auth_client, test_reader, db):
+    book, loans = _seed_history(db, test_reader, 5)
+
+    seen = []
+    cursor = None
+    while True:
+        params = {"limit": 2}
+        if cursor:
+            params["cursor"] = cursor
+        response = auth_client.get(
+            f"/borrow/reader/{test_reader.id}/history", params=params
+        )
+        assert response.status_code == status.HTTP_200_OK
+        seen.extend(response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+
+    assert [b["id"] for b in seen] == [l.id for l in reversed(loans)]
+    assert seen[0]["book"] == {
+        "id": book.id,
+        "title": "History Book",
+        "author": "Author",
+        "year": None,
+        "isbn": "9780000000003",
+    }
+    assert any(b["return_date"] for b in seen)
+
+
+def test_reader_history_filters(auth_client, test_reader, db):
+    _, loans = _seed_history(db, test_reader, 5)
+
+    response = auth_client.get(
+        f"/borrow/reader/{test_reader.id}/history",
+        params={
+            "since": "2025-01-02T00:00:00Z",
+            "until": "2025-01-05T00:00:00Z",
+            "status": "returned",
+        },
+    )
+    assert [b["id"] for b in response.json()] == [loans[3].id, loans[1].id]
+
+
+def test_reader_history_errors(auth_client, test_reader):
+    response = auth_client.get("/borrow/reader/9999/history")
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    response = auth_client.get(
+        f"/borrow/reader/{test_reader.id}/history", params={"cursor": "bogus"}
+    )
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
@@ -0,0 +1,175 @@
+import asyncio
+
+import pytest
+from fastapi import status
+
+from app.core.cache import EntityCache, MemoryCache, RedisCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeRedisClient:
+    def __init__(self, clock):
+        self.clock = clock
+        self.data = {}
+
+    def get(self, key):
+        value, expires_at = self.data.get(key, (None, None))
+        if value is not None and expires_at <= self.clock():
+            del self.data[key]
+            return None
+        return value
+
+    def set(self, key, value, ex=None):
+        self.data[key] = (value, self.clock() + ex)
+
+    def delete(self, *keys):
+        for key in keys:
+            self.data.pop(key, None)
+
+    def incr(self, key):
+        value = int(self.get(key) or 0) + 1
+        self.data[key] = (str(value).encode(), float("inf"))
+        return value
+
+    def expire(self, key, seconds):
+        self.data[key] = (self.data[key][0], self.clock() + seconds)
+
+    def eval(self, script, numkeys, key, generation_key, value, generation, ttl):
+        # SET_SCRIPT's logic in Python.
+        if (self.get(generation_key) or b"0") != str(generation).encode():
+            return 0
+        self.set(key, value, ex=ttl)
+        return 1
+
+    def scan_iter(self, match):
+        prefix = match.rstrip("*")
+        return [key for key in self.data if key.startswith(prefix)]
+
+
+def test_memory_cache_lru_eviction():
+    cache = MemoryCache(max_entries=2)
+    cache.set("a", b"1", ttl=60)
+    cache.set("b", b"2", ttl=60)
+    assert cache.get("a") == b"1"
+
+    cache.set("c", b"3", ttl=60)
+    assert cache.get("b") is None
+    assert cache.get("a") == b"1"
+    assert cache.stats()["evictions"] == 1
+
+
+def test_memory_cache_ttl_expiry():
+    clock = FakeClock()
+    cache = MemoryCache(clock=clock)
+    cache.set("a", b"1", ttl=10)
+    clock.now = 9
+    assert cache.get("a") == b"1"
+    clock.now = 10
+    assert cache.get("a") is None
+    assert cache.stats()["expirations"] == 1
+
+
+def test_entity_cache_read_through_with_shared_backend():
+    clock = FakeClock()
+    cache = EntityCache(RedisCache(FakeRedisClient(clock)), ttl=30)
+    loads = []
+
+    def loader():
+        loads.append(1)
+        return b"payload"
+
+    assert cache.get_or_load("book:1", loader) == b"payload"
+    assert cache.get_or_load("book:1", loader) == b"payload"
+    assert len(loads) == 1
+
+    cache.invalidate("book:1")
+    assert cache.get_or_load("book:1", loader) == b"payload"
+    assert len(loads) == 2
+
+    clock.now = 31
+    cache.get_or_load("book:1", loader)
+    assert len(loads) == 3
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 3
+
+
+@pytest.mark.parametrize("shared", [False, True])
+def test_entity_cache_drops_load_that_raced_a_write(shared):
+    backend = RedisCache(FakeRedisClient(FakeClock())) if shared else MemoryCache()
+    cache = EntityCache(backend, ttl=30)
+    version = [1]
+
+    def loader():
+        payload = b"v%d" % version[0]
+        # A writer commits and invalidates while this load is in flight.
+        version[0] += 1
+        cache.invalidate("book:1")
+        return payload
+
+    assert cache.get_or_load("book:1", loader) == b"v1"
+    assert cache.get_or_load("book:1", lambda: b"v%d" % version[0]) == b"v2"
+    assert cache.get_or_load("book:1", loader) == b"v2"
+    assert cache.stats()["stale_writes"] == 1
+
+
+def test_entity_cache_async_drops_load_that_raced_a_write():
+    cache = EntityCache(MemoryCache(), ttl=30)
+
+    async def loader():
+        cache.invalidate("book:1")
+        return b"old"
+
+    assert asyncio.run(cache.aget_or_load("book:1", loader)) == b"old"
+    assert cache.backend.get("book:1") is None
+
+
+def test_memory_cache_forgotten_generations_stay_safe():
+    cache = MemoryCache(max_entries=2)
+    generation = cache.generation("a")
+    cache.delete("a", "b", "c")
+    assert cache.set("a", b"stale", 60, generation) is False
+    assert cache.set("a", b"fresh", 60, cache.generation("a")) is True
+
+
+def test_entity_cache_skips_missing_rows():
+    cache = EntityCache(MemoryCache(), ttl=30)
+    assert cache.get_or_load("book:404", lambda: None) is None
+    assert cache.stats()["size"] == 0
+
+
+def test_cached_book_invalidated_on_borrow(auth_client, test_book, test_reader):
+    response = auth_client.get(f"/books/{test_book.id}")
+    assert response.json()["copies_available"] == 1
+
+    auth_client.post(
+        "/borrow/", json={"book_id": test_book.id, "reader_id": test_reader.id}
+    )
+    response = auth_client.get(f"/books/{test_book.id}")
+    assert response.json()["copies_available"] == 0
+
+
+def test_cached_reader_invalidated_on_update(auth_client, test_reader):
+    auth_client.get(f"/readers/{test_reader.id}")
+    auth_client.put(f"/readers/{test_reader.id}", json={"name": "Renamed"})
+
+    response = auth_client.get(f"/readers/{test_reader.id}")
+    assert response.json()["name"] == "Renamed"
+
+
+def test_cache_stats_endpoint(auth_client, test_book):
+    auth_client.get(f"/books/{test_book.id}")
+    auth_client.get(f"/books/{test_book.id}")
+
+    response = auth_client.get("/admin/cache")
+    assert response.status_code == status.HTTP_200_OK
+    stats = response.json()
+    assert stats["backend"] == "memory"
+    assert stats["hits"] >= 1
+    assert stats["misses"] >= 1
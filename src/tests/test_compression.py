@@ -0,0 +1,169 @@
+import asyncio
+import zlib
+
+import pytest
+
+from app.core import compression
+from app.core.compression import CompressionMiddleware, load_encoders, negotiate
+from app.db.models import Book
+
+
+@pytest.fixture
+def many_books(db):
+    db.add_all(
+        Book(title=f"Book {i}", author="Author", description="x" * 200)
+        for i in range(50)
+    )
+    db.commit()
+
+
+def test_negotiate_by_quality_then_server_order():
+    offered = ["zstd", "br", "gzip"]
+    assert negotiate("gzip, br", offered) == "br"
+    assert negotiate("gzip;q=1.0, br;q=0.5", offered) == "gzip"
+    assert negotiate("*", offered) == "zstd"
+    assert negotiate("*, zstd;q=0", offered) == "br"
+    assert negotiate("gzip;q=0, identity", offered) is None
+    assert negotiate("", offered) is None
+    assert negotiate("GZIP;Q=0.8", ["gzip"]) == "gzip"
+
+
+def test_load_encoders_skips_missing_packages(monkeypatch):
+    monkeypatch.setattr(compression, "brotli", None)
+    monkeypatch.setattr(compression, "zstandard", None)
+    assert list(load_encoders("zstd, br, gzip, lzma")) == ["gzip"]
+    assert load_encoders("") == {}
+
+
+def test_list_is_compressed(auth_client, many_books):
+    params = {"fields": "id,title,description"}
+    plain = auth_client.get("/books/", params=params, headers={"Accept-Encoding": ""})
+    assert "content-encoding" not in plain.headers
+
+    response = auth_client.get(
+        "/books/", params=params, headers={"Accept-Encoding": "gzip"}
+    )
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert int(response.headers["content-length"]) < len(plain.content) / 10
+    assert response.json() == plain.json()
+    assert response.headers["etag"] == plain.headers["etag"][:-1] + '-gzip"'
+
+    revalidated = auth_client.get(
+        "/books/",
+        params=params,
+        headers={"Accept-Encoding": "gzip", "If-None-Match": response.headers["etag"]},
+    )
+    assert revalidated.status_code == 304
+    assert revalidated.headers["etag"] == response.headers["etag"]
+    # The gzip tag still validates the identity body, and the other way round.
+    revalidated = auth_client.get(
+        "/books/",
+        params=params,
+        headers={"Accept-Encoding": "", "If-None-Match": response.headers["etag"]},
+    )
+    assert revalidated.status_code == 304
+    assert revalidated.headers["etag"] == plain.headers["etag"]
+
+
+def test_conditionals_ignore_encoding_suffix():
+    from fastapi import HTTPException, Request
+
+    from app.core.conditional import check_if_match, encoded_etag, is_not_modified
+
+    def request(**headers):
+        raw = [(k.replace("_", "-").encode(), v.encode()) for k, v in headers.items()]
+        return Request({"type": "http", "headers": raw})
+
+    assert encoded_etag('"12.3"', "br") == '"12.3-br"'
+    assert encoded_etag('W/"abc"', "zstd") == 'W/"abc-zstd"'
+    check_if_match(request(if_match='"12.3-gzip"'), '"12.3"')
+    check_if_match(request(if_match='"12.3"'), '"12.3"')
+    assert is_not_modified(request(if_none_match='W/"12.3-br"'), '"12.3"')
+    for stale in ('"12.2-gzip"', 'W/"12.3-gzip"'):
+        with pytest.raises(HTTPException):
+            check_if_match(request(if_match=stale), '"12.3"')
+
+
+def test_small_responses_are_not_compressed(auth_client):
+    response = auth_client.get("/health", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in response.headers
+    assert response.headers["vary"] == "Accept-Encoding"
+
+
+def test_export_is_compressed_as_a_stream(auth_client, many_books):
+    response = auth_client.get("/books/export", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert "content-length" not in response.headers
+    assert len(response.text.splitlines()) == 50
+
+    # Already encoded by the route: passed through, not gzipped twice.
+    response = auth_client.get(
+        "/books/export", params={"gzip": True}, headers={"Accept-Encoding": "gzip"}
+    )
+    assert len(response.text.splitlines()) == 50
+
+
+def stream_decoder(name):
+    # decompress(piece) -> bytes, fed one body piece by piece.
+    if name == "br":
+        return pytest.importorskip("brotli").Decompressor().process
+    if name == "zstd":
+        zstandard = pytest.importorskip("zstandard")
+        return zstandard.ZstdDecompressor().decompressobj().decompress
+    return zlib.decompressobj(16 + zlib.MAX_WBITS).decompress
+
+
+@pytest.mark.parametrize("name", ["gzip", "br", "zstd"])
+def test_encoders_round_trip(name):
+    stream_decoder(name)
+    chunks = [b'{"id": %d, "title": "Round trip"}\n' % i * 20 for i in range(5)]
+    body = b"".join(chunks)
+
+    whole = load_encoders(name)[name]().encode(body)
+    assert len(whole) < len(body)
+    assert stream_decoder(name)(whole) == body
+
+    encoder = load_encoders(name)[name]()
+    decoder = stream_decoder(name)
+    for chunk in chunks:
+        assert decoder(encoder.compress(chunk)) == chunk
+    assert decoder(encoder.finish()) == b""
+
+
+@pytest.mark.parametrize("name", ["gzip", "br", "zstd"])
+def test_streamed_chunks_are_flushed_one_by_one(name):
+    decoder = stream_decoder(name)
+    chunks = [b'{"id": %d, "title": "Streamed"}\n' % i for i in range(3)]
+
+    async def app(scope, receive, send):
+        headers = [(b"content-type", b"application/x-ndjson")]
+        await send({"type": "http.response.start", "status": 200, "headers": headers})
+        for chunk in chunks:
+            await send({"type": "http.response.body", "body": chunk, "more_body": True})
+        await send({"type": "http.response.body", "body": b""})
+
+    sent = []
+
+    async def send(message):
+        sent.append(message)
+
+    async def call():
+        scope = {
+            "type": "http",
+            "method": "GET",
+            "headers": [(b"accept-encoding", name.encode())],
+        }
+        await CompressionMiddleware(app, encodings=name, min_size=1000)(
+            scope, None, send
+        )
+
+    asyncio.run(call())
+    assert dict(sent[0]["headers"])[b"content-encoding"] == name.encode()
+    bodies = [m["body"] for m in sent[1:]]
+    assert len(bodies) == 4 and not sent[-1]["more_body"]
+
+    # Every chunk decodes as soon as it arrives.
+    for chunk, body in zip(chunks, bodies):
+        assert decoder(body) == chunk
+    assert stream_decoder(name)(b"".join(bodies)) == b"".join(chunks)
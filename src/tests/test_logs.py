@@ -0,0 +1,108 @@
+import io
+import json
+import logging
+import queue
+import threading
+
+from app.core.config import settings
+from app.core.logs import (
+    JsonFormatter,
+    LazyQueueHandler,
+    LogPipeline,
+    SamplingFilter,
+    parse_rates,
+)
+
+
+def record(name="app.crud.borrow", level=logging.INFO, msg="Book borrowed", *args):
+    return logging.LogRecord(name, level, __file__, 1, msg, args, None)
+
+
+def test_json_formatter_includes_extras_and_traceback():
+    try:
+        raise ValueError("boom")
+    except ValueError as e:
+        entry = logging.LogRecord(
+            "app.api.books", logging.ERROR, __file__, 1, "Failed: %s", (e,), None
+        )
+        entry.exc_info = (type(e), e, e.__traceback__)
+    entry.book_id = 7
+
+    line = json.loads(JsonFormatter().format(entry))
+    assert line["level"] == "ERROR" and line["logger"] == "app.api.books"
+    assert line["message"] == "Failed: boom"
+    assert line["book_id"] == 7
+    assert "ValueError: boom" in line["exc_info"]
+    assert line["time"].endswith("+00:00")
+
+
+def test_parse_rates_skips_garbage():
+    assert parse_rates("app.crud.borrow=0.1, app.api=2,bad=x,,") == {
+        "app.crud.borrow": 0.1,
+        "app.api": 1.0,
+    }
+
+
+def test_sampling_filter_uses_most_specific_logger():
+    draws = iter([0.05, 0.5, 0.5])
+    sampler = SamplingFilter(
+        {"app": 1.0, "app.crud": 0.1, "app.crud.user": 0.0}, random=lambda: next(draws)
+    )
+
+    kept = record("app.crud.borrow")
+    assert sampler.filter(kept) and kept.sample_rate == 0.1
+    assert not sampler.filter(record("app.crud.book"))
+    assert not sampler.filter(record("app.crud.user"))
+    assert sampler.filter(record("app.api.books"))
+    # Warnings are never sampled, and never draw.
+    assert sampler.filter(record("app.crud.book", logging.WARNING))
+    assert next(draws, None) is None
+
+
+def test_queue_handler_defers_formatting_and_drops_when_full():
+    class Probe:
+        thread = None
+
+        def __str__(self):
+            Probe.thread = threading.current_thread()
+            return "probe"
+
+    records = queue.SimpleQueue()
+    handler = LazyQueueHandler(records, capacity=1)
+    handler.handle(record("app.api.books", logging.INFO, "Value %s", Probe()))
+    handler.handle(record())
+
+    assert Probe.thread is None
+    assert handler.dropped == 1
+    assert records.get_nowait().getMessage() == "Value probe"
+
+
+def test_pipeline_writes_json_from_listener_thread(monkeypatch):
+    monkeypatch.setattr(settings, "LOG_SAMPLING", "tests.sampled=0")
+    stream = io.StringIO()
+    pipeline = LogPipeline()
+    pipeline.start(stream)
+    try:
+        logging.getLogger("tests.kept").info("Read %s books", 3)
+        logging.getLogger("tests.sampled").info("Dropped by sampling")
+        logging.getLogger("tests.sampled").warning("Kept: warnings are not sampled")
+    finally:
+        pipeline.stop()
+
+    lines = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert [line["message"] for line in lines] == [
+        "Read 3 books",
+        "Kept: warnings are not sampled",
+    ]
+    assert pipeline.handler not in logging.getLogger().handlers
+    assert logging._srcfile is not None and logging.logThreads
+
+
+def test_pipeline_text_format(monkeypatch):
+    monkeypatch.setattr(settings, "LOG_FORMAT", "text")
+    stream = io.StringIO()
+    pipeline = LogPipeline()
+    pipeline.start(stream)
+    logging.getLogger("tests.text").warning("Plain %s", "line")
+    pipeline.stop()
+    assert stream.getvalue().rstrip().endswith("WARNING tests.text: Plain line")
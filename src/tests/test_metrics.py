@@ -0,0 +1,84 @@
+import asyncio
+
+import pytest
+
+from app.core.metrics import MetricsMiddleware, RequestMetrics, request_metrics
+from app.core.profiler import current_profile
+
+
+@pytest.fixture
+def metrics():
+    request_metrics.reset()
+    yield request_metrics
+    request_metrics.reset()
+
+
+def samples(text):
+    result = {}
+    for line in text.splitlines():
+        if line and not line.startswith("#"):
+            name, value = line.rsplit(" ", 1)
+            result[name] = float(value)
+    return result
+
+
+def test_metrics_by_route_template_and_status(auth_client, test_book, metrics):
+    auth_client.get(f"/books/{test_book.id}")
+    auth_client.get(f"/books/{test_book.id}")
+    auth_client.get("/books/999999")
+    auth_client.get("/no/such/path")
+
+    response = auth_client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    values = samples(response.text)
+
+    route = 'method="GET",route="/books/{book_id}"'
+    assert values[f'library_http_requests_total{{{route},status="200"}}'] == 2
+    assert values[f'library_http_requests_total{{{route},status="404"}}'] == 1
+    assert values[f"library_http_request_duration_seconds_count{{{route}}}"] == 3
+    assert (
+        values[f'library_http_request_duration_seconds_bucket{{{route},le="+Inf"}}']
+        == 3
+    )
+    assert (
+        values[
+            'library_http_requests_total{method="GET",route="<unmatched>",'
+            'status="404"}'
+        ]
+        == 1
+    )
+    # The scrape itself is in flight while it renders.
+    assert values["library_http_requests_in_flight"] == 1
+    assert 'library_db_pool_checked_out{pool="sync"}' in values
+
+
+def test_metrics_count_database_queries(auth_client, metrics):
+    auth_client.get("/books/")
+    auth_client.get("/")
+
+    values = samples(auth_client.get("/metrics").text)
+    books = 'method="GET",route="/books/"'
+    assert values[f"library_http_request_db_queries_sum{{{books}}}"] >= 1
+    assert values[f"library_http_request_db_seconds_total{{{books}}}"] > 0
+    root = 'method="GET",route="/"'
+    assert values[f"library_http_request_db_queries_sum{{{root}}}"] == 0
+    assert values[f'library_http_request_db_queries_bucket{{{root},le="0"}}'] == 1
+
+
+def test_middleware_records_unhandled_errors_as_500():
+    metrics = RequestMetrics()
+
+    async def broken(scope, receive, send):
+        assert current_profile.get() is not None
+        raise RuntimeError("boom")
+
+    async def call():
+        scope = {"type": "http", "method": "POST", "path": "/x"}
+        await MetricsMiddleware(broken, metrics)(scope, None, None)
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(call())
+    assert metrics.in_flight == 0
+    assert metrics.routes[("POST", "<unmatched>")].statuses == {500: 1}
+    assert current_profile.get() is None
@@ -0,0 +1,144 @@
+from datetime import date, datetime
+import gzip
+import json
+
+from sqlalchemy import text
+
+from app.db.models import BorrowedBook
+from app.db.partitions import (
+    archive_partitions,
+    create_partition,
+    ensure_partitions,
+    is_partitioned,
+    list_partitions,
+    partition_name,
+)
+from tests.conftest import engine
+
+
+def test_borrowed_books_is_partitioned(auth_client, test_book, test_reader, db):
+    with engine.begin() as conn:
+        assert is_partitioned(conn)
+        created = ensure_partitions(conn, months_ahead=1)
+        assert created == []
+        created = ensure_partitions(conn, months_ahead=1, today=date(2031, 11, 5))
+        assert created == ["borrowed_books_p2031_11", "borrowed_books_p2031_12"]
+        assert set(created) <= set(list_partitions(conn))
+
+    # The ORM keeps working against the partitioned table.
+    response = auth_client.post(
+        "/borrow/", json={"book_id": test_book.id, "reader_id": test_reader.id}
+    )
+    borrow_id = response.json()["id"]
+    assert db.get(BorrowedBook, borrow_id).book_id == test_book.id
+    response = auth_client.post(f"/borrow/return/{borrow_id}")
+    assert response.json()["return_date"] is not None
+
+
+def test_new_partition_takes_rows_from_default(test_book, test_reader, db):
+    # Written after the partition window ran out: lands in the default.
+    db.add(
+        BorrowedBook(
+            book_id=test_book.id,
+            reader_id=test_reader.id,
+            borrow_date=datetime(2033, 3, 10),
+        )
+    )
+    db.commit()
+
+    try:
+        with engine.begin() as conn:
+            created = ensure_partitions(conn, months_ahead=0, today=date(2033, 3, 5))
+            assert created == ["borrowed_books_p2033_03"]
+            placement = conn.execute(
+                text(
+                    "SELECT tableoid::regclass::text, count(*) "
+                    "FROM test_schema.borrowed_books GROUP BY 1"
+                )
+            ).all()
+            assert placement == [("borrowed_books_p2033_03", 1)]
+            assert "borrowed_books_default" in list_partitions(conn)
+        assert db.query(BorrowedBook).count() == 1
+    finally:
+        db.rollback()
+        with engine.begin() as conn:
+            conn.execute(
+                text("DROP TABLE IF EXISTS test_schema.borrowed_books_p2033_03")
+            )
+
+
+def _old_loans(db, book, reader):
+    with engine.begin() as conn:
+        for month in (1, 2):
+            create_partition(conn, date(2020, month, 1))
+    db.add_all(
+        [
+            BorrowedBook(
+                book_id=book.id,
+                reader_id=reader.id,
+                borrow_date=datetime(2020, 1, 10),
+                return_date=datetime(2020, 1, 20),
+            ),
+            BorrowedBook(
+                book_id=book.id,
+                reader_id=reader.id,
+                borrow_date=datetime(2020, 2, 10),
+            ),
+        ]
+    )
+    db.commit()
+
+
+def test_archive_detaches_closed_partitions(test_book, test_reader, db):
+    _old_loans(db, test_book, test_reader)
+
+    try:
+        with engine.begin() as conn:
+            report = archive_partitions(
+                conn, before=date(2020, 3, 1), archive_schema="test_archive"
+            )
+            assert report == [
+                {
+                    "partition": "borrowed_books_p2020_01",
+                    "action": "detached",
+                    "schema": "test_archive",
+                },
+                {
+                    "partition": "borrowed_books_p2020_02",
+                    "action": "skipped",
+                    "open_loans": 1,
+                },
+            ]
+            assert partition_name(date(2020, 1, 1)) not in list_partitions(conn)
+            archived = conn.scalar(
+                text("SELECT count(*) FROM test_archive.borrowed_books_p2020_01")
+            )
+            assert archived == 1
+            remaining = conn.scalar(
+                text("SELECT count(*) FROM test_schema.borrowed_books")
+            )
+            assert remaining == 1
+    finally:
+        with engine.begin() as conn:
+            conn.execute(text("DROP SCHEMA IF EXISTS test_archive CASCADE"))
+            conn.execute(
+                text("DROP TABLE IF EXISTS test_schema.borrowed_books_p2020_02")
+            )
+
+
+def test_archive_exports_partitions(test_book, test_reader, db, tmp_path):
+    _old_loans(db, test_book, test_reader)
+    db.query(BorrowedBook).update({"return_date": datetime(2020, 3, 1)})
+    db.commit()
+
+    with engine.begin() as conn:
+        report = archive_partitions(
+            conn, before=date(2020, 3, 1), archive_schema="unused", export_dir=tmp_path
+        )
+    assert [entry["action"] for entry in report] == ["exported", "exported"]
+
+    with gzip.open(tmp_path / "borrowed_books_p2020_02.ndjson.gz") as stream:
+        rows = [json.loads(line) for line in stream]
+    assert len(rows) == 1
+    assert rows[0]["borrow_date"].startswith("2020-02-10")
+    assert db.query(BorrowedBook).count() == 0
@@ -0,0 +1,82 @@
+import os
+
+import pytest
+from sqlalchemy import create_engine, exc, text
+from sqlalchemy.pool import QueuePool
+
+from app.db.pool import PoolMetrics, timed_pool
+from app.db.session import engine as app_engine
+
+
+@pytest.fixture
+def small_pool():
+    metrics = PoolMetrics("test")
+    engine = create_engine(
+        os.environ["DATABASE_URL"],
+        poolclass=timed_pool(QueuePool, metrics),
+        pool_size=1,
+        max_overflow=1,
+        pool_timeout=0.05,
+    )
+    metrics.instrument(engine)
+    yield engine, metrics
+    engine.dispose()
+
+
+def test_pool_metrics_track_checkouts_and_timeouts(small_pool):
+    engine, metrics = small_pool
+
+    first = engine.connect()
+    second = engine.connect()
+    stats = metrics.stats()
+    assert stats["checked_out"] == 2
+    assert stats["overflow"] == 1
+    assert stats["overflow_peak"] == 1
+
+    with pytest.raises(exc.TimeoutError):
+        engine.connect()
+    first.close()
+    second.close()
+
+    stats = metrics.stats()
+    assert stats["checked_out"] == 0
+    assert stats["connects"] == 2
+    assert stats["checkouts"] == 2
+    assert stats["checkins"] == 2
+    assert stats["timeouts"] == 1
+    wait = stats["wait_seconds"]
+    assert wait["count"] == 3
+    assert wait["max"] >= 0.05
+    assert wait["buckets"]["+Inf"] == 3
+    assert wait["buckets"]["0.01"] >= 2
+
+
+def test_pool_metrics_count_invalidations(small_pool):
+    engine, metrics = small_pool
+
+    with engine.connect() as conn:
+        conn.invalidate()
+    engine.dispose()
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+
+    stats = metrics.stats()
+    assert stats["invalidations"] == 1
+    assert stats["connects"] == 2
+    # The recreated pool keeps the timing subclass.
+    assert stats["wait_seconds"]["count"] == 2
+
+
+def test_admin_pool_endpoint(auth_client):
+    from app.core.config import settings
+
+    with app_engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+
+    response = auth_client.get("/admin/pool")
+    assert response.status_code == 200
+    sync = response.json()["sync"]
+    assert sync["size"] == settings.DB_POOL_SIZE
+    assert sync["max_overflow"] == settings.DB_MAX_OVERFLOW
+    assert sync["checkouts"] >= 1
+    assert sync["checked_out"] == 0
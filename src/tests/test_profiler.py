@@ -0,0 +1,142 @@
+import logging
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from app.core.config import settings
+from app.core.profiler import QueryProfile, report_repeated
+from tests.conftest import engine
+
+
+@pytest.fixture
+def warm_client(auth_client):
+    # The first authenticated request looks the user up; later ones hit the
+    # principal cache, so budgets below count only the endpoint's queries.
+    auth_client.get("/")
+    auth_client.get("/books/")
+    return auth_client
+
+
+def test_catalog_query_budgets(warm_client, test_book, query_budget):
+    book_url = f"/books/{test_book.id}"
+
+    with query_budget(1):
+        assert warm_client.get(book_url).status_code == 200
+    with query_budget(0):
+        assert warm_client.get(book_url).status_code == 200
+    with query_budget(1):
+        assert warm_client.get("/books/").status_code == 200
+    with query_budget(1):
+        assert warm_client.get("/readers/").status_code == 200
+
+
+def test_borrow_query_budgets(warm_client, test_book, test_reader, query_budget):
+    borrow = {"book_id": test_book.id, "reader_id": test_reader.id}
+    history_url = f"/borrow/reader/{test_reader.id}/history"
+
+    with query_budget(1):
+        response = warm_client.post("/borrow/", json=borrow)
+    assert response.status_code == 201
+    return_url = f"/borrow/return/{response.json()['id']}"
+
+    with query_budget(2):
+        assert warm_client.get(history_url).status_code == 200
+    with query_budget(1):
+        assert warm_client.post(return_url).status_code == 200
+
+
+def test_batch_borrow_does_not_query_per_item(warm_client, test_reader, query_budget):
+    ids = []
+    for i in range(3):
+        response = warm_client.post("/books/", json={"title": f"B{i}", "author": "A"})
+        ids.append(response.json()["id"])
+    payload = {
+        "reader_id": test_reader.id,
+        "items": [{"book_id": book_id} for book_id in ids],
+    }
+
+    with query_budget(6, max_repeats=1):
+        response = warm_client.post("/borrow/batch", json=payload)
+    assert response.json()["succeeded"] == 3
+
+
+def test_query_budget_fails_when_exceeded(query_budget):
+    with pytest.raises(AssertionError, match="Query budget 1 exceeded"):
+        with query_budget(1):
+            with engine.connect() as conn:
+                conn.execute(text("SELECT 1"))
+                conn.execute(text("SELECT 2"))
+
+
+def test_query_budget_flags_repeated_statements(query_budget):
+    with pytest.raises(AssertionError, match="repeated more than 2 times"):
+        with query_budget(10):
+            with engine.connect() as conn:
+                for i in range(3):
+                    conn.execute(text("SELECT :i"), {"i": i})
+
+
+def test_slow_query_logged_with_parameters(monkeypatch, caplog):
+    monkeypatch.setattr(settings, "SQL_SLOW_QUERY_SECONDS", 0.01)
+    with caplog.at_level(logging.WARNING, logger="app.core.profiler"):
+        with engine.connect() as conn:
+            conn.execute(text("SELECT pg_sleep(:s)"), {"s": 0.02})
+            conn.execute(text("SELECT 1"))
+
+    slow = [r.getMessage() for r in caplog.records if "Slow query" in r.getMessage()]
+    assert len(slow) == 1
+    assert "pg_sleep" in slow[0] and "'s': 0.02" in slow[0]
+
+
+def test_failed_query_is_profiled_and_logged(monkeypatch, caplog, query_budget):
+    monkeypatch.setattr(settings, "SQL_SLOW_QUERY_SECONDS", 0.01)
+    with caplog.at_level(logging.WARNING, logger="app.core.profiler"):
+        with query_budget(3) as profile:
+            with engine.connect() as conn:
+                conn.execute(text("SET statement_timeout = 50"))
+                with pytest.raises(OperationalError):
+                    conn.execute(text("SELECT pg_sleep(:s)"), {"s": 1})
+                conn.rollback()
+
+    statement, _, seconds = profile.statements[1]
+    assert "pg_sleep" in statement and seconds >= 0.05
+    slow = [r.getMessage() for r in caplog.records if "Slow query" in r.getMessage()]
+    assert len(slow) == 1
+    assert "failed: QueryCanceled" in slow[0] and "pg_sleep" in slow[0]
+
+
+def test_report_repeated_flags_n_plus_one_and_duplicates(monkeypatch, caplog):
+    monkeypatch.setattr(settings, "SQL_N_PLUS_ONE_THRESHOLD", 3)
+    profile = QueryProfile(record=True)
+    for book_id in (1, 2, 3):
+        profile.add("SELECT * FROM books WHERE id = %(id)s", {"id": book_id}, 0.001)
+    for _ in range(2):
+        profile.add("SELECT * FROM users WHERE id = %(id)s", {"id": 7}, 0.001)
+
+    with caplog.at_level(logging.WARNING, logger="app.core.profiler"):
+        report_repeated(profile, "GET /books/")
+
+    messages = [r.getMessage() for r in caplog.records]
+    assert any(
+        m.startswith("Possible N+1 in GET /books/: 3 executions") for m in messages
+    )
+    assert any(
+        m.startswith("Duplicate query in GET /books/: 2 identical") and "users" in m
+        for m in messages
+    )
+    assert not any("N+1" in m and "users" in m for m in messages)
+
+
+def test_request_profile_reported_by_middleware(
+    warm_client, test_book, monkeypatch, caplog
+):
+    monkeypatch.setattr(settings, "SQL_PROFILE", True)
+    monkeypatch.setattr(settings, "SQL_N_PLUS_ONE_THRESHOLD", 1)
+    with caplog.at_level(logging.WARNING, logger="app.core.profiler"):
+        warm_client.get("/books/")
+
+    assert any(
+        r.getMessage().startswith("Possible N+1 in GET /books/: 1 executions")
+        for r in caplog.records
+    )
@@ -74,3 +74,61 @@ def test_delete_reader(auth_client, test_reader):
 def test_delete_nonexistent_reader(auth_client):
     response = auth_client.delete("/readers/9999")
     assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+def test_get_readers_cursor_pagination(auth_client, db):
+    for i, name in enumerate(["Carol", "Alice", "Bob"]):
+        db.add(Reader(name=name, email=f"reader{i}@example.com"))
+    db.commit()
+
+    seen = []
+    cursor = None
+    while True:
+        params = {"sort": "name", "limit": 2}
+        if cursor:
+            params["cursor"] = cursor
+        response = auth_client.get("/readers/", params=params)
+        assert response.status_code == status.HTTP_200_OK
+        seen.extend(r["name"] for r in response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+
+    assert seen == ["Alice", "Bob", "Carol"]
+
+
+def test_reader_conditional_requests(auth_client, test_reader):
+    response = auth_client.get(f"/readers/{test_reader.id}")
+    etag = response.headers["ETag"]
+
+    response = auth_client.get(
+        f"/readers/{test_reader.id}", headers={"If-None-Match": etag}
+    )
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+    response = auth_client.put(
+        f"/readers/{test_reader.id}",
+        json={"name": "Stale Write"},
+        headers={"If-Match": '"0.0"'},
+    )
+    assert response.status_code == status.HTTP_412_PRECONDITION_FAILED
+
+    response = auth_client.put(
+        f"/readers/{test_reader.id}", json={"name": "Fresh"}, headers={"If-Match": etag}
+    )
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["version"] == 2
+
+
+def test_get_readers_matches_single_reader_payload(auth_client, test_reader):
+    listed = auth_client.get("/readers/").json()
+    assert listed == [auth_client.get(f"/readers/{test_reader.id}").json()]
+    assert auth_client.get("/readers/", params={"skip": 0}).json() == listed
+
+
+def test_get_readers_sparse_fieldset(auth_client, test_reader):
+    response = auth_client.get("/readers/", params={"fields": "name", "skip": 0})
+    assert response.json() == [{"name": test_reader.name}]
+
+    response = auth_client.get("/readers/", params={"fields": "name,phone"})
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
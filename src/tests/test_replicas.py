@@ -0,0 +1,190 @@
+import os
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import make_url
+
+from app.db.base import Base
+from app.db.replicas import ReplicaRouter
+from app.db.session import get_read_db
+from app.main import app
+from tests.conftest import TestingSessionLocal
+
+REPLICA_DB = "test_library_replica"
+
+
+@pytest.fixture(scope="module")
+def replica_url():
+    # A second database stands in for a streaming replica: same schema,
+    # its own rows, so a response shows which one served it.
+    url = make_url(os.environ["DATABASE_URL"])
+    admin = create_engine(url, isolation_level="AUTOCOMMIT")
+    with admin.connect() as conn:
+        conn.execute(text(f"DROP DATABASE IF EXISTS {REPLICA_DB}"))
+        conn.execute(text(f"CREATE DATABASE {REPLICA_DB}"))
+    replica_url = url.set(database=REPLICA_DB)
+    replica = create_engine(replica_url)
+    with replica.begin() as conn:
+        conn.execute(text("CREATE SCHEMA test_schema"))
+    Base.metadata.create_all(bind=replica)
+    with replica.begin() as conn:
+        conn.execute(
+            text(
+                "INSERT INTO test_schema.books (title, author, year, isbn, "
+                "copies_available) VALUES ('Replica Only', 'Author', 2001, "
+                "'9990000000001', 1)"
+            )
+        )
+    replica.dispose()
+
+    yield replica_url.render_as_string(hide_password=False)
+
+    with admin.connect() as conn:
+        conn.execute(
+            text(
+                "SELECT pg_terminate_backend(pid) FROM pg_stat_activity "
+                "WHERE datname = :name"
+            ),
+            {"name": REPLICA_DB},
+        )
+        conn.execute(text(f"DROP DATABASE IF EXISTS {REPLICA_DB}"))
+    admin.dispose()
+
+
+@pytest.fixture
+def route_reads():
+    # Swaps the conftest override of get_read_db for a real router whose
+    # fallback is the test primary.
+    previous = app.dependency_overrides[get_read_db]
+    routers = []
+
+    def install(router: ReplicaRouter):
+        routers.append(router)
+
+        def override():
+            replica = router.pick()
+            db = replica.session_factory() if replica else TestingSessionLocal()
+            try:
+                yield db
+            finally:
+                db.close()
+
+        app.dependency_overrides[get_read_db] = override
+
+    yield install
+    app.dependency_overrides[get_read_db] = previous
+    for router in routers:
+        router.dispose()
+
+
+def test_list_served_by_replica_writes_by_primary(
+    auth_client, test_book, replica_url, route_reads
+):
+    route_reads(ReplicaRouter([replica_url]))
+
+    response = auth_client.get("/books/")
+    assert response.status_code == 200
+    assert [b["title"] for b in response.json()] == ["Replica Only"]
+
+    # By-id reads and writes still go to the primary.
+    response = auth_client.get(f"/books/{test_book.id}")
+    assert response.status_code == 200
+    response = auth_client.post(
+        "/books/",
+        json={
+            "title": "Primary Book",
+            "author": "Author",
+            "year": 2020,
+            "isbn": "9990000000002",
+            "copies_available": 1,
+        },
+    )
+    assert response.status_code == 201
+    titles = [b["title"] for b in auth_client.get("/books/").json()]
+    assert "Primary Book" not in titles
+
+
+def test_lagging_replica_falls_back_to_primary(
+    auth_client, test_book, replica_url, route_reads
+):
+    router = ReplicaRouter([replica_url], max_lag=5.0, lag_probe=lambda engine: 100.0)
+    route_reads(router)
+
+    response = auth_client.get("/books/")
+    assert response.status_code == 200
+    assert [b["id"] for b in response.json()] == [test_book.id]
+    assert router.fallbacks == 1
+    assert router.stats()["replicas"][0]["lag"] == 100.0
+
+
+def test_lag_is_probed_once_per_interval(replica_url):
+    probes = []
+
+    def probe(engine):
+        probes.append(engine)
+        return 0.0
+
+    router = ReplicaRouter([replica_url], check_interval=60, lag_probe=probe)
+    try:
+        for _ in range(5):
+            assert router.pick() is router.replicas[0]
+        assert len(probes) == 1
+    finally:
+        router.dispose()
+
+
+def test_real_lag_probe_reports_primary_as_current(replica_url):
+    router = ReplicaRouter([replica_url])
+    try:
+        assert router.pick() is router.replicas[0]
+        assert router.replicas[0].lag == 0.0
+    finally:
+        router.dispose()
+
+
+def test_round_robin_alternates(replica_url):
+    router = ReplicaRouter([replica_url, replica_url], lag_probe=lambda e: 0.0)
+    try:
+        picks = [router.pick().name for _ in range(4)]
+        assert picks == ["replica1", "replica2", "replica1", "replica2"]
+    finally:
+        router.dispose()
+
+
+def test_least_connections_prefers_idle_replica(replica_url):
+    router = ReplicaRouter(
+        [replica_url, replica_url],
+        balance="least_connections",
+        lag_probe=lambda e: 0.0,
+    )
+    busy = router.replicas[0].engine.connect()
+    try:
+        assert {router.pick().name for _ in range(4)} == {"replica2"}
+    finally:
+        busy.close()
+        router.dispose()
+
+
+def test_unreachable_replica_is_skipped(replica_url):
+    dead = make_url(replica_url).set(port=1)
+    router = ReplicaRouter(
+        [dead.render_as_string(hide_password=False), replica_url],
+    )
+    try:
+        assert {router.pick().name for _ in range(3)} == {"replica2"}
+        stats = router.stats()
+        assert stats["replicas"][0]["lag"] is None
+        assert "test_password" not in stats["replicas"][0]["url"]
+    finally:
+        router.dispose()
+
+
+def test_unknown_balance_strategy_rejected():
+    with pytest.raises(ValueError):
+        ReplicaRouter([], balance="random")
+
+
+def test_pool_endpoint_reports_replicas(auth_client):
+    response = auth_client.get("/admin/pool")
+    assert response.status_code == 200
+    assert response.json()["replicas"]["replicas"] == []
@@ -0,0 +1,119 @@
+from datetime import datetime, timedelta
+
+from fastapi import status
+
+from app.crud.stats import stats as crud_stats
+from app.db.models import Book, BorrowedBook, Reader, utcnow
+
+
+def _borrow(auth_client, book_id, reader_id):
+    response = auth_client.post(
+        "/borrow/", json={"book_id": book_id, "reader_id": reader_id}
+    )
+    assert response.status_code == status.HTTP_201_CREATED
+    return response.json()["id"]
+
+
+def test_stats_refresh_from_events(auth_client, test_reader, db):
+    books = [
+        Book(title=f"Book {i}", author="Author", copies_available=5) for i in range(2)
+    ]
+    db.add_all(books)
+    db.commit()
+
+    first = _borrow(auth_client, books[0].id, test_reader.id)
+    _borrow(auth_client, books[0].id, test_reader.id)
+    _borrow(auth_client, books[1].id, test_reader.id)
+    auth_client.post(f"/borrow/return/{first}")
+
+    response = auth_client.get("/stats/overdue")
+    assert response.json()["pending_events"] == 4
+
+    response = auth_client.post("/stats/refresh")
+    assert response.json() == {"processed": 4}
+
+    today = utcnow().date().isoformat()
+    response = auth_client.get("/stats/daily")
+    assert response.json() == [{"day": today, "borrows": 3, "returns": 1}]
+
+    response = auth_client.get("/stats/top-books", params={"limit": 1})
+    top = response.json()
+    assert len(top) == 1
+    assert top[0]["book"]["id"] == books[0].id
+    assert top[0]["borrows"] == 2
+
+    response = auth_client.get("/stats/readers")
+    activity = response.json()
+    assert activity["active_readers"] == 1
+    assert activity["top"][0] == {
+        "reader_id": test_reader.id,
+        "name": test_reader.name,
+        "borrows": 3,
+        "returns": 1,
+        "active_days": 1,
+    }
+
+    response = auth_client.get("/stats/overdue")
+    assert response.json() == {
+        "open_loans": 2,
+        "overdue": 0,
+        "loan_period_days": 14,
+        "pending_events": 0,
+    }
+
+
+def test_stats_batch_events(auth_client, test_book, test_reader, db):
+    response = auth_client.post(
+        "/borrow/batch",
+        json={"reader_id": test_reader.id, "items": [{"book_id": test_book.id}]},
+    )
+    borrow_id = response.json()["results"][0]["borrow"]["id"]
+    auth_client.post("/borrow/return/batch", json={"items": [{"borrow_id": borrow_id}]})
+
+    assert crud_stats.refresh(db) == 2
+    assert (
+        crud_stats.overdue(db, today=utcnow().date(), loan_days=14)["open_loans"] == 0
+    )
+
+
+def test_stats_rebuild_matches_history(auth_client, test_book, test_reader, db):
+    now = utcnow()
+    old = now - timedelta(days=20)
+    db.add_all(
+        [
+            BorrowedBook(
+                book_id=test_book.id, reader_id=test_reader.id, borrow_date=old
+            ),
+            BorrowedBook(
+                book_id=test_book.id,
+                reader_id=test_reader.id,
+                borrow_date=old,
+                return_date=now,
+            ),
+        ]
+    )
+    db.commit()
+
+    assert crud_stats.rebuild(db) == 2
+    counts = crud_stats.overdue(db, today=now.date(), loan_days=14)
+    assert counts == {"open_loans": 1, "overdue": 1, "pending_events": 0}
+
+    response = auth_client.get("/stats/daily", params={"since": old.date().isoformat()})
+    assert response.json() == [
+        {"day": old.date().isoformat(), "borrows": 2, "returns": 0},
+        {"day": now.date().isoformat(), "borrows": 0, "returns": 1},
+    ]
+
+    # Incremental updates continue on top of the rebuilt rollups.
+    _borrow(auth_client, test_book.id, test_reader.id)
+    crud_stats.refresh(db)
+    response = auth_client.get("/stats/readers")
+    assert response.json()["top"][0]["borrows"] == 3
+    assert response.json()["top"][0]["returns"] == 1
+
+
+def test_stats_rejects_inverted_range(auth_client):
+    response = auth_client.get(
+        "/stats/daily", params={"since": "2025-02-01", "until": "2025-01-01"}
+    )
+    assert response.status_code == status.HTTP_400_BAD_REQUEST